@@ -0,0 +1,227 @@
+"""
+Audit log of invoice and client changes.
+
+Handlers describe each change with record()/record_many() before they
+commit: who made it and the old and new value of every changed field.
+The entries wait on the session until the transaction commits (a rolled
+back change leaves no entry) and are then handed to an in-process buffer.
+A background thread writes the buffer to the audit_log table with one
+batched INSERT every AUDIT_FLUSH_INTERVAL seconds, or as soon as
+AUDIT_FLUSH_SIZE entries are waiting, so a request never waits for an
+audit write.
+
+create_app starts the flusher and flushes what is left on shutdown,
+before the database connections are closed. Entries buffered when a
+worker is killed outright are lost; AUDIT_MODE=sync writes them in the
+request's own transaction instead, at the cost of one more INSERT per
+change.
+"""
+
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import AuditEntry
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# How entries are written:
+#   "buffered" - batched by a background thread after commit
+#   "sync"     - in the request transaction
+#   "off"      - not at all
+AUDIT_MODE = settings.audit_mode
+# Seconds between flushes when few entries are waiting
+AUDIT_FLUSH_INTERVAL = settings.audit_flush_interval
+# Entries per INSERT; reaching it also triggers a flush right away
+AUDIT_FLUSH_SIZE = settings.audit_flush_size
+# While the database is unreachable entries pile up in memory; beyond
+# this many the oldest are dropped
+AUDIT_MAX_BUFFERED = settings.audit_max_buffered
+
+
+# ============= RECORDING =============
+
+def diff(before: dict, after: dict) -> dict:
+    """{"field": {"old", "new"}} for every field of after whose value changed."""
+    return {
+        field: {"old": before.get(field), "new": value}
+        for field, value in after.items()
+        if before.get(field) != value
+    }
+
+
+def record(
+    db: Session,
+    user_id: int,
+    entity_type: str,
+    entity_id: int,
+    action: str,
+    changes: Optional[dict] = None,
+    version: Optional[int] = None
+) -> None:
+    """
+    Add an audit entry for a change in the current transaction.
+
+    Args:
+        db: Session holding the change; the entry is kept only if it commits
+        user_id: User making the change
+        entity_type: "invoice" or "client"
+        entity_id: Id of the changed entity
+        action: "updated" or "deleted"
+        changes: Field diff, see diff()
+        version: Entity version after the change
+    """
+    record_many(db, user_id, entity_type, action, [(entity_id, changes, version)])
+
+
+def record_many(db: Session, user_id: int, entity_type: str, action: str, entries: Iterable[tuple]) -> None:
+    """
+    Like record, for many entities at once (bulk operations).
+
+    Args:
+        entries: (entity_id, changes, version) tuples
+    """
+    if AUDIT_MODE == "off":
+        return
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            "user_id": user_id,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "action": action,
+            "changes": jsonable_encoder(changes or {}),
+            "version": version,
+            "created_at": now,
+        }
+        for entity_id, changes, version in entries
+    ]
+    if not rows:
+        return
+    if AUDIT_MODE == "sync":
+        db.execute(insert(AuditEntry), rows)
+    else:
+        db.info.setdefault("audit_entries", []).extend(rows)
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_entries(session):
+    entries = session.info.pop("audit_entries", None)
+    if entries:
+        audit_buffer.add(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_uncommitted_entries(session):
+    session.info.pop("audit_entries", None)
+
+
+# ============= FLUSHING =============
+
+def _write(rows: List[dict]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(insert(AuditEntry), rows)
+        db.commit()
+    finally:
+        db.close()
+
+
+class AuditBuffer:
+    """Committed audit entries waiting to be written, flushed from a daemon thread."""
+
+    def __init__(
+        self,
+        interval: float = AUDIT_FLUSH_INTERVAL,
+        flush_size: int = AUDIT_FLUSH_SIZE,
+        max_buffered: int = AUDIT_MAX_BUFFERED
+    ):
+        self.interval = interval
+        self.flush_size = flush_size
+        self.max_buffered = max_buffered
+        self._entries = deque()
+        self._lock = threading.Lock()
+        # One flush at a time, so entries are written in commit order
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entries: List[dict]) -> None:
+        with self._lock:
+            self._entries.extend(entries)
+            dropped = max(len(self._entries) - self.max_buffered, 0)
+            for _ in range(dropped):
+                self._entries.popleft()
+            pending = len(self._entries)
+        if dropped:
+            print(f"❌ Audit buffer full, dropped {dropped} entries")
+        if pending >= self.flush_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write every buffered entry, flush_size per INSERT.
+
+        A failed batch goes back to the front of the buffer and the error
+        is raised; the next flush retries it.
+
+        Returns:
+            Number of entries written
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._entries.popleft() for _ in range(min(self.flush_size, len(self._entries)))]
+                if not batch:
+                    return written
+                try:
+                    _write(batch)
+                except Exception:
+                    with self._lock:
+                        self._entries.extendleft(reversed(batch))
+                    raise
+                written += len(batch)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the thread, then write whatever is still buffered."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ Audit flush on shutdown failed, {len(self)} entries lost: {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep the thread alive; the entries stay buffered for the next pass
+                print(f"❌ Audit flush failed: {e}")
+
+
+audit_buffer = AuditBuffer()
@@ -2,25 +2,38 @@
 Authentication utilities for JWT tokens and password hashing.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-import bcrypt
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.database import get_db
-from app.models import User
+from app.models import User, RefreshToken
 from app.schemas import TokenData
 
+# jose (and the cryptography backend it pulls in) and bcrypt are imported
+# inside the functions that use them, so importing the app stays fast
+
 # ============= CONFIGURATION =============
 
+settings = get_settings()
+
 # Secret key to sign JWT tokens
-# In production, use a strong random string and store in environment variables
-SECRET_KEY = "your-secret-key-keep-this-secret-in-production"
+# In production, set SECRET_KEY to a strong random string
+SECRET_KEY = settings.secret_key.get_secret_value()
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+
+# Refresh tokens let clients renew access tokens without sending the password
+# again, so a session only pays the bcrypt cost once per login
+REFRESH_TOKEN_EXPIRE_DAYS = settings.refresh_token_expire_days
+
+# bcrypt work factor for new hashes
+BCRYPT_ROUNDS = settings.bcrypt_rounds
 
 # OAuth2 scheme for token-based authentication
 # Tells FastAPI where to look for the token (in Authorization header)
@@ -40,8 +53,10 @@ def hash_password(password: str) -> str:
     
     This is ONE-WAY - you can't reverse it to get the original password.
     """
+    import bcrypt
+    
     # Generate salt and hash password
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -55,6 +70,8 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     hashed = "$2b$12$..."
     verify_password(plain, hashed)  # Returns True if match
     """
+    import bcrypt
+    
     try:
         # Ensure both are bytes for bcrypt.checkpw
         if isinstance(hashed_password, str):
@@ -89,6 +106,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     token = create_access_token({"sub": "user@example.com"})
     # Returns: "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
     """
+    from jose import jwt
+    
     to_encode = data.copy()
     
     # Set expiration time
@@ -112,11 +131,13 @@ def verify_token(token: str) -> TokenData:
         token: The JWT token string
     
     Returns:
-        TokenData with the decoded email
+        TokenData with the decoded email and expiry
     
     Raises:
         HTTPException if token is invalid or expired
     """
+    from jose import JWTError, jwt
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -131,12 +152,112 @@ def verify_token(token: str) -> TokenData:
         if email is None:
             raise credentials_exception
         
-        return TokenData(email=email)
+        return TokenData(email=email, exp=payload.get("exp"))
     
     except JWTError:
         raise credentials_exception
 
 
+# ============= REFRESH TOKEN FUNCTIONS =============
+
+def _hash_refresh_token(token: str) -> str:
+    """
+    Digest a refresh token for storage and lookup.
+    
+    Refresh tokens are 256-bit random values, so a fast hash is enough here;
+    bcrypt would only bring back the cost refresh tokens are meant to avoid.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def create_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """
+    Issue a new refresh token for a user and store its digest.
+    
+    Args:
+        db: Database session
+        user_id: Owner of the token
+        family_id: Token family to continue (None starts a new login session)
+    
+    Returns:
+        The raw refresh token (only ever returned to the client once)
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user_id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    """
+    Exchange a refresh token for a new one (rotation).
+    
+    The presented token is revoked and a new token in the same family is
+    issued. Presenting a token that was already rotated means it leaked,
+    so the whole family is revoked and the client must log in again.
+    
+    Returns:
+        Tuple of (user, new raw refresh token)
+    
+    Raises:
+        HTTPException if the token is unknown, expired or revoked
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    now = datetime.now(timezone.utc)
+    
+    # Locked so two concurrent refreshes with the same token can't both
+    # rotate it: the second waits, then sees it revoked
+    record = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == _hash_refresh_token(token)
+    ).with_for_update().first()
+    if record is None:
+        raise credentials_exception
+    
+    if record.revoked_at is not None:
+        # Reuse of a rotated token - revoke every live token in the family
+        db.query(RefreshToken).filter(
+            RefreshToken.family_id == record.family_id,
+            RefreshToken.revoked_at.is_(None)
+        ).update({RefreshToken.revoked_at: now}, synchronize_session=False)
+        db.commit()
+        raise credentials_exception
+    
+    if record.expires_at <= now or not record.user.is_active:
+        raise credentials_exception
+    
+    record.revoked_at = now
+    new_token = create_refresh_token(db, record.user_id, family_id=record.family_id)
+    return record.user, new_token
+
+
+def revoke_refresh_token(db: Session, token: str) -> None:
+    """
+    Revoke the family of a refresh token (logout).
+    
+    Unknown tokens are ignored so logout is always safe to call.
+    """
+    record = db.query(RefreshToken).filter(
+        RefreshToken.token_hash == _hash_refresh_token(token)
+    ).first()
+    if record is None:
+        return
+    
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == record.family_id,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+    db.commit()
+
+
 # ============= USER AUTHENTICATION =============
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
@@ -201,6 +322,11 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Commits on this session now count as the user's writes, which keeps
+    # their reads on the primary for a moment (see app.database)
+    db.info["user_id"] = user.id
+    db.info["last_write_at"] = user.last_write_at
+    
     return user
 
 
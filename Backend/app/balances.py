@@ -0,0 +1,238 @@
+"""
+Per-client receivables balances.
+
+Each client carries outstanding, overdue and paid totals of its invoices,
+kept up to date incrementally: write paths collect the change of every
+invoice they touch into BalanceChanges and apply it to the affected
+clients with `UPDATE clients SET x = x + :delta`, in the same transaction
+as the invoice change. Concurrent writers add up instead of overwriting
+each other, and reading a balance never touches the invoices table.
+
+Balances are in BASE_CURRENCY: each invoice counts with its base_amount,
+converted at the rate booked on the invoice when it was created or its
+currency last changed. Adding and later removing an invoice therefore
+always moves a balance by the same value, whatever rates do meanwhile.
+
+A reconciliation job recomputes the balances from the invoices to detect
+(and optionally repair) drift, e.g. after manual SQL changes:
+    python -m app.balances reconcile [--fix]
+    python -m app.balances link      # set invoices.client_id from customer_name
+"""
+
+import sys
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, bindparam, case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models import Client, Invoice
+
+# Clients checked per reconciliation query
+RECONCILE_BATCH_SIZE = 1000
+
+BALANCE_COLUMNS = ("outstanding_amount", "overdue_amount", "paid_amount")
+
+ZERO = Decimal(0)
+
+
+def contribution(status: str, amount) -> tuple:
+    """(outstanding, overdue, paid) an invoice adds to its client's balances."""
+    amount = Decimal(amount or 0)
+    if status == "sent":
+        return amount, ZERO, ZERO
+    if status == "overdue":
+        return amount, amount, ZERO
+    if status == "paid":
+        return ZERO, ZERO, amount
+    # Drafts are not receivables yet
+    return ZERO, ZERO, ZERO
+
+
+def check_client(db: Session, user_id: int, client_id: Optional[int]) -> None:
+    """
+    Raises:
+        HTTPException 400 if client_id is not one of the user's clients
+    """
+    if client_id is None:
+        return
+    exists = db.query(Client.id).filter(
+        Client.id == client_id,
+        Client.user_id == user_id,
+        Client.deleted_at.is_(None)
+    ).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Client with id {client_id} not found"
+        )
+
+
+class BalanceChanges:
+    """Balance deltas per client, collected during one transaction."""
+
+    def __init__(self):
+        self._deltas: Dict[int, List[Decimal]] = defaultdict(lambda: [ZERO, ZERO, ZERO])
+
+    def add(self, client_id: Optional[int], status: str, amount) -> None:
+        """Count an invoice (new or changed state, amount = its base_amount) towards its client."""
+        self._apply(client_id, contribution(status, amount), 1)
+
+    def remove(self, client_id: Optional[int], status: str, amount) -> None:
+        """Take an invoice's previous state back out of its client's balances."""
+        self._apply(client_id, contribution(status, amount), -1)
+
+    def _apply(self, client_id: Optional[int], values: tuple, sign: int) -> None:
+        if client_id is None or not any(values):
+            return
+        delta = self._deltas[client_id]
+        for index, value in enumerate(values):
+            delta[index] += sign * value
+
+    def apply(self, db: Session) -> None:
+        """Write the deltas with one batched UPDATE, in client id order (no deadlocks)."""
+        rows = [
+            {"client_id": client_id, "d_outstanding": d[0], "d_overdue": d[1], "d_paid": d[2]}
+            for client_id, d in sorted(self._deltas.items())
+            if any(d)
+        ]
+        self._deltas.clear()
+        if not rows:
+            return
+        clients = Client.__table__
+        db.execute(
+            update(clients)
+            .where(clients.c.id == bindparam("client_id"))
+            .values(
+                outstanding_amount=clients.c.outstanding_amount + bindparam("d_outstanding"),
+                overdue_amount=clients.c.overdue_amount + bindparam("d_overdue"),
+                paid_amount=clients.c.paid_amount + bindparam("d_paid"),
+                # Balances aren't user edits; keep updated_at as it was
+                updated_at=clients.c.updated_at,
+            ),
+            rows
+        )
+
+
+# ============= RECONCILIATION =============
+
+def _computed_balances():
+    """Subquery of balances per client_id computed from live invoices."""
+    return (
+        select(
+            Invoice.client_id,
+            func.sum(case((Invoice.status.in_(("sent", "overdue")), Invoice.base_amount), else_=0)).label("outstanding_amount"),
+            func.sum(case((Invoice.status == "overdue", Invoice.base_amount), else_=0)).label("overdue_amount"),
+            func.sum(case((Invoice.status == "paid", Invoice.base_amount), else_=0)).label("paid_amount"),
+        )
+        .where(Invoice.client_id.isnot(None), Invoice.deleted_at.is_(None))
+        .group_by(Invoice.client_id)
+    )
+
+
+def reconcile(fix: bool = False, batch_size: int = RECONCILE_BATCH_SIZE) -> List[dict]:
+    """
+    Compare stored client balances with balances computed from invoices.
+
+    Walks clients in id order, batch_size at a time, each batch in its own
+    short transaction. With fix=True drifted balances are overwritten with
+    the computed ones; the batch's client rows are locked (FOR UPDATE)
+    before computing, so an invoice change committing meanwhile waits and
+    then applies its delta on top instead of being overwritten.
+
+    Returns:
+        One {"client_id", "column", "stored", "computed"} dict per drifted balance
+    """
+    drift = []
+    last_id = 0
+    while True:
+        db = SessionLocal()
+        try:
+            query = select(Client.id).where(Client.id > last_id).order_by(Client.id).limit(batch_size)
+            if fix:
+                # Same order as BalanceChanges.apply, so no deadlocks
+                query = query.with_for_update()
+            client_ids = db.execute(query).scalars().all()
+            if not client_ids:
+                return drift
+            computed = _computed_balances().where(Invoice.client_id.in_(client_ids)).subquery()
+            rows = db.execute(
+                select(
+                    Client.id,
+                    *[getattr(Client, column) for column in BALANCE_COLUMNS],
+                    *[func.coalesce(computed.c[column], 0).label(f"computed_{column}") for column in BALANCE_COLUMNS],
+                )
+                .outerjoin(computed, computed.c.client_id == Client.id)
+                .where(Client.id.in_(client_ids))
+            ).all()
+
+            fixes = []
+            for row in rows:
+                values = {}
+                for column in BALANCE_COLUMNS:
+                    stored = getattr(row, column)
+                    expected = getattr(row, f"computed_{column}")
+                    if stored != expected:
+                        drift.append({"client_id": row.id, "column": column, "stored": stored, "computed": expected})
+                        values[column] = expected
+                if values:
+                    fixes.append((row.id, values))
+            if fix:
+                for client_id, values in fixes:
+                    db.execute(update(Client).where(Client.id == client_id).values(**values))
+                db.commit()
+            last_id = client_ids[-1]
+        finally:
+            db.close()
+
+
+def link_invoices_by_name() -> int:
+    """
+    Set client_id on invoices without one whose customer_name matches
+    exactly one of the user's clients, then recompute those balances.
+
+    Returns:
+        Number of invoices linked
+    """
+    db = SessionLocal()
+    try:
+        matches = (
+            select(Client.user_id, Client.name, func.min(Client.id).label("client_id"))
+            .where(Client.deleted_at.is_(None))
+            .group_by(Client.user_id, Client.name)
+            .having(func.count() == 1)
+            .subquery()
+        )
+        linked = db.execute(
+            update(Invoice)
+            .where(
+                Invoice.client_id.is_(None),
+                and_(Invoice.user_id == matches.c.user_id, Invoice.customer_name == matches.c.name)
+            )
+            .values(client_id=matches.c.client_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    reconcile(fix=True)
+    return linked
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "reconcile":
+        fix = "--fix" in sys.argv[2:]
+        drifted = reconcile(fix=fix)
+        for entry in drifted:
+            print(f"❌ client {entry['client_id']} {entry['column']}: stored {entry['stored']}, computed {entry['computed']}")
+        action = "fixed" if fix else "found"
+        print(f"✅ Reconciliation done, {len(drifted)} drifted balances {action}")
+    elif command == "link":
+        print(f"✅ Linked {link_invoices_by_name()} invoices to clients by name")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,119 @@
+"""
+Response compression.
+
+JSON and text responses of at least COMPRESSION_MIN_SIZE bytes are
+compressed with brotli when the client accepts it and the brotli package
+is installed, otherwise with gzip. Smaller responses go out as they are:
+below about a kilobyte compressing costs more time than the bytes save.
+Streamed responses (the PDF ZIP download, already compressed) and
+responses that already have a Content-Encoding pass through unchanged.
+"""
+
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    # Optional; without it every client gets gzip
+    brotli = None
+
+from app.config import get_settings
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+COMPRESSION_ENABLED = settings.compression_enabled
+# Responses smaller than this (bytes) are sent uncompressed
+COMPRESSION_MIN_SIZE = settings.compression_min_size
+# Fast settings: responses are compressed on every request, not once
+GZIP_LEVEL = settings.gzip_level
+BROTLI_QUALITY = settings.brotli_quality
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def accepted_encoding(accept_encoding: str) -> Optional[str]:
+    """Best encoding we can produce for an Accept-Encoding header, or None."""
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+
+    def accepted(name: str) -> bool:
+        # An explicit entry wins over "*", so "gzip;q=0, *" still refuses gzip
+        return qualities.get(name, qualities.get("*", 0.0)) > 0
+
+    if brotli is not None and accepted("br"):
+        return "br"
+    if accepted("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(encoding: str, data: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing complete (non-streamed) responses."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = accepted_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until we know whether the body gets compressed
+                start = message
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message["type"] != "http.response.body"
+                or message.get("more_body", False)
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                or len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+            body = compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
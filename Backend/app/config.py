@@ -0,0 +1,155 @@
+"""
+Application settings.
+
+Every tunable value is declared once here, typed and validated, and read
+from environment variables of the same name (case-insensitive) or from a
+.env file in the working directory, e.g.:
+
+    DATABASE_URL=postgresql://invoices@db:5432/invoices
+    DB_POOL_SIZE=20
+    CORS_ORIGINS=["https://invoices.example.com"]
+    PURGE_RETENTION=172800          # seconds, or ISO 8601 (P2D)
+
+The environment is parsed once per process, on the first get_settings()
+call (module import), and cached; changing a value means restarting the
+workers. GET /diagnostics/settings reports the values a worker runs with.
+"""
+
+from datetime import timedelta
+from functools import lru_cache
+from typing import List, Literal, Optional
+
+from pydantic import Field, SecretStr
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # ============= DATABASE =============
+
+    database_url: str = "postgresql://miroslavkrsmanovic@localhost:5432/todo_db"
+    # Comma separated read replica URLs; empty sends every read to the primary
+    database_replica_urls: str = ""
+    db_echo: bool = True
+    # Per worker; serve.py sets these from its connection budget
+    db_pool_size: int = Field(5, ge=1)
+    db_max_overflow: int = Field(10, ge=0)
+    db_create_tables: bool = True
+    # Seconds a user's reads stay on the primary after they write
+    read_your_writes_window: float = Field(5.0, ge=0)
+
+    # ============= AUTH =============
+
+    secret_key: SecretStr = SecretStr("your-secret-key-keep-this-secret-in-production")
+    access_token_expire_minutes: int = Field(30, ge=1)
+    refresh_token_expire_days: int = Field(30, ge=1)
+    # bcrypt work factor for new password hashes (2^rounds iterations);
+    # existing hashes keep the cost they were created with
+    bcrypt_rounds: int = Field(12, ge=4, le=31)
+    cors_origins: List[str] = [
+        "http://localhost:3000",
+        "http://localhost:5173",  # Vite default port
+        "http://127.0.0.1:5173",
+        "http://167.71.34.142",
+    ]
+
+    # ============= RATE LIMITING =============
+
+    rate_limit_backend: Literal["memory", "sqlite"] = "memory"
+    rate_limit_sqlite_path: str = "ratelimit.sqlite3"
+    ip_rate: float = Field(1.0, gt=0)
+    ip_burst: int = Field(20, ge=1)
+    email_rate: float = Field(0.1, gt=0)
+    email_burst: int = Field(5, ge=1)
+    rate_limit_max_tracked_keys: int = Field(100_000, ge=1)
+
+    # ============= IDEMPOTENCY =============
+
+    idempotency_backend: Literal["database", "memory"] = "database"
+    idempotency_ttl: timedelta = timedelta(hours=24)
+    idempotency_max_cached_responses: int = Field(10_000, ge=1)
+
+    # ============= PDF =============
+
+    pdf_cache_dir: str = "pdf_cache"
+    pdf_cache_max_bytes: int = Field(256 * 1024 * 1024, ge=0)
+    pdf_pool_workers: int = Field(2, ge=1)
+
+    # ============= LIVE UPDATES =============
+
+    live_poll_interval: float = Field(0.5, gt=0)
+    live_poll_batch: int = Field(1000, ge=1)
+    live_queue_size: int = Field(64, ge=1)
+    live_gap_timeout: float = Field(30, gt=0)
+
+    # ============= OUTBOX =============
+
+    outbox_dispatch_enabled: bool = True
+    dispatch_batch_size: int = Field(200, ge=1)
+    dispatch_interval: float = Field(2, gt=0)
+    dispatch_timeout: float = Field(5, gt=0)
+    outbox_retention: timedelta = timedelta(days=7)
+    webhook_allow_private_urls: bool = False
+
+    # ============= PURGE =============
+
+    purge_enabled: bool = True
+    purge_retention: timedelta = timedelta(hours=24)
+    purge_batch_size: int = Field(500, ge=1)
+    purge_interval: float = Field(300, gt=0)
+    tombstone_retention: timedelta = timedelta(days=90)
+
+    # ============= CURRENCY =============
+
+    base_currency: str = Field("USD", pattern="^[A-Z]{3}$")
+    exchange_rates_dir: str = "rates"
+    rates_cache_ttl: float = Field(300, ge=0)
+
+    # ============= RECURRING INVOICES =============
+
+    scheduler_batch_size: int = Field(500, ge=1)
+    max_runs_per_claim: int = Field(12, ge=1)
+    scheduler_interval: float = Field(60, gt=0)
+
+    # ============= AUDIT LOG =============
+
+    audit_mode: Literal["buffered", "sync", "off"] = "buffered"
+    audit_flush_interval: float = Field(1, gt=0)
+    audit_flush_size: int = Field(500, ge=1)
+    audit_max_buffered: int = Field(100_000, ge=1)
+
+    # ============= COMPRESSION =============
+
+    compression_enabled: bool = True
+    compression_min_size: int = Field(1024, ge=0)
+    gzip_level: int = Field(5, ge=1, le=9)
+    brotli_quality: int = Field(4, ge=0, le=11)
+
+    # ============= SERVER (serve.py) =============
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    # Defaults to one worker per CPU core
+    workers: Optional[int] = Field(None, ge=1)
+    # Total connections all workers may open (Postgres defaults to
+    # max_connections=100, leave some for admin tools and scripts)
+    db_connection_budget: int = Field(80, ge=1)
+    # Seconds to let in-flight requests finish after SIGTERM/SIGINT
+    graceful_timeout: int = Field(30, ge=0)
+    # Comma separated proxy addresses (or "*") whose X-Forwarded-For is
+    # trusted for the client IP, e.g. the load balancer's; see app.ratelimit
+    forwarded_allow_ips: str = "127.0.0.1"
+
+    # ============= DIAGNOSTICS =============
+
+    # GET /diagnostics/settings (secrets redacted); off unless enabled, and
+    # then only for the listed user emails, e.g. DIAGNOSTICS_USERS=["ops@example.com"]
+    diagnostics_enabled: bool = False
+    diagnostics_users: List[str] = []
+
+
+@lru_cache()
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsed on first call."""
+    return Settings()
@@ -0,0 +1,185 @@
+"""
+Exchange rates and currency conversion for reports.
+
+Rates are stored in the exchange_rates table as the value of one unit of
+a currency in BASE_CURRENCY, per date. They come from local CSV files,
+never from the network:
+
+    date,currency,rate_to_base
+    2024-01-31,EUR,1.0832
+    2024-01-31,GBP,1.2701
+
+Load or update them from the command line (from the Backend directory):
+    python -m app.currency load rates/2024.csv [more files...]
+    python -m app.currency load            # every *.csv in EXCHANGE_RATES_DIR
+
+Reports convert amounts inside SQL by joining invoices to the latest rate
+of each currency, so no invoice row is ever converted in Python.
+"""
+
+import csv
+import glob
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import ExchangeRate, Invoice
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# Currency every rate is expressed in; its own rate is always 1
+BASE_CURRENCY = settings.base_currency
+EXCHANGE_RATES_DIR = settings.exchange_rates_dir
+
+# Seconds a worker keeps rates in memory at most. Loading new rates
+# invalidates them earlier: every lookup compares the memo with
+# max(exchange_rates.loaded_at), one index probe, so every worker sees
+# loaded rates right away.
+RATES_CACHE_TTL = settings.rates_cache_ttl
+# as_of dates memoized per worker; least recently used are dropped
+RATES_MEMO_SIZE = 64
+
+# Rows per INSERT when loading rate files
+LOAD_BATCH_SIZE = 1000
+
+
+# ============= RATES =============
+
+# as_of date -> (monotonic time loaded, rates version, {currency: rate_to_base})
+_rates_memo: "OrderedDict[date, tuple]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def latest_rates(as_of: date):
+    """
+    Subquery of (currency, rate_to_base), the latest rate of each currency
+    on or before as_of.
+    """
+    latest = (
+        select(ExchangeRate.currency, func.max(ExchangeRate.rate_date).label("rate_date"))
+        .where(ExchangeRate.rate_date <= as_of)
+        .group_by(ExchangeRate.currency)
+        .subquery()
+    )
+    return (
+        select(ExchangeRate.currency, ExchangeRate.rate_to_base)
+        .join(latest, and_(
+            ExchangeRate.currency == latest.c.currency,
+            ExchangeRate.rate_date == latest.c.rate_date
+        ))
+        .subquery("rates")
+    )
+
+
+def rate_to_base(rates):
+    """
+    SQL expression for the rate of Invoice.currency in a latest_rates()
+    subquery outer-joined to invoices. NULL when the currency has no rate.
+    """
+    return func.coalesce(rates.c.rate_to_base, case((Invoice.currency == BASE_CURRENCY, 1)))
+
+
+def get_rates(db: Session, as_of: Optional[date] = None) -> Dict[str, Decimal]:
+    """Return {currency: rate_to_base} as of a date (default today), memoized."""
+    as_of = as_of or date.today()
+    now = time.monotonic()
+    version = db.execute(select(func.max(ExchangeRate.loaded_at))).scalar()
+    with _memo_lock:
+        memo = _rates_memo.get(as_of)
+        if memo is not None:
+            _rates_memo.move_to_end(as_of)
+    if memo is not None and memo[1] == version and now - memo[0] < RATES_CACHE_TTL:
+        return memo[2]
+
+    rates_query = latest_rates(as_of)
+    rates = {currency: rate for currency, rate in db.execute(select(rates_query)).all()}
+    rates[BASE_CURRENCY] = Decimal(1)
+    with _memo_lock:
+        _rates_memo[as_of] = (now, version, rates)
+        _rates_memo.move_to_end(as_of)
+        while len(_rates_memo) > RATES_MEMO_SIZE:
+            _rates_memo.popitem(last=False)
+    return rates
+
+
+def invalidate_rates() -> None:
+    """Forget this process's memoized rates (other workers notice new loads themselves)."""
+    with _memo_lock:
+        _rates_memo.clear()
+
+
+def check_currency(db: Session, currency: str) -> Decimal:
+    """
+    Returns:
+        The currency's current rate_to_base, booked on invoices (Invoice.rate_to_base)
+
+    Raises:
+        HTTPException 400 if there is no exchange rate for currency
+    """
+    rate = get_rates(db).get(currency)
+    if rate is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No exchange rate loaded for currency '{currency}'"
+        )
+    return rate
+
+
+# ============= LOADING =============
+
+def _read_rate_file(path: str) -> Iterable[dict]:
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "currency": row["currency"].strip().upper(),
+                "rate_date": date.fromisoformat(row["date"].strip()),
+                "rate_to_base": Decimal(row["rate_to_base"].strip()),
+            }
+
+
+def load_rates(paths: Iterable[str]) -> int:
+    """
+    Insert or update the rates in CSV files, in batches.
+
+    Returns:
+        Number of rows loaded
+    """
+    db = SessionLocal()
+    loaded = 0
+    try:
+        for path in paths:
+            rows = list(_read_rate_file(path))
+            for start in range(0, len(rows), LOAD_BATCH_SIZE):
+                stmt = pg_insert(ExchangeRate).values(rows[start:start + LOAD_BATCH_SIZE])
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=[ExchangeRate.currency, ExchangeRate.rate_date],
+                    set_={"rate_to_base": stmt.excluded.rate_to_base, "loaded_at": func.now()}
+                ))
+            loaded += len(rows)
+        db.commit()
+    finally:
+        db.close()
+    invalidate_rates()
+    return loaded
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "load":
+        print(__doc__)
+        sys.exit(1)
+    files = sys.argv[2:] or sorted(glob.glob(os.path.join(EXCHANGE_RATES_DIR, "*.csv")))
+    print(f"✅ Loaded {load_rates(files)} exchange rates from {len(files)} file(s)")
@@ -1,16 +1,178 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+
+settings = get_settings()
 
-DATABASE_URL = "postgresql://miroslavkrsmanovic@localhost:5432/todo_db"
+# Seconds after a user's write during which their reads stay on the primary,
+# so they always see their own changes despite replication lag. The time of
+# the last write is kept on the user row, so it holds for every worker.
+READ_YOUR_WRITES_WINDOW = settings.read_your_writes_window
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Created on first use so that importing the app (worker spawn, test
+# collection, scripts) doesn't open a connection pool as a side effect
+_engine: Optional[Engine] = None
+_replica_engines: Optional[List[Engine]] = None
+_replica_cycle = None
+_engine_lock = threading.Lock()
+_SessionFactory = sessionmaker(autocommit=False, autoflush=False)
+
+
+def _create_engine(url: str) -> Engine:
+    kwargs = {"echo": settings.db_echo}
+    # SQLite (local testing) doesn't use a sized connection pool
+    if not url.startswith("sqlite"):
+        kwargs["pool_size"] = settings.db_pool_size
+        kwargs["max_overflow"] = settings.db_max_overflow
+    return create_engine(url, **kwargs)
+
+
+def get_engine() -> Engine:
+    """
+    Return the process-wide engine, creating it on first call.
+
+    Pool settings come from app.config. serve.py sets
+    DB_POOL_SIZE/DB_MAX_OVERFLOW for each worker so that
+    workers * (pool size + overflow) stays under the database connection budget.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(settings.database_url)
+    return _engine
+
+
+def get_replica_engines() -> List[Engine]:
+    """
+    Return the read replica engines (DATABASE_REPLICA_URLS, comma separated).
+
+    An empty list means every read goes to the primary.
+    """
+    global _replica_engines, _replica_cycle
+    if _replica_engines is None:
+        with _engine_lock:
+            if _replica_engines is None:
+                urls = [url.strip() for url in settings.database_replica_urls.split(",") if url.strip()]
+                engines = [_create_engine(url) for url in urls]
+                _replica_cycle = itertools.cycle(engines) if engines else None
+                _replica_engines = engines
+    return _replica_engines
+
+
+def dispose_engine() -> None:
+    """Close all pooled connections and forget the engines."""
+    global _engine, _replica_engines, _replica_cycle
+    with _engine_lock:
+        for engine in [_engine] + (_replica_engines or []):
+            if engine is not None:
+                engine.dispose()
+        _engine = None
+        _replica_engines = None
+        _replica_cycle = None
+
+
+def SessionLocal():
+    """Create a new session bound to the engine."""
+    return _SessionFactory(bind=get_engine())
+
+
+def ReadSessionLocal(last_write_at: Optional[datetime] = None):
+    """
+    Create a session for read-only work.
+
+    Bound to the next replica in turn, or to the primary when there are no
+    replicas or the user's last write (User.last_write_at) is within
+    READ_YOUR_WRITES_WINDOW.
+    """
+    if not get_replica_engines() or wrote_recently(last_write_at):
+        return SessionLocal()
+    with _engine_lock:
+        engine = next(_replica_cycle)
+    return _SessionFactory(bind=engine)
+
+
+def __getattr__(name):
+    # Keep `from app.database import engine` working for scripts
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ============= READ-YOUR-WRITES TRACKING =============
+
+# The stamp is only rewritten once it is older than this, so a user's
+# concurrent writes don't all queue on their users row. Reads then stay on
+# the primary for between half and all of READ_YOUR_WRITES_WINDOW after a
+# write, rather than exactly the window.
+_STAMP_REFRESH = timedelta(seconds=READ_YOUR_WRITES_WINDOW / 2)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; they are stored in UTC
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def wrote_recently(last_write_at: Optional[datetime]) -> bool:
+    return (
+        last_write_at is not None
+        and datetime.now(timezone.utc) - _as_utc(last_write_at) < timedelta(seconds=READ_YOUR_WRITES_WINDOW)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flush(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _note_write(session):
+    # get_current_user stores the user id on the request's session. The
+    # stamp commits with the write itself; get_current_user reads the user
+    # row from the primary on every request, so checking it costs nothing.
+    if "user_id" not in session.info:
+        return
+    if not (session.info.get("wrote") or session.new or session.dirty or session.deleted):
+        return
+    now = datetime.now(timezone.utc)
+    stamped = session.info.get("last_write_at")
+    if stamped is not None and now - _as_utc(stamped) < _STAMP_REFRESH:
+        return
+    from app.models import User
+    session.execute(
+        update(User)
+        .where(User.id == session.info["user_id"])
+        .values(last_write_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    session.info["last_write_at"] = now
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info["wrote"] = True
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,195 @@
+"""
+Idempotency-Key support for the create endpoints.
+
+The frontend retries requests that failed on the network, and a retry of a
+create that did reach the server would otherwise create a duplicate. When
+a request carries an Idempotency-Key header, its response is stored under
+that key and a retry gets the stored response back, at the cost of one
+indexed lookup instead of the full write path.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import delete, event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import IdempotencyKey
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# Where stored responses are kept:
+#   "database" - idempotency_keys table, shared by every worker and node
+#   "memory"   - bounded per-process cache, for single-worker setups
+IDEMPOTENCY_BACKEND = settings.idempotency_backend
+
+# A retry later than this creates a new row
+IDEMPOTENCY_TTL = settings.idempotency_ttl
+
+# Upper bound on responses kept by the in-memory backend
+MAX_CACHED_RESPONSES = settings.idempotency_max_cached_responses
+
+
+# ============= BACKENDS =============
+
+class DatabaseBackend:
+    """
+    Responses stored in the idempotency_keys table.
+
+    The key is written in the same transaction as the created row, so
+    either both exist or neither does. Expired keys are deleted by the
+    purger.
+    """
+
+    def get(self, db: Session, user_id: int, key: str) -> Optional[tuple]:
+        cutoff = datetime.now(timezone.utc) - IDEMPOTENCY_TTL
+        return db.query(
+            IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body
+        ).filter(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at > cutoff
+        ).first()
+
+    def put(self, db: Session, user_id: int, key: str, request_hash: str, status_code: int, body) -> None:
+        # An expired key the purger hasn't removed yet would still hold the
+        # unique index; the new response replaces it
+        cutoff = datetime.now(timezone.utc) - IDEMPOTENCY_TTL
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.created_at <= cutoff
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        db.add(IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            status_code=status_code,
+            response_body=body
+        ))
+
+
+class InMemoryBackend:
+    """
+    Responses kept in a bounded, process-local LRU dict.
+
+    Entries are (expires_at, request_hash, status_code, body) tuples. A
+    response is only cached once its transaction commits. Two copies of a
+    request running at the same moment are not deduplicated, and other
+    workers don't see the cache; use the database backend for that.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int, key: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[(user_id, key)]
+                return None
+            self._entries.move_to_end((user_id, key))
+        return entry[1:]
+
+    def put(self, db: Session, user_id: int, key: str, request_hash: str, status_code: int, body) -> None:
+        # Cached by _cache_committed_responses once the commit succeeds
+        db.info.setdefault("idempotent_responses", []).append(
+            (user_id, key, request_hash, status_code, body)
+        )
+
+    def add(self, user_id: int, key: str, request_hash: str, status_code: int, body) -> None:
+        expires_at = time.monotonic() + IDEMPOTENCY_TTL.total_seconds()
+        with self._lock:
+            self._entries[(user_id, key)] = (expires_at, request_hash, status_code, body)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+if IDEMPOTENCY_BACKEND == "memory":
+    backend = InMemoryBackend()
+else:
+    backend = DatabaseBackend()
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_responses(session):
+    for entry in session.info.pop("idempotent_responses", []):
+        backend.add(*entry)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_uncommitted_responses(session):
+    session.info.pop("idempotent_responses", None)
+
+
+# ============= HELPERS =============
+
+def request_fingerprint(payload: dict) -> str:
+    """SHA-256 of a request body, independent of key order."""
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def get_stored_response(db: Session, user_id: int, key: str, request_hash: str) -> Optional[JSONResponse]:
+    """
+    Return the stored response for key, or None if there isn't one.
+
+    Raises:
+        HTTPException 422 if the key was used with a different request body
+    """
+    stored = backend.get(db, user_id, key)
+    if stored is None:
+        return None
+    stored_hash, status_code, body = stored
+    if stored_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return JSONResponse(status_code=status_code, content=body, headers={"Idempotent-Replayed": "true"})
+
+
+def save_response(db: Session, user_id: int, key: str, request_hash: str, status_code: int, body) -> None:
+    """Store the response for key; it is kept only if the transaction commits."""
+    backend.put(db, user_id, key, request_hash, status_code, body)
+
+
+def commit_or_replay(db: Session, user_id: int, key: Optional[str], request_hash: str) -> Optional[JSONResponse]:
+    """
+    Commit the transaction holding a keyed create.
+
+    If a concurrent request with the same key committed first, the unique
+    index rejects this one; its work is rolled back and the other
+    request's response is returned instead.
+
+    Returns:
+        None when this request's changes were committed, otherwise the stored response
+    """
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        stored = get_stored_response(db, user_id, key, request_hash) if key else None
+        if stored is None:
+            raise
+        return stored
+    return None
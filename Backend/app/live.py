@@ -0,0 +1,185 @@
+"""
+Live push of invoice and client changes to connected dashboards.
+
+Each worker tails the outbox_events table (one indexed range query per
+poll, shared by all connections) and fans new events out to the WebSocket
+connections of their owner. This way a change made through any worker
+reaches every connection, without a separate message broker.
+
+Event ids become visible in commit order, not in id order, so the poller
+does not simply read past the highest id it has seen: ids it skipped
+over are remembered as gaps and read again on every poll until their
+event shows up (its transaction committed) or LIVE_GAP_TIMEOUT passes
+(it rolled back, or ran longer than that and is missed).
+
+Memory per connection is bounded: each one gets a small queue, and a
+client that falls too far behind gets its queue replaced by a single
+"resync" message, telling it to reload instead.
+"""
+
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import func, or_, select
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import OutboxEvent
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# Seconds between polls of the outbox table
+LIVE_POLL_INTERVAL = settings.live_poll_interval
+# Events fetched per poll
+LIVE_POLL_BATCH = settings.live_poll_batch
+# Messages buffered per connection before it is told to resync
+LIVE_QUEUE_SIZE = settings.live_queue_size
+# Seconds a skipped id is waited for before it is given up on
+LIVE_GAP_TIMEOUT = settings.live_gap_timeout
+# Gaps tracked at most; the oldest are given up on first
+LIVE_MAX_GAPS = 100
+
+RESYNC_MESSAGE = json.dumps({"type": "resync"})
+
+
+def _latest_event_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.coalesce(func.max(OutboxEvent.id), 0))).scalar()
+    finally:
+        db.close()
+
+
+class FeedCursor:
+    """Poller position in the outbox: the highest id seen plus the gaps below it."""
+
+    def __init__(self, last_id: int):
+        self.last_id = last_id
+        # [first id, last id, monotonic time the gap was found]
+        self.gaps: List[list] = []
+
+    def condition(self):
+        """WHERE clause for events not seen yet."""
+        return or_(
+            OutboxEvent.id > self.last_id,
+            *(OutboxEvent.id.between(first, last) for first, last, _ in self.gaps)
+        )
+
+    def advance(self, ids: List[int]) -> None:
+        """Record the ids of a poll's rows (ascending)."""
+        now = time.monotonic()
+        for event_id in ids:
+            if event_id > self.last_id:
+                if event_id > self.last_id + 1:
+                    self.gaps.append([self.last_id + 1, event_id - 1, now])
+                self.last_id = event_id
+            else:
+                self._fill(event_id)
+        self.gaps = [gap for gap in self.gaps if now - gap[2] < LIVE_GAP_TIMEOUT][-LIVE_MAX_GAPS:]
+
+    def _fill(self, event_id: int) -> None:
+        for index, (first, last, found) in enumerate(self.gaps):
+            if first <= event_id <= last:
+                rest = [[first, event_id - 1, found], [event_id + 1, last, found]]
+                self.gaps[index:index + 1] = [gap for gap in rest if gap[0] <= gap[1]]
+                return
+
+
+def _events_matching(condition) -> list:
+    db = SessionLocal()
+    try:
+        return db.execute(
+            select(
+                OutboxEvent.id,
+                OutboxEvent.user_id,
+                OutboxEvent.event_type,
+                OutboxEvent.entity_type,
+                OutboxEvent.entity_id,
+                OutboxEvent.payload,
+            )
+            .where(condition)
+            .order_by(OutboxEvent.id)
+            .limit(LIVE_POLL_BATCH)
+        ).all()
+    finally:
+        db.close()
+
+
+class Broadcaster:
+    """Per-worker fan-out of outbox events to per-user connection queues."""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Register a connection; starts the poller on first use."""
+        queue = asyncio.Queue(maxsize=LIVE_QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._poll())
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def publish(self, user_id: int, message: str) -> None:
+        """Queue a serialized message for every connection of a user."""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: drop the backlog, the client reloads instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_MESSAGE)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _poll(self) -> None:
+        cursor = FeedCursor(await asyncio.to_thread(_latest_event_id))
+        while True:
+            try:
+                rows = await asyncio.to_thread(_events_matching, cursor.condition())
+            except Exception as e:
+                # Keep polling; the database may come back
+                print(f"❌ Live update poll failed: {e}")
+                rows = []
+            cursor.advance([row.id for row in rows])
+            for row in rows:
+                if row.user_id in self._subscribers:
+                    # Serialized once, shared by all of the user's connections
+                    self.publish(row.user_id, json.dumps({
+                        "type": "event",
+                        "id": row.id,
+                        "event_type": row.event_type,
+                        "entity_type": row.entity_type,
+                        "entity_id": row.entity_id,
+                        "payload": row.payload,
+                    }))
+            if len(rows) < LIVE_POLL_BATCH:
+                await asyncio.sleep(LIVE_POLL_INTERVAL)
+
+
+broadcaster = Broadcaster()
@@ -1,53 +1,165 @@
 """
 Main FastAPI application.
+
+The application is built by create_app(). Importing this module only
+defines the routes; the app itself, the database engine and the tables
+are created when something first asks for them.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, FastAPI, Header, HTTPException, Depends, Query, Response, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql import func
+from typing import List, Optional
 
 # Import from our modules
 from app.auth import get_current_user
-from app.database import engine, get_db, Base
-from app.models import Invoice, User, Client
+from app.config import get_settings
+from app.database import get_db, get_engine, dispose_engine, Base
+from app.replicas import get_read_db
+from app.models import Invoice, InvoiceLineItem, User, Client
+from app.currency import check_currency
+from app.balances import BalanceChanges, check_client
+from app import audit
+from app.idempotency import request_fingerprint, get_stored_response, save_response, commit_or_replay
+from app.outbox import record_event, record_events
 from app.schemas import (
-    InvoiceCreate, InvoiceUpdate, InvoiceResponse,
-    ClientCreate, ClientUpdate, ClientResponse
+    InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceDetailResponse, invoice_projection,
+    ClientCreate, ClientUpdate, ClientResponse,
+    BulkDeleteRequest, BulkDeleteResponse, BulkStatusRequest, BulkStatusResponse
 )
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+settings = get_settings()
 
-# Create FastAPI application
-app = FastAPI(
-    title="Invoice API with Authentication",
-    description="An Invoice management API with user authentication built with FastAPI and PostgreSQL",
-    version="2.0.0"
-)
+# Origins allowed to call the API from a browser
+CORS_ORIGINS = settings.cors_origins
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:5173",  # Vite default port
-        "http://127.0.0.1:5173",
-     "http://167.71.34.142",
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Status changes allowed by PATCH /invoices/status (current -> targets)
+ALLOWED_STATUS_TRANSITIONS = {
+    "draft": {"sent", "paid"},
+    "sent": {"paid", "overdue"},
+    "overdue": {"paid", "sent"},
+    "paid": set(),
+}
+
+# Invoice and client routes
+router = APIRouter()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+    
+    Usage:
+    uvicorn app.main:create_app --factory
+    """
+    from fastapi.middleware.cors import CORSMiddleware
+    from app.compression import CompressionMiddleware, COMPRESSION_ENABLED
+    from app.routers import auth, pdf, reports, recurring, events, live, sync, diagnostics, audit as audit_routes
+    from app.live import broadcaster
+    from app.purge import Purger, PURGE_ENABLED
+    from app.pdf import shutdown_pool
+    from app.outbox import Dispatcher, OUTBOX_DISPATCH_ENABLED
+    
+    app = FastAPI(
+        title="Invoice API with Authentication",
+        description="An Invoice management API with user authentication built with FastAPI and PostgreSQL",
+        version="2.0.0"
+    )
+    
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    if COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    
+    # Include authentication routes
+    app.include_router(auth.router)
+    # Before the invoice routes, see app/routers/pdf.py
+    app.include_router(pdf.router)
+    app.include_router(reports.router)
+    app.include_router(router)
+    app.include_router(recurring.router)
+    app.include_router(events.router)
+    app.include_router(live.router)
+    app.include_router(sync.router)
+    app.include_router(audit_routes.router)
+    if settings.diagnostics_enabled:
+        app.include_router(diagnostics.router)
+    
+    purger = Purger()
+    dispatcher = Dispatcher()
+    
+    @app.on_event("startup")
+    def create_tables():
+        """Create database tables (skip with DB_CREATE_TABLES=false)."""
+        if settings.db_create_tables:
+            Base.metadata.create_all(bind=get_engine())
+    
+    @app.on_event("startup")
+    def start_purger():
+        """Purge soft-deleted rows in the background."""
+        if PURGE_ENABLED:
+            purger.start()
+    
+    @app.on_event("startup")
+    def start_dispatcher():
+        """Deliver outbox events to webhooks in the background."""
+        if OUTBOX_DISPATCH_ENABLED:
+            dispatcher.start()
+    
+    @app.on_event("startup")
+    def start_audit_flusher():
+        """Write audit entries in batches in the background."""
+        if audit.AUDIT_MODE == "buffered":
+            audit.audit_buffer.start()
+    
+    @app.on_event("shutdown")
+    def stop_purger():
+        purger.stop()
+    
+    @app.on_event("shutdown")
+    def stop_dispatcher():
+        dispatcher.stop()
+    
+    @app.on_event("shutdown")
+    async def stop_live_updates():
+        await broadcaster.stop()
+    
+    @app.on_event("shutdown")
+    def stop_pdf_pool():
+        shutdown_pool()
+    
+    @app.on_event("shutdown")
+    def flush_audit_log():
+        """Write buffered audit entries before the connections go away."""
+        audit.audit_buffer.stop()
+    
+    @app.on_event("shutdown")
+    def close_database_connections():
+        """Close pooled connections once in-flight requests have drained."""
+        dispose_engine()
+    
+    return app
 
-# Include authentication routes
-from app.routers import auth
-app.include_router(auth.router)
+
+def __getattr__(name):
+    # `uvicorn app.main:app` still works: the app is built on first access
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ============= ROOT ENDPOINT =============
 
-@app.get("/")
+@router.get("/")
 def root():
     """
     Root endpoint - API information.
@@ -58,29 +170,115 @@ def root():
         "version": "2.0.0",
         "endpoints": {
             "auth": "/auth/register, /auth/token, /auth/me",
-            "invoices": "/invoices"
+            "invoices": "/invoices",
+            "reports": "/invoices/summary"
         }
     }
 
 
+# ============= OPTIMISTIC CONCURRENCY =============
+
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def _expected_version(if_match: Optional[str], body_version: Optional[int], current_version: int) -> tuple:
+    """
+    Pick the version an update must apply to and the status of a conflict.
+    
+    An If-Match header ("3", W/"3") takes precedence and fails with 412,
+    a version in the body fails with 409. Without either the update still
+    only applies to the version the handler just read, so a concurrent
+    write in between is reported instead of overwritten.
+    
+    Returns:
+        (expected version, status code to use on conflict)
+    """
+    if if_match and if_match.strip() != "*":
+        try:
+            return int(if_match.strip().removeprefix("W/").strip('"')), status.HTTP_412_PRECONDITION_FAILED
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="If-Match must be an ETag returned by this API"
+            )
+    if body_version is not None:
+        return body_version, status.HTTP_409_CONFLICT
+    return current_version, status.HTTP_409_CONFLICT
+
+
+def _version_conflict(entity: str, entity_id: int, status_code: int) -> HTTPException:
+    return HTTPException(
+        status_code=status_code,
+        detail=f"{entity} with id {entity_id} was changed by someone else, reload it and try again"
+    )
+
+
 # ============= INVOICE ENDPOINTS =============
 
-@app.post(
+def _write_line_items(db: Session, invoice_id: int, line_items: List[dict], replace: bool = False):
+    """
+    Store an invoice's line items and let the database recompute its amount.
+    
+    All items go in one batched INSERT; the invoice amount is then set to
+    the sum of the generated line amounts by a single UPDATE, so totals stay
+    consistent without recomputing them in Python on read.
+    
+    Returns:
+        The new invoice (amount, base_amount)
+    """
+    if replace:
+        db.execute(delete(InvoiceLineItem).where(InvoiceLineItem.invoice_id == invoice_id))
+    if line_items:
+        db.execute(
+            insert(InvoiceLineItem),
+            [
+                {**item, "invoice_id": invoice_id, "position": position}
+                for position, item in enumerate(line_items)
+            ]
+        )
+    total = select(func.coalesce(func.sum(InvoiceLineItem.amount), 0)).where(
+        InvoiceLineItem.invoice_id == invoice_id
+    ).scalar_subquery()
+    return db.execute(
+        update(Invoice).where(Invoice.id == invoice_id).values(amount=total)
+        .returning(Invoice.amount, Invoice.base_amount)
+    ).one()
+
+
+@router.post(
     "/invoices",
-    response_model=InvoiceResponse,
+    response_model=InvoiceDetailResponse,
     status_code=status.HTTP_201_CREATED,
     tags=["invoices"]
 )
 def create_invoice(
     invoice: InvoiceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
-    """Create a new invoice for the current user."""
+    """
+    Create a new invoice for the current user.
+    
+    Send an Idempotency-Key header to make retries safe: a repeated request
+    with the same key returns the first response instead of failing on the
+    duplicate invoice number.
+    """
+    request_hash = request_fingerprint(invoice.model_dump(mode="json"))
+    if idempotency_key:
+        stored = get_stored_response(db, current_user.id, idempotency_key, request_hash)
+        if stored:
+            return stored
+    
+    rate_to_base = check_currency(db, invoice.currency)
+    check_client(db, current_user.id, invoice.client_id)
+    
     # Check if invoice_number already exists for this user
     existing = db.query(Invoice).filter(
         Invoice.invoice_number == invoice.invoice_number,
-        Invoice.user_id == current_user.id
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None)
     ).first()
     if existing:
         raise HTTPException(
@@ -89,16 +287,52 @@ def create_invoice(
         )
     
     # Create invoice with user_id set to current user
-    invoice_data = invoice.model_dump()
+    invoice_data = invoice.model_dump(exclude={"line_items"})
     invoice_data["user_id"] = current_user.id
-    db_invoice = Invoice(**invoice_data)
+    if invoice.line_items:
+        # Placeholder, the database sets the total from the line items
+        invoice_data["amount"] = 0
+    db_invoice = Invoice(**invoice_data, rate_to_base=rate_to_base)
     db.add(db_invoice)
-    db.commit()
+    db.flush()
+    base_amount = db_invoice.base_amount
+    if invoice.line_items:
+        _, base_amount = _write_line_items(db, db_invoice.id, [item.model_dump() for item in invoice.line_items])
+        # Computed by the database, not known here
+        invoice_data.pop("amount")
+    balances = BalanceChanges()
+    balances.add(invoice.client_id, invoice.status, base_amount)
+    balances.apply(db)
+    record_event(db, current_user.id, "invoice.created", db_invoice.id, {"id": db_invoice.id, **invoice_data})
+    if idempotency_key:
+        db.refresh(db_invoice)
+        body = InvoiceDetailResponse.model_validate(db_invoice).model_dump(mode="json")
+        save_response(db, current_user.id, idempotency_key, request_hash, status.HTTP_201_CREATED, body)
+    stored = commit_or_replay(db, current_user.id, idempotency_key, request_hash)
+    if stored:
+        return stored
     db.refresh(db_invoice)
     return db_invoice
 
 
-@app.get(
+def _invoice_fields(fields: str) -> tuple:
+    """
+    Parse a fields= list of InvoiceResponse fields, id first.
+    
+    Raises:
+        HTTPException 400 on an unknown field
+    """
+    selected = ["id"] + [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in InvoiceResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(InvoiceResponse.model_fields)}"
+        )
+    return tuple(dict.fromkeys(selected))
+
+
+@router.get(
     "/invoices",
     response_model=List[InvoiceResponse],
     tags=["invoices"]
@@ -107,12 +341,22 @@ def get_invoices(
     skip: int = 0,
     limit: int = 100,
     status: str = None,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(None, max_length=500),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all invoices for the current user with optional filtering by status."""
+    """
+    Get all invoices for the current user with optional filtering by status.
+    
+    fields=id,invoice_number,amount returns only those fields (id is always
+    included) and only selects those columns, e.g. to leave out the long
+    descriptions when rendering a list.
+    """
     # Filter by current user's invoices
-    query = db.query(Invoice).filter(Invoice.user_id == current_user.id)
+    query = db.query(Invoice).filter(
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None)
+    )
     if status is not None:
         if status not in ["draft", "sent", "paid", "overdue"]:
             raise HTTPException(
@@ -120,48 +364,74 @@ def get_invoices(
                 detail="Status must be one of: draft, sent, paid, overdue"
             )
         query = query.filter(Invoice.status == status)
+    if fields is not None:
+        selected = _invoice_fields(fields)
+        rows = query.with_entities(*[getattr(Invoice, field) for field in selected]).offset(skip).limit(limit).all()
+        adapter = invoice_projection(selected)
+        return Response(
+            adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+            media_type="application/json"
+        )
     invoices = query.offset(skip).limit(limit).all()
     return invoices
 
 
-@app.get(
+@router.get(
     "/invoices/{invoice_id}",
-    response_model=InvoiceResponse,
+    response_model=InvoiceDetailResponse,
     tags=["invoices"]
 )
 def get_invoice(
     invoice_id: int, 
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a single invoice by ID (only if it belongs to the current user)."""
-    invoice = db.query(Invoice).filter(
+    """
+    Get a single invoice by ID (only if it belongs to the current user).
+    
+    The ETag header carries the invoice version, send it back as If-Match
+    when updating.
+    """
+    invoice = db.query(Invoice).options(selectinload(Invoice.line_items)).filter(
         Invoice.id == invoice_id,
-        Invoice.user_id == current_user.id
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None)
     ).first()
     if not invoice:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Invoice with id {invoice_id} not found"
         )
+    response.headers["ETag"] = _etag(invoice.version)
     return invoice
 
 
-@app.put(
+@router.put(
     "/invoices/{invoice_id}",
-    response_model=InvoiceResponse,
+    response_model=InvoiceDetailResponse,
     tags=["invoices"]
 )
 def update_invoice(
     invoice_id: int,
     invoice_update: InvoiceUpdate,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
 ):
-    """Update an existing invoice (only if it belongs to the current user)."""
+    """
+    Update an existing invoice (only if it belongs to the current user).
+    
+    The change is written by one UPDATE ... WHERE version = ?, so it only
+    applies to the version it is based on (If-Match header or version in
+    the body). A conflicting concurrent change returns 412 or 409 instead
+    of being overwritten, without holding row locks while the handler runs.
+    """
     invoice = db.query(Invoice).filter(
         Invoice.id == invoice_id,
-        Invoice.user_id == current_user.id
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None)
     ).first()
     if not invoice:
         raise HTTPException(
@@ -171,11 +441,15 @@ def update_invoice(
     
     # Check if invoice_number is being updated and if it already exists for this user
     update_data = invoice_update.model_dump(exclude_unset=True)
+    expected_version, conflict_status = _expected_version(
+        if_match, update_data.pop("version", None), invoice.version
+    )
     if "invoice_number" in update_data:
         existing = db.query(Invoice).filter(
             Invoice.invoice_number == update_data["invoice_number"],
             Invoice.user_id == current_user.id,
-            Invoice.id != invoice_id
+            Invoice.id != invoice_id,
+            Invoice.deleted_at.is_(None)
         ).first()
         if existing:
             raise HTTPException(
@@ -183,15 +457,72 @@ def update_invoice(
                 detail=f"Invoice with number '{update_data['invoice_number']}' already exists"
             )
     
-    for field, value in update_data.items():
-        setattr(invoice, field, value)
+    # A new currency is booked at its current rate
+    booked = {}
+    if "currency" in update_data:
+        booked["rate_to_base"] = check_currency(db, update_data["currency"])
+    if "client_id" in update_data:
+        check_client(db, current_user.id, update_data["client_id"])
+    if "amount" in update_data and db.query(
+        db.query(InvoiceLineItem).filter(InvoiceLineItem.invoice_id == invoice_id).exists()
+    ).scalar():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The amount of an invoice with line items is computed from them, update line_items instead"
+        )
+    
+    previous_status = invoice.status
+    before = {field: getattr(invoice, field) for field in update_data if field != "line_items"}
+    before["amount"] = invoice.amount
+    balances = BalanceChanges()
+    # The version check below guarantees this is the state being replaced
+    balances.remove(invoice.client_id, invoice.status, invoice.base_amount)
+    # exclude_unset above would also drop defaulted fields (quantity) of
+    # each line item; they are dumped in full
+    line_items = None
+    if update_data.pop("line_items", None) is not None:
+        line_items = [item.model_dump() for item in invoice_update.line_items]
+    changes = dict(update_data)
+    if line_items is not None:
+        changes["line_items"] = line_items
+    updated = db.execute(
+        update(Invoice)
+        .where(Invoice.id == invoice_id, Invoice.version == expected_version)
+        .values(**update_data, **booked, version=Invoice.version + 1)
+        .returning(Invoice.version, Invoice.client_id, Invoice.status, Invoice.amount, Invoice.base_amount)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if updated is None:
+        db.rollback()
+        raise _version_conflict("Invoice", invoice_id, conflict_status)
+    new_version = updated.version
+    
+    amount, base_amount = updated.amount, updated.base_amount
+    if line_items is not None:
+        amount, base_amount = _write_line_items(db, invoice.id, line_items, replace=True)
+    balances.add(updated.client_id, updated.status, base_amount)
+    balances.apply(db)
+    audit.record(
+        db, current_user.id, "invoice", invoice.id, "updated",
+        audit.diff(before, {**update_data, "amount": amount}), new_version
+    )
+    
+    if update_data.get("status", previous_status) != previous_status:
+        record_event(db, current_user.id, "invoice.status_changed", invoice.id, {
+            "id": invoice.id, "version": new_version, "previous_status": previous_status, "changes": changes
+        })
+    else:
+        record_event(db, current_user.id, "invoice.updated", invoice.id, {
+            "id": invoice.id, "version": new_version, "changes": changes
+        })
     
     db.commit()
     db.refresh(invoice)
+    response.headers["ETag"] = _etag(invoice.version)
     return invoice
 
 
-@app.delete(
+@router.delete(
     "/invoices/{invoice_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["invoices"]
@@ -201,25 +532,169 @@ def delete_invoice(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete an invoice (only if it belongs to the current user)."""
-    invoice = db.query(Invoice).filter(
-        Invoice.id == invoice_id,
-        Invoice.user_id == current_user.id
+    """
+    Delete an invoice (only if it belongs to the current user).
+    
+    The invoice is soft deleted with a single UPDATE; the background purger
+    removes the row later in small batches.
+    """
+    deleted = db.execute(
+        update(Invoice)
+        .where(
+            Invoice.id == invoice_id,
+            Invoice.user_id == current_user.id,
+            Invoice.deleted_at.is_(None)
+        )
+        .values(deleted_at=func.now(), version=Invoice.version + 1)
+        .returning(Invoice.version, Invoice.client_id, Invoice.status, Invoice.base_amount)
+        .execution_options(synchronize_session=False)
     ).first()
-    if not invoice:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Invoice with id {invoice_id} not found"
         )
     
-    db.delete(invoice)
+    balances = BalanceChanges()
+    balances.remove(deleted.client_id, deleted.status, deleted.base_amount)
+    balances.apply(db)
+    audit.record(db, current_user.id, "invoice", invoice_id, "deleted", version=deleted.version)
+    record_event(db, current_user.id, "invoice.deleted", invoice_id, {"id": invoice_id})
     db.commit()
     return None
 
 
+@router.post(
+    "/invoices/bulk-delete",
+    response_model=BulkDeleteResponse,
+    tags=["invoices"]
+)
+def bulk_delete_invoices(
+    request: BulkDeleteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Soft delete many invoices of the current user in one statement."""
+    deleted = db.execute(
+        update(Invoice)
+        .where(
+            Invoice.id.in_(request.ids),
+            Invoice.user_id == current_user.id,
+            Invoice.deleted_at.is_(None)
+        )
+        .values(deleted_at=func.now(), version=Invoice.version + 1)
+        .returning(Invoice.id, Invoice.version, Invoice.client_id, Invoice.status, Invoice.base_amount)
+        .execution_options(synchronize_session=False)
+    ).all()
+    balances = BalanceChanges()
+    for row in deleted:
+        balances.remove(row.client_id, row.status, row.base_amount)
+    balances.apply(db)
+    audit.record_many(db, current_user.id, "invoice", "deleted", (
+        (row.id, None, row.version) for row in deleted
+    ))
+    deleted_ids = [row.id for row in deleted]
+    record_events(db, current_user.id, "invoice.deleted", deleted_ids)
+    db.commit()
+    return {"deleted": len(deleted_ids)}
+
+
+@router.patch(
+    "/invoices/status",
+    response_model=BulkStatusResponse,
+    tags=["invoices"]
+)
+def bulk_update_invoice_status(
+    request: BulkStatusRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Move many invoices of the current user to a new status in one statement.
+    
+    Select the invoices by ids or by a filter. Only invoices whose current
+    status may move to the target (ALLOWED_STATUS_TRANSITIONS) are changed,
+    the others are left alone. The selected rows are locked and updated by
+    one UPDATE ... FROM, which also returns each row's previous status.
+    """
+    sources = [
+        current for current, targets in ALLOWED_STATUS_TRANSITIONS.items()
+        if request.status in targets
+    ]
+    conditions = [
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None),
+        Invoice.status.in_(sources),
+    ]
+    if request.ids is not None:
+        conditions.append(Invoice.id.in_(request.ids))
+    else:
+        selected = request.filter
+        if selected.status is not None:
+            conditions.append(Invoice.status == selected.status)
+        if selected.due_before is not None:
+            conditions.append(Invoice.due_date < selected.due_before)
+        if selected.issued_from is not None:
+            conditions.append(Invoice.issue_date >= selected.issued_from)
+        if selected.issued_to is not None:
+            conditions.append(Invoice.issue_date <= selected.issued_to)
+        if selected.customer_name is not None:
+            conditions.append(Invoice.customer_name == selected.customer_name)
+    
+    previous = (
+        select(Invoice.id, Invoice.status.label("previous_status"))
+        .where(*conditions)
+        .with_for_update()
+        .subquery()
+    )
+    rows = db.execute(
+        update(Invoice)
+        .where(Invoice.id == previous.c.id)
+        .values(status=request.status, version=Invoice.version + 1)
+        .returning(
+            Invoice.id, Invoice.version, Invoice.client_id, Invoice.base_amount, previous.c.previous_status
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    
+    transitions = {}
+    balances = BalanceChanges()
+    for row in rows:
+        transitions[row.previous_status] = transitions.get(row.previous_status, 0) + 1
+        balances.remove(row.client_id, row.previous_status, row.base_amount)
+        balances.add(row.client_id, request.status, row.base_amount)
+    balances.apply(db)
+    audit.record_many(db, current_user.id, "invoice", "updated", (
+        (row.id, {"status": {"old": row.previous_status, "new": request.status}}, row.version)
+        for row in rows
+    ))
+    record_events(
+        db, current_user.id, "invoice.status_changed",
+        [row.id for row in rows],
+        [
+            {
+                "id": row.id,
+                "version": row.version,
+                "previous_status": row.previous_status,
+                "changes": {"status": request.status},
+            }
+            for row in rows
+        ]
+    )
+    db.commit()
+    
+    updated_ids = sorted(row.id for row in rows)
+    updated = set(updated_ids)
+    return {
+        "updated_ids": updated_ids,
+        "transitions": transitions,
+        "skipped_ids": [invoice_id for invoice_id in request.ids or [] if invoice_id not in updated],
+    }
+
+
 # ============= CLIENT ENDPOINTS =============
 
-@app.post(
+@router.post(
     "/clients",
     response_model=ClientResponse,
     status_code=status.HTTP_201_CREATED,
@@ -228,19 +703,39 @@ def delete_invoice(
 def create_client(
     client: ClientCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
-    """Create a new client for the current user."""
+    """
+    Create a new client for the current user.
+    
+    A repeated request with the same Idempotency-Key header returns the
+    first response instead of creating a duplicate client.
+    """
+    request_hash = request_fingerprint(client.model_dump(mode="json"))
+    if idempotency_key:
+        stored = get_stored_response(db, current_user.id, idempotency_key, request_hash)
+        if stored:
+            return stored
+    
     client_data = client.model_dump()
     client_data["user_id"] = current_user.id
     db_client = Client(**client_data)
     db.add(db_client)
-    db.commit()
+    db.flush()
+    record_event(db, current_user.id, "client.created", db_client.id, {"id": db_client.id, **client_data})
+    if idempotency_key:
+        db.refresh(db_client)
+        body = ClientResponse.model_validate(db_client).model_dump(mode="json")
+        save_response(db, current_user.id, idempotency_key, request_hash, status.HTTP_201_CREATED, body)
+    stored = commit_or_replay(db, current_user.id, idempotency_key, request_hash)
+    if stored:
+        return stored
     db.refresh(db_client)
     return db_client
 
 
-@app.get(
+@router.get(
     "/clients",
     response_model=List[ClientResponse],
     tags=["clients"]
@@ -248,40 +743,58 @@ def create_client(
 def get_clients(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    sort: Optional[str] = Query(None, pattern="^outstanding$"),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all clients for the current user."""
-    clients = db.query(Client).filter(
-        Client.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    """
+    Get all clients for the current user.
+    
+    sort=outstanding lists the clients owing the most first, read straight
+    off the ix_clients_user_outstanding index.
+    """
+    query = db.query(Client).filter(
+        Client.user_id == current_user.id,
+        Client.deleted_at.is_(None)
+    )
+    if sort == "outstanding":
+        query = query.order_by(Client.outstanding_amount.desc(), Client.id)
+    clients = query.offset(skip).limit(limit).all()
     return clients
 
 
-@app.get(
+@router.get(
     "/clients/{client_id}",
     response_model=ClientResponse,
     tags=["clients"]
 )
 def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a single client by ID (only if it belongs to the current user)."""
+    """
+    Get a single client by ID (only if it belongs to the current user).
+    
+    The ETag header carries the client version, send it back as If-Match
+    when updating.
+    """
     client = db.query(Client).filter(
         Client.id == client_id,
-        Client.user_id == current_user.id
+        Client.user_id == current_user.id,
+        Client.deleted_at.is_(None)
     ).first()
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Client with id {client_id} not found"
         )
+    response.headers["ETag"] = _etag(client.version)
     return client
 
 
-@app.put(
+@router.put(
     "/clients/{client_id}",
     response_model=ClientResponse,
     tags=["clients"]
@@ -289,13 +802,21 @@ def get_client(
 def update_client(
     client_id: int,
     client_update: ClientUpdate,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    if_match: Optional[str] = Header(None)
 ):
-    """Update an existing client (only if it belongs to the current user)."""
+    """
+    Update an existing client (only if it belongs to the current user).
+    
+    Like invoice updates, only applies to the version it is based on and
+    returns 412 or 409 on a conflicting concurrent change.
+    """
     client = db.query(Client).filter(
         Client.id == client_id,
-        Client.user_id == current_user.id
+        Client.user_id == current_user.id,
+        Client.deleted_at.is_(None)
     ).first()
     if not client:
         raise HTTPException(
@@ -304,15 +825,32 @@ def update_client(
         )
     
     update_data = client_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(client, field, value)
+    expected_version, conflict_status = _expected_version(
+        if_match, update_data.pop("version", None), client.version
+    )
+    before = {field: getattr(client, field) for field in update_data}
+    new_version = db.execute(
+        update(Client)
+        .where(Client.id == client_id, Client.version == expected_version)
+        .values(**update_data, version=Client.version + 1)
+        .returning(Client.version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if new_version is None:
+        db.rollback()
+        raise _version_conflict("Client", client_id, conflict_status)
     
+    audit.record(db, current_user.id, "client", client.id, "updated", audit.diff(before, update_data), new_version)
+    record_event(db, current_user.id, "client.updated", client.id, {
+        "id": client.id, "version": new_version, "changes": update_data
+    })
     db.commit()
     db.refresh(client)
+    response.headers["ETag"] = _etag(client.version)
     return client
 
 
-@app.delete(
+@router.delete(
     "/clients/{client_id}",
     status_code=status.HTTP_204_NO_CONTENT,
     tags=["clients"]
@@ -322,17 +860,61 @@ def delete_client(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a client (only if it belongs to the current user)."""
-    client = db.query(Client).filter(
-        Client.id == client_id,
-        Client.user_id == current_user.id
-    ).first()
-    if not client:
+    """
+    Delete a client (only if it belongs to the current user).
+    
+    The client is soft deleted with a single UPDATE; the background purger
+    removes the row later in small batches.
+    """
+    new_version = db.execute(
+        update(Client)
+        .where(
+            Client.id == client_id,
+            Client.user_id == current_user.id,
+            Client.deleted_at.is_(None)
+        )
+        .values(deleted_at=func.now(), version=Client.version + 1)
+        .returning(Client.version)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if new_version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Client with id {client_id} not found"
         )
     
-    db.delete(client)
+    audit.record(db, current_user.id, "client", client_id, "deleted", version=new_version)
+    record_event(db, current_user.id, "client.deleted", client_id, {"id": client_id})
+    db.commit()
+    return None
+
+
+@router.post(
+    "/clients/bulk-delete",
+    response_model=BulkDeleteResponse,
+    tags=["clients"]
+)
+def bulk_delete_clients(
+    request: BulkDeleteRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Soft delete many clients of the current user in one statement."""
+    deleted = db.execute(
+        update(Client)
+        .where(
+            Client.id.in_(request.ids),
+            Client.user_id == current_user.id,
+            Client.deleted_at.is_(None)
+        )
+        .values(deleted_at=func.now(), version=Client.version + 1)
+        .returning(Client.id, Client.version)
+        .execution_options(synchronize_session=False)
+    ).all()
+    audit.record_many(db, current_user.id, "client", "deleted", (
+        (row.id, None, row.version) for row in deleted
+    ))
+    deleted_ids = [row.id for row in deleted]
+    record_events(db, current_user.id, "client.deleted", deleted_ids)
     db.commit()
-    return None
\ No newline at end of file
+    return {"deleted": len(deleted_ids)}
@@ -1,9 +1,24 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Numeric, Date, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Numeric, Date, ForeignKey, Index, Computed, JSON, Sequence
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import next_value
 from app.database import Base
 from decimal import Decimal
 
+# Change sequence shared by invoices and clients. Every insert and update
+# (soft deletes included) takes the next value, so GET /sync can ask for
+# "everything after N" with one index range scan per table.
+CHANGE_SEQ = Sequence("change_seq")
+
+
+@compiles(next_value, "sqlite")
+def _sqlite_next_value(element, compiler, **kw):
+    # SQLite (local testing) has no sequences: updates keep change_seq as
+    # it is (SET change_seq = change_seq) and inserts leave it NULL, so
+    # GET /sync needs Postgres
+    return "change_seq"
+
 class Invoice(Base):
     __tablename__ = "invoices"
     
@@ -12,21 +27,81 @@ class Invoice(Base):
     customer_name = Column(String, nullable=False)
     customer_email = Column(String, nullable=True)
     amount = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(3), default="USD", server_default="USD", nullable=False)  # ISO 4217 code
     status = Column(String, default="draft", nullable=False)  # draft, sent, paid, overdue
     description = Column(String, nullable=True)
     issue_date = Column(Date, nullable=False)
     due_date = Column(Date, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    # Value of one unit of currency in the base currency, booked when the
+    # invoice is created or its currency changes; base_amount follows amount
+    rate_to_base = Column(Numeric(18, 8), default=1, server_default="1", nullable=False)
+    base_amount = Column(Numeric(12, 2), Computed("round(amount * rate_to_base, 2)", persisted=True))
+    # Client billed; counts towards that client's balances (app/balances.py)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Soft delete marker - set on delete, the row is purged later in batches
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Position in the change sequence, bumped on every write
+    change_seq = Column(BigInteger, CHANGE_SEQ, onupdate=CHANGE_SEQ.next_value())
+    # Optimistic concurrency: updates only apply to the version they read
+    version = Column(Integer, default=1, server_default="1", nullable=False)
     
     # Relationship to User
     user = relationship("User", back_populates="invoices")
+    # Relationship to InvoiceLineItem (load with selectinload on detail views)
+    line_items = relationship(
+        "InvoiceLineItem",
+        back_populates="invoice",
+        order_by="InvoiceLineItem.position",
+        passive_deletes=True
+    )
+    
+    __table_args__ = (
+        # Live invoices per user; deleted rows are left out of the index
+        Index(
+            "ix_invoices_user_live", "user_id", "invoice_number",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None)
+        ),
+        # Lets the purger find deleted rows without scanning live ones
+        Index(
+            "ix_invoices_deleted_at", "deleted_at",
+            postgresql_where=deleted_at.isnot(None),
+            sqlite_where=deleted_at.isnot(None)
+        ),
+        # Delta sync: WHERE user_id = ? AND change_seq > ? ORDER BY change_seq
+        Index("ix_invoices_user_change_seq", "user_id", "change_seq"),
+    )
     
     def __repr__(self):
         return f"<Invoice(id={self.id}, invoice_number='{self.invoice_number}', customer_name='{self.customer_name}', amount={self.amount}, status='{self.status}')>"
 
 
+class InvoiceLineItem(Base):
+    """
+    A single billed line of an invoice.
+    amount is a generated column, and the invoice amount is the sum of its
+    line items, written by the database whenever the items change.
+    """
+    __tablename__ = "invoice_line_items"
+    
+    id = Column(Integer, primary_key=True)
+    invoice_id = Column(Integer, ForeignKey("invoices.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    description = Column(String, nullable=False)
+    quantity = Column(Numeric(10, 2), nullable=False)
+    unit_price = Column(Numeric(10, 2), nullable=False)
+    amount = Column(Numeric(12, 2), Computed("quantity * unit_price", persisted=True))
+    
+    # Relationship to Invoice
+    invoice = relationship("Invoice", back_populates="line_items")
+    
+    def __repr__(self):
+        return f"<InvoiceLineItem(id={self.id}, invoice_id={self.invoice_id}, amount={self.amount})>"
+
+
 class User(Base):
     """
     User database model for authentication.
@@ -48,11 +123,22 @@ class User(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Last committed write by the user; keeps their reads on the primary
+    # for READ_YOUR_WRITES_WINDOW (see app.database)
+    last_write_at = Column(DateTime(timezone=True), nullable=True)
     
     # Relationship to Invoice
     invoices = relationship("Invoice", back_populates="user")
     # Relationship to Client
     clients = relationship("Client", back_populates="user")
+    # Relationship to RefreshToken
+    refresh_tokens = relationship("RefreshToken", back_populates="user")
+    
+    __table_args__ = (
+        # Serves email prefix searches (LIKE 'abc%') regardless of the
+        # database collation; the plain unique index only serves equality
+        Index("ix_users_email_prefix", "email", postgresql_ops={"email": "text_pattern_ops"}),
+    )
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}')>"
@@ -75,9 +161,281 @@ class Client(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Soft delete marker - set on delete, the row is purged later in batches
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # Position in the change sequence, bumped on every write
+    change_seq = Column(BigInteger, CHANGE_SEQ, onupdate=CHANGE_SEQ.next_value())
+    # Optimistic concurrency: updates only apply to the version they read
+    version = Column(Integer, default=1, server_default="1", nullable=False)
+    # Receivables from this client's invoices, maintained incrementally
+    # by app/balances.py as invoices change
+    outstanding_amount = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)  # sent + overdue
+    overdue_amount = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
+    paid_amount = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
     
     # Relationship to User
     user = relationship("User", back_populates="clients")
     
+    __table_args__ = (
+        # Live clients per user; deleted rows are left out of the index
+        Index(
+            "ix_clients_user_live", "user_id", "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None)
+        ),
+        # Lets the purger find deleted rows without scanning live ones
+        Index(
+            "ix_clients_deleted_at", "deleted_at",
+            postgresql_where=deleted_at.isnot(None),
+            sqlite_where=deleted_at.isnot(None)
+        ),
+        # Delta sync: WHERE user_id = ? AND change_seq > ? ORDER BY change_seq
+        Index("ix_clients_user_change_seq", "user_id", "change_seq"),
+        # GET /clients?sort=outstanding, live clients only
+        Index(
+            "ix_clients_user_outstanding", "user_id", outstanding_amount.desc(), "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None)
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<Client(id={self.id}, name='{self.name}', email='{self.email}')>"
+
+
+class RefreshToken(Base):
+    """
+    Long-lived refresh token used to renew access tokens without a password.
+    Only a SHA-256 digest of the token is stored, never the token itself.
+    Tokens issued from the same login share a family_id so that reuse of a
+    rotated token can revoke the whole chain.
+    """
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(String(32), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationship to User
+    user = relationship("User", back_populates="refresh_tokens")
+    
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id='{self.family_id}')>"
+
+
+class OutboxEvent(Base):
+    """
+    Change event for an invoice or client (transactional outbox).
+    Written in the same commit as the change itself, then delivered to the
+    user's webhook by the dispatcher and served by GET /events.
+    The id is the position in the change feed.
+    """
+    __tablename__ = "outbox_events"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    event_type = Column(String(50), nullable=False)  # e.g. invoice.created, client.deleted
+    entity_type = Column(String(20), nullable=False)  # invoice, client
+    entity_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Delivery state, used by the dispatcher
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        # Change feed per user: WHERE user_id = ? AND id > ? ORDER BY id
+        Index("ix_outbox_events_user_feed", "user_id", "id"),
+        # Undelivered events only, so the dispatcher never scans the history
+        Index(
+            "ix_outbox_events_pending", "next_attempt_at",
+            postgresql_where=dispatched_at.is_(None),
+            sqlite_where=dispatched_at.is_(None)
+        ),
+        # Delivered events only, for the retention purge by age
+        Index(
+            "ix_outbox_events_dispatched_created", "created_at",
+            postgresql_where=dispatched_at.isnot(None),
+            sqlite_where=dispatched_at.isnot(None)
+        ),
+    )
+    
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, event_type='{self.event_type}', entity_id={self.entity_id})>"
+
+
+class Webhook(Base):
+    """Webhook endpoint that receives a user's invoice and client events."""
+    __tablename__ = "webhooks"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    url = Column(String, nullable=False)
+    # Shared secret used to sign deliveries (X-Webhook-Signature header)
+    secret = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<Webhook(id={self.id}, user_id={self.user_id}, url='{self.url}')>"
+
+
+class SyncTombstone(Base):
+    """
+    Record of a purged invoice or client, kept so that delta sync can still
+    report the deletion to clients that were offline when it happened.
+    Written by the purger in place of the full row.
+    """
+    __tablename__ = "sync_tombstones"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    entity_type = Column(String(20), nullable=False)  # invoice, client
+    entity_id = Column(Integer, nullable=False)
+    change_seq = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_change_seq", "user_id", "change_seq"),
+    )
+    
+    def __repr__(self):
+        return f"<SyncTombstone(entity_type='{self.entity_type}', entity_id={self.entity_id})>"
+
+
+class IdempotencyKey(Base):
+    """
+    Response stored for an Idempotency-Key sent with a create request.
+    A retry with the same key gets this response back instead of creating
+    a duplicate. Written in the same commit as the created row and purged
+    once IDEMPOTENCY_TTL has passed.
+    """
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    key = Column(String(255), nullable=False)
+    # SHA-256 of the request body, a reused key with another body is rejected
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response_body = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    __table_args__ = (
+        # One lookup per retry; also makes concurrent duplicates conflict
+        Index("ix_idempotency_keys_user_key", "user_id", "key", unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<IdempotencyKey(user_id={self.user_id}, key='{self.key}')>"
+
+
+
+class ExchangeRate(Base):
+    """
+    Value of one unit of a currency in the base currency on a given date.
+    Loaded from rate files by app/currency.py and joined in SQL to convert
+    invoice amounts for reports.
+    """
+    __tablename__ = "exchange_rates"
+    
+    id = Column(Integer, primary_key=True)
+    currency = Column(String(3), nullable=False)
+    rate_date = Column(Date, nullable=False)
+    rate_to_base = Column(Numeric(18, 8), nullable=False)
+    # Set on every insert or update; max(loaded_at) tells workers their
+    # memoized rates are stale
+    loaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # Latest rate per currency on or before a date
+        Index("ix_exchange_rates_currency_date", "currency", "rate_date", unique=True),
+        # Rates version check: SELECT max(loaded_at)
+        Index("ix_exchange_rates_loaded_at", "loaded_at"),
+    )
+    
+    def __repr__(self):
+        return f"<ExchangeRate(currency='{self.currency}', rate_date={self.rate_date}, rate_to_base={self.rate_to_base})>"
+
+
+class RecurringInvoice(Base):
+    """
+    Template for an invoice issued on a schedule (subscriptions).
+    The scheduler in app/recurring.py creates an invoice from it on every
+    due date: start_date, then every interval after that.
+    """
+    __tablename__ = "recurring_invoices"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    client_id = Column(Integer, ForeignKey("clients.id", ondelete="SET NULL"), nullable=True)
+    customer_name = Column(String, nullable=False)
+    customer_email = Column(String, nullable=True)
+    amount = Column(Numeric(10, 2), nullable=False)
+    currency = Column(String(3), default="USD", server_default="USD", nullable=False)
+    description = Column(String, nullable=True)
+    # Status of the generated invoices
+    status = Column(String, default="sent", nullable=False)
+    # Generated invoices are numbered <prefix>-0001, <prefix>-0002, ...
+    invoice_number_prefix = Column(String(50), nullable=False)
+    interval = Column(String(20), nullable=False)  # weekly, monthly, quarterly, yearly
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=True)
+    # Days from issue date to due date
+    payment_terms_days = Column(Integer, default=30, nullable=False)
+    # Invoices generated so far; the next one is run number runs_generated
+    runs_generated = Column(Integer, default=0, nullable=False)
+    # Issue date of the next invoice, kept in step by the scheduler
+    next_run_date = Column(Date, nullable=False)
+    active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Due templates only, so the scheduler never scans finished ones
+        Index(
+            "ix_recurring_invoices_due", "next_run_date",
+            postgresql_where=active.is_(True),
+            sqlite_where=active.is_(True)
+        ),
+        # Two templates with one prefix would generate the same invoice numbers
+        Index("ix_recurring_invoices_user_prefix", "user_id", "invoice_number_prefix", unique=True),
+    )
+    
+    def __repr__(self):
+        return f"<RecurringInvoice(id={self.id}, interval='{self.interval}', next_run_date={self.next_run_date})>"
+
+
+class AuditEntry(Base):
+    """
+    Field-level record of a change to an invoice or client: who made it,
+    and each changed field's old and new value. Append-only; buffered and
+    written in batches by app/audit.py, after the change has committed.
+    """
+    __tablename__ = "audit_log"
+    
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    # User who made the change
+    user_id = Column(Integer, nullable=False)
+    entity_type = Column(String(20), nullable=False)  # invoice, client
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String(20), nullable=False)  # updated, deleted
+    # {"field": {"old": ..., "new": ...}}; empty for deletes
+    changes = Column(JSON, nullable=False)
+    # Entity version after the change
+    version = Column(Integer, nullable=True)
+    # When the change happened, not when the entry was flushed
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    
+    __table_args__ = (
+        # History of one entity, newest first, paged by id
+        Index("ix_audit_log_entity", "user_id", "entity_type", "entity_id", "id"),
+    )
+    
     def __repr__(self):
-        return f"<Client(id={self.id}, name='{self.name}', email='{self.email}')>"     
\ No newline at end of file
+        return f"<AuditEntry(entity_type='{self.entity_type}', entity_id={self.entity_id}, action='{self.action}')>"
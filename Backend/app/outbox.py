@@ -0,0 +1,325 @@
+"""
+Transactional outbox for invoice and client change events.
+
+Handlers call record_event()/record_events() before they commit, so an
+event exists exactly when its change does. The dispatcher then delivers
+pending events to each user's webhook in batches, retrying failed
+deliveries with exponential backoff.
+
+The dispatcher runs as a daemon thread inside each API worker (started by
+create_app), or once from the command line:
+    python -m app.outbox
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models import OutboxEvent, Webhook
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+OUTBOX_DISPATCH_ENABLED = settings.outbox_dispatch_enabled
+# Events claimed per dispatcher pass (across all users)
+DISPATCH_BATCH_SIZE = settings.dispatch_batch_size
+# Seconds between dispatcher passes when there is nothing to do
+DISPATCH_INTERVAL = settings.dispatch_interval
+DISPATCH_TIMEOUT = settings.dispatch_timeout
+# Give up on an event after this many failed deliveries
+MAX_ATTEMPTS = 10
+MAX_BACKOFF_SECONDS = 3600
+# Claimed events are hidden from other dispatchers this long; if delivery
+# never finishes (crash) they become pending again afterwards
+CLAIM_LEASE_SECONDS = 60
+# Delivered events are kept this long for GET /events, then purged
+OUTBOX_RETENTION = settings.outbox_retention
+# Allow webhooks on loopback/private addresses (local development only)
+WEBHOOK_ALLOW_PRIVATE_URLS = settings.webhook_allow_private_urls
+# Key space of the per-user pg_advisory_xact_lock(OUTBOX_LOCK_KEY, user_id)
+OUTBOX_LOCK_KEY = 7001
+
+
+# ============= RECORDING =============
+
+def _lock_users(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Hold each user's outbox lock until the transaction ends.
+
+    Event ids are taken on insert but become visible on commit, so without
+    it a lower id could appear after a higher one was already served and
+    be skipped by GET /events. Holding the lock from the insert to the
+    commit makes a user's events visible in id order; different users
+    don't wait on each other. SQLite runs one writer at a time anyway.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    locked = db.info.setdefault("outbox_locked_users", set())
+    # Always in the same order, so two multi-user jobs cannot deadlock
+    for user_id in sorted(set(user_ids) - locked):
+        db.execute(select(func.pg_advisory_xact_lock(OUTBOX_LOCK_KEY, user_id)))
+        locked.add(user_id)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _forget_locked_users(session):
+    session.info.pop("outbox_locked_users", None)
+
+
+def record_event(db: Session, user_id: int, event_type: str, entity_id: int, payload: dict) -> None:
+    """
+    Add a change event to the current transaction.
+
+    Args:
+        db: Session holding the change; the event is committed with it
+        user_id: Owner of the changed entity
+        event_type: "<entity>.<action>", e.g. "invoice.updated"
+        entity_id: Id of the changed invoice or client
+        payload: Event data (made JSON-safe here)
+    """
+    _lock_users(db, [user_id])
+    db.add(OutboxEvent(
+        user_id=user_id,
+        event_type=event_type,
+        entity_type=event_type.split(".", 1)[0],
+        entity_id=entity_id,
+        payload=jsonable_encoder(payload)
+    ))
+
+
+def record_events(
+    db: Session,
+    user_id: int,
+    event_type: str,
+    entity_ids: Iterable[int],
+    payloads: Optional[Iterable[dict]] = None
+) -> None:
+    """
+    Add one event per entity in a single batched INSERT (bulk operations).
+
+    payloads, when given, holds the payload of each entity in the same
+    order; otherwise every payload is just the entity id.
+    """
+    entity_ids = list(entity_ids)
+    if payloads is None:
+        payloads = ({"id": entity_id} for entity_id in entity_ids)
+    record_user_events(db, event_type, (
+        (user_id, entity_id, payload) for entity_id, payload in zip(entity_ids, payloads)
+    ))
+
+
+def record_user_events(db: Session, event_type: str, events: Iterable[tuple]) -> None:
+    """
+    Like record_events, for entities of several users (background jobs).
+
+    Args:
+        events: (user_id, entity_id, payload) tuples
+    """
+    rows = [
+        {
+            "user_id": user_id,
+            "event_type": event_type,
+            "entity_type": event_type.split(".", 1)[0],
+            "entity_id": entity_id,
+            "payload": jsonable_encoder(payload),
+        }
+        for user_id, entity_id, payload in events
+    ]
+    if rows:
+        _lock_users(db, (row["user_id"] for row in rows))
+        db.execute(insert(OutboxEvent), rows)
+
+
+# ============= WEBHOOK URLS =============
+
+def is_public_url(url: str) -> bool:
+    """
+    True if every address the URL's host resolves to is publicly routable.
+
+    Keeps webhooks from reaching the server's own network (loopback,
+    private, link-local such as cloud metadata at 169.254.169.254).
+    """
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    if WEBHOOK_ALLOW_PRIVATE_URLS:
+        return True
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or 443, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError):
+        return False
+    return all(ipaddress.ip_address(address[4][0].split("%", 1)[0]).is_global for address in addresses)
+
+
+def check_webhook_url(url: str) -> None:
+    """Reject webhook URLs that do not point to a public address with a 400."""
+    if not is_public_url(url):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook URL must resolve to a public address"
+        )
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """A redirect could lead a delivery to an internal address; treat it as a failure."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+_opener = urllib.request.build_opener(_NoRedirect)
+
+
+# ============= DISPATCH =============
+
+def _deliver(url: str, secret: str, events: List[OutboxEvent]) -> bool:
+    """POST a batch of events to a webhook. Returns True on a 2xx response."""
+    # Checked again at delivery: the name may resolve differently by now
+    if not is_public_url(url):
+        return False
+    body = json.dumps({
+        "events": [
+            {
+                "id": event.id,
+                "event_type": event.event_type,
+                "entity_type": event.entity_type,
+                "entity_id": event.entity_id,
+                "payload": event.payload,
+                "created_at": event.created_at.isoformat() if event.created_at else None,
+            }
+            for event in events
+        ]
+    }).encode("utf-8")
+    signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    request = urllib.request.Request(
+        url,
+        data=body,
+        method="POST",
+        headers={
+            "Content-Type": "application/json",
+            "X-Webhook-Signature": f"sha256={signature}",
+        }
+    )
+    try:
+        with _opener.open(request, timeout=DISPATCH_TIMEOUT) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def dispatch_pending(batch_size: int = DISPATCH_BATCH_SIZE) -> int:
+    """
+    Claim and deliver one batch of pending events.
+
+    Events are claimed with FOR UPDATE SKIP LOCKED and leased by pushing
+    next_attempt_at forward, so several dispatchers can run at once and no
+    row lock is held during the HTTP calls. Each user's events go out in
+    one request, in order.
+
+    Returns:
+        Number of events claimed
+    """
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    # Claimed events stay usable after the claim commit without reloading
+    db.expire_on_commit = False
+    try:
+        events = db.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.dispatched_at.is_(None), OutboxEvent.next_attempt_at <= now)
+            .order_by(OutboxEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not events:
+            return 0
+        for event in events:
+            event.next_attempt_at = now + timedelta(seconds=CLAIM_LEASE_SECONDS)
+        db.commit()
+
+        by_user = defaultdict(list)
+        for event in events:
+            by_user[event.user_id].append(event)
+        webhooks = {
+            webhook.user_id: webhook
+            for webhook in db.query(Webhook).filter(Webhook.user_id.in_(list(by_user)))
+        }
+
+        for user_id, user_events in by_user.items():
+            webhook = webhooks.get(user_id)
+            # No webhook: nothing to deliver, the change feed still has the events
+            delivered = webhook is None or _deliver(webhook.url, webhook.secret, user_events)
+            for event in user_events:
+                if delivered:
+                    event.dispatched_at = datetime.now(timezone.utc)
+                    continue
+                event.attempts += 1
+                if event.attempts >= MAX_ATTEMPTS:
+                    print(f"❌ Giving up on event {event.id} after {event.attempts} attempts")
+                    event.dispatched_at = now
+                else:
+                    backoff = min(2 ** event.attempts, MAX_BACKOFF_SECONDS)
+                    event.next_attempt_at = now + timedelta(seconds=backoff)
+
+        db.commit()
+        return len(events)
+    finally:
+        db.close()
+
+
+class Dispatcher:
+    """Delivers pending outbox events from a daemon thread."""
+
+    def __init__(self, interval: float = DISPATCH_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=DISPATCH_TIMEOUT + 5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                claimed = dispatch_pending()
+            except Exception as e:
+                # Keep the thread alive; the next pass retries
+                print(f"❌ Outbox dispatch failed: {e}")
+                claimed = 0
+            # Drain backlogs without pausing, otherwise poll
+            if claimed < DISPATCH_BATCH_SIZE:
+                self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    total = 0
+    while True:
+        claimed = dispatch_pending()
+        total += claimed
+        if claimed < DISPATCH_BATCH_SIZE:
+            break
+    print(f"✅ Dispatched {total} events")
@@ -0,0 +1,245 @@
+"""
+Invoice PDF rendering with a process pool and an on-disk render cache.
+
+Rendering is CPU-bound, so it runs in a small process pool and never ties
+up the API workers. Rendered files are cached on disk under a key derived
+from the invoice id and its last modification time, and the cache is kept
+under a size limit by evicting the least recently used files.
+
+This module deliberately imports neither FastAPI nor SQLAlchemy: pool
+processes import it on start-up and should stay light.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.config import get_settings
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+PDF_CACHE_DIR = settings.pdf_cache_dir
+PDF_CACHE_MAX_BYTES = settings.pdf_cache_max_bytes
+PDF_POOL_WORKERS = settings.pdf_pool_workers
+# Cache misses the month ZIP renders ahead of the file being streamed;
+# bounds how many rendered PDFs a download holds in memory
+PDF_ZIP_RENDER_AHEAD = PDF_POOL_WORKERS * 2
+# Seconds between directory scans that pick up files written by other
+# workers; in between, each worker counts its own writes
+PDF_CACHE_RESCAN_INTERVAL = 60
+
+# Bump when the layout changes so cached files are rendered again
+RENDER_VERSION = "2"
+
+
+# ============= RENDERING =============
+
+def _latin1(value) -> str:
+    """The core PDF fonts only cover latin-1; replace anything else."""
+    return str(value if value is not None else "").encode("latin-1", "replace").decode("latin-1")
+
+
+def render_invoice_pdf(invoice: dict) -> bytes:
+    """
+    Render an invoice to PDF.
+
+    Args:
+        invoice: Plain dict with the invoice fields and a "line_items" list
+            (plain data so it can be sent to a pool process)
+
+    Returns:
+        The PDF document
+    """
+    from fpdf import FPDF
+
+    pdf = FPDF(format="A4")
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font("Helvetica", "B", 20)
+    pdf.cell(0, 12, _latin1(f"Invoice {invoice['invoice_number']}"), new_x="LMARGIN", new_y="NEXT")
+
+    pdf.set_font("Helvetica", size=10)
+    pdf.cell(0, 6, _latin1(f"Status: {invoice['status']}"), new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 6, _latin1(f"Issue date: {invoice['issue_date']}"), new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 6, _latin1(f"Due date: {invoice['due_date']}"), new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(4)
+
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(0, 7, "Bill to", new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", size=10)
+    pdf.cell(0, 6, _latin1(invoice["customer_name"]), new_x="LMARGIN", new_y="NEXT")
+    if invoice.get("customer_email"):
+        pdf.cell(0, 6, _latin1(invoice["customer_email"]), new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(4)
+
+    if invoice.get("description"):
+        pdf.multi_cell(0, 6, _latin1(invoice["description"]), new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+    line_items = invoice.get("line_items") or []
+    if line_items:
+        pdf.set_font("Helvetica", "B", 10)
+        pdf.cell(100, 7, "Description", border="B")
+        pdf.cell(25, 7, "Qty", border="B", align="R")
+        pdf.cell(30, 7, "Unit price", border="B", align="R")
+        pdf.cell(35, 7, "Amount", border="B", align="R", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=10)
+        for item in line_items:
+            pdf.cell(100, 6, _latin1(item["description"])[:60])
+            pdf.cell(25, 6, f"{item['quantity']}", align="R")
+            pdf.cell(30, 6, f"{float(item['unit_price']):,.2f}", align="R")
+            pdf.cell(35, 6, f"{float(item['amount']):,.2f}", align="R", new_x="LMARGIN", new_y="NEXT")
+        pdf.ln(2)
+
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(155, 8, f"Total {invoice.get('currency', 'USD')}", align="R")
+    pdf.cell(35, 8, f"{float(invoice['amount']):,.2f}", align="R", new_x="LMARGIN", new_y="NEXT")
+
+    return bytes(pdf.output())
+
+
+# ============= PROCESS POOL =============
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Return the render pool, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+# ============= RENDER CACHE =============
+
+class PdfCache:
+    """
+    Size-bounded, content-addressed PDF cache on disk.
+
+    Files are named by a hash of (render version, invoice id, modified at),
+    so an edited invoice simply gets a new key and the stale file ages out.
+    A file's mtime is bumped on every hit and eviction removes the oldest
+    mtimes first, which makes it an LRU shared by every worker on the host.
+
+    The directory is only scanned when this worker's running total goes
+    over max_bytes, or every PDF_CACHE_RESCAN_INTERVAL seconds to count
+    other workers' files, not on every put.
+    """
+
+    def __init__(
+        self,
+        directory: str = PDF_CACHE_DIR,
+        max_bytes: int = PDF_CACHE_MAX_BYTES,
+        rescan_interval: float = PDF_CACHE_RESCAN_INTERVAL
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_interval = rescan_interval
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._total = 0
+        self._scanned_at = None
+
+    @staticmethod
+    def key(invoice_id: int, modified_at) -> str:
+        raw = f"{RENDER_VERSION}:{invoice_id}:{modified_at.isoformat()}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total += len(data) - replaced
+            due = (
+                self._total > self.max_bytes
+                or self._scanned_at is None
+                or time.monotonic() - self._scanned_at >= self.rescan_interval
+            )
+        if due:
+            self.evict()
+
+    def evict(self) -> None:
+        """Scan the directory and remove least recently used files until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(".pdf"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total > self.max_bytes:
+            entries.sort()
+            for _, size, path in entries:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+        with self._lock:
+            self._total = total
+            self._scanned_at = time.monotonic()
+
+
+_cache: Optional[PdfCache] = None
+
+
+def get_cache() -> PdfCache:
+    global _cache
+    if _cache is None:
+        _cache = PdfCache()
+    return _cache
@@ -0,0 +1,187 @@
+"""
+Background purge of soft-deleted invoices and clients.
+
+Deletes mark rows with deleted_at instead of removing them. This module
+hard-deletes those rows later in small batches, each in its own short
+transaction, so a mass deletion never holds long row locks or leaves the
+table bloated. Each purged row leaves a small sync tombstone behind so
+that delta sync can still report the deletion. Expired tombstones,
+idempotency keys and delivered outbox events are deleted the same way.
+
+Runs as a daemon thread inside each API worker (started by create_app),
+or once from the command line:
+    python -m app.purge
+"""
+
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, insert, select
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.idempotency import IDEMPOTENCY_TTL
+from app.models import Invoice, InvoiceLineItem, Client, SyncTombstone, IdempotencyKey, OutboxEvent
+from app.outbox import OUTBOX_RETENTION
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+PURGE_ENABLED = settings.purge_enabled
+# Soft-deleted rows are kept this long before being purged
+PURGE_RETENTION = settings.purge_retention
+# Rows deleted per transaction
+PURGE_BATCH_SIZE = settings.purge_batch_size
+# Seconds between purge runs in the background thread
+PURGE_INTERVAL = settings.purge_interval
+# Sync tombstones are kept this long; older sync tokens must do a full resync
+TOMBSTONE_RETENTION = settings.tombstone_retention
+
+ENTITY_TYPES = {Invoice: "invoice", Client: "client"}
+
+
+def purge_batch(model, cutoff: datetime, batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """
+    Hard-delete one batch of rows soft deleted before cutoff.
+
+    SKIP LOCKED lets several workers purge at the same time without
+    waiting on each other. A tombstone is written for every purged row in
+    the same transaction. Line items of purged invoices are deleted
+    explicitly: a partitioned invoices table (see partition_invoices.py)
+    has no foreign key to cascade from.
+
+    Returns:
+        Number of rows deleted
+    """
+    ids = (
+        select(model.id)
+        .where(model.deleted_at.isnot(None), model.deleted_at < cutoff)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    db = SessionLocal()
+    try:
+        purged = db.execute(
+            delete(model)
+            .where(model.id.in_(ids))
+            .returning(model.id, model.user_id, model.change_seq),
+            execution_options={"synchronize_session": False}
+        ).all()
+        if purged and model is Invoice:
+            db.execute(
+                delete(InvoiceLineItem)
+                .where(InvoiceLineItem.invoice_id.in_([row.id for row in purged])),
+                execution_options={"synchronize_session": False}
+            )
+        if purged:
+            db.execute(insert(SyncTombstone), [
+                {
+                    "user_id": row.user_id,
+                    "entity_type": ENTITY_TYPES[model],
+                    "entity_id": row.id,
+                    "change_seq": row.change_seq,
+                }
+                for row in purged
+            ])
+        db.commit()
+        return len(purged)
+    finally:
+        db.close()
+
+
+def purge_deleted(batch_size: int = PURGE_BATCH_SIZE) -> dict:
+    """
+    Purge every soft-deleted invoice and client past the retention period.
+
+    Returns:
+        Number of rows purged per table
+    """
+    cutoff = datetime.now(timezone.utc) - PURGE_RETENTION
+    purged = {}
+    for model in (Invoice, Client):
+        total = 0
+        while True:
+            count = purge_batch(model, cutoff, batch_size)
+            total += count
+            if count < batch_size:
+                break
+        purged[model.__tablename__] = total
+    purged[SyncTombstone.__tablename__] = purge_tombstones(batch_size)
+    purged[IdempotencyKey.__tablename__] = purge_idempotency_keys(batch_size)
+    purged[OutboxEvent.__tablename__] = purge_outbox_events(batch_size)
+    return purged
+
+
+def _purge_older_than(model, cutoff: datetime, batch_size: int, *conditions) -> int:
+    """Delete rows of model created before cutoff (and matching conditions), in batches."""
+    total = 0
+    while True:
+        ids = (
+            select(model.id)
+            .where(model.created_at < cutoff, *conditions)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        db = SessionLocal()
+        try:
+            count = db.execute(
+                delete(model).where(model.id.in_(ids)),
+                execution_options={"synchronize_session": False}
+            ).rowcount
+            db.commit()
+        finally:
+            db.close()
+        total += count
+        if count < batch_size:
+            return total
+
+
+def purge_tombstones(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete sync tombstones past their retention period, in batches."""
+    return _purge_older_than(SyncTombstone, datetime.now(timezone.utc) - TOMBSTONE_RETENTION, batch_size)
+
+
+def purge_idempotency_keys(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete stored idempotent responses past their TTL, in batches."""
+    return _purge_older_than(IdempotencyKey, datetime.now(timezone.utc) - IDEMPOTENCY_TTL, batch_size)
+
+
+def purge_outbox_events(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """Delete delivered outbox events past their retention period, in batches."""
+    return _purge_older_than(
+        OutboxEvent, datetime.now(timezone.utc) - OUTBOX_RETENTION, batch_size,
+        OutboxEvent.dispatched_at.isnot(None)
+    )
+
+
+class Purger:
+    """Runs purge_deleted every PURGE_INTERVAL seconds in a daemon thread."""
+
+    def __init__(self, interval: float = PURGE_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="purger", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                purge_deleted()
+            except Exception as e:
+                # Keep the thread alive; the next run retries
+                print(f"❌ Purge failed: {e}")
+
+
+if __name__ == "__main__":
+    for table, count in purge_deleted().items():
+        print(f"✅ Purged {count} rows from {table}")
@@ -0,0 +1,176 @@
+"""
+Token bucket rate limiting for the authentication endpoints.
+
+Login and registration both pay the bcrypt cost, so a credential-stuffing
+burst can pin every CPU core. These limits are checked before any database
+or password work happens, per client IP and per email address.
+
+Behind a reverse proxy every request arrives from the proxy's address, so
+all clients would share one IP bucket. uvicorn replaces the peer address
+with the client's from X-Forwarded-For when the connection comes from an
+address listed in FORWARDED_ALLOW_IPS (serve.py --forwarded-allow-ips, or
+uvicorn --forwarded-allow-ips). List exactly the proxies in front of the
+API: a client connecting directly from a trusted address could otherwise
+pick its own IP.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# Backend that stores bucket state:
+#   "memory" - per-process dict, fastest, limits apply per worker
+#   "sqlite" - file shared by every worker on the host
+RATE_LIMIT_BACKEND = settings.rate_limit_backend
+RATE_LIMIT_SQLITE_PATH = settings.rate_limit_sqlite_path
+
+# Buckets refill at RATE tokens per second up to BURST tokens
+IP_RATE = settings.ip_rate
+IP_BURST = settings.ip_burst
+EMAIL_RATE = settings.email_rate
+EMAIL_BURST = settings.email_burst
+
+# Upper bound on buckets kept by the in-memory backend
+MAX_TRACKED_KEYS = settings.rate_limit_max_tracked_keys
+
+
+# ============= BACKENDS =============
+
+class InMemoryBackend:
+    """
+    Token buckets kept in a bounded, process-local LRU dict.
+
+    Each bucket is a (tokens, last_refill) tuple. When more than max_keys
+    buckets are tracked the least recently used one is dropped, which at
+    worst gives that key a fresh full bucket.
+    """
+
+    def __init__(self, max_keys: int = MAX_TRACKED_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from the bucket for key.
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteBackend:
+    """
+    Token buckets shared between worker processes through a SQLite file.
+
+    A local stand-in for a shared store such as Redis: every worker on the
+    host sees the same buckets, at the cost of a small write per check.
+    """
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key: str, rate: float, burst: int) -> float:
+        """Same contract as InMemoryBackend.consume."""
+        conn = self._connection()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, last = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - last) * rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+            if wait == 0.0:
+                tokens -= 1
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+
+def create_backend(name: str = RATE_LIMIT_BACKEND):
+    """Build the configured rate limit backend."""
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"Unknown rate limit backend: {name}")
+
+
+backend = create_backend()
+
+
+# ============= CHECKS =============
+
+def _reject(wait: float):
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests, please try again later",
+        headers={"Retry-After": str(int(wait) + 1)},
+    )
+
+
+def check_auth_rate_limit(request: Request, email: Optional[str] = None) -> None:
+    """
+    Enforce per-IP and per-email limits for an authentication request.
+
+    Call this first in the route, before touching the database or bcrypt.
+
+    Raises:
+        HTTPException 429 with a Retry-After header when a limit is exceeded
+    """
+    # The real client behind a trusted proxy, see FORWARDED_ALLOW_IPS
+    client_ip = request.client.host if request.client else "unknown"
+    wait = backend.consume(f"ip:{client_ip}", IP_RATE, IP_BURST)
+    if wait:
+        _reject(wait)
+
+    if email:
+        wait = backend.consume(f"email:{email.lower()}", EMAIL_RATE, EMAIL_BURST)
+        if wait:
+            _reject(wait)
@@ -0,0 +1,235 @@
+"""
+Scheduler that creates invoices from recurring invoice templates.
+
+Each pass claims a batch of due templates with FOR UPDATE SKIP LOCKED,
+creates their due invoices with one batched INSERT, records the
+invoice.created events, updates the clients' balances and moves every
+template to its next run date, all in one transaction. Several scheduler processes can run side by side: a
+claimed template is skipped by the others, and its invoices and its new
+run date commit together, so no run is ever generated twice.
+
+After downtime a template may be many runs behind. A pass creates at most
+MAX_RUNS_PER_CLAIM invoices per template; templates still due are picked up
+again by the next pass, so memory stays bounded by
+SCHEDULER_BATCH_SIZE * MAX_RUNS_PER_CLAIM invoices however long the
+scheduler was down.
+
+Run it as its own process (from the Backend directory):
+    python -m app.recurring           # keep running
+    python -m app.recurring --once    # catch up, then exit (cron)
+"""
+
+import calendar
+import sys
+import threading
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import insert, select
+
+from app.config import get_settings
+from app.balances import BalanceChanges
+from app.currency import get_rates
+from app.database import SessionLocal
+from app.models import Invoice, RecurringInvoice
+from app.outbox import record_user_events
+
+# ============= CONFIGURATION =============
+
+settings = get_settings()
+
+# Templates claimed per transaction
+SCHEDULER_BATCH_SIZE = settings.scheduler_batch_size
+# Invoices created per template per pass (bounds catch-up work)
+MAX_RUNS_PER_CLAIM = settings.max_runs_per_claim
+# Seconds between passes once nothing is due
+SCHEDULER_INTERVAL = settings.scheduler_interval
+
+INTERVALS = ("weekly", "monthly", "quarterly", "yearly")
+_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+# ============= SCHEDULE =============
+
+def run_date(start_date: date, interval: str, run: int) -> date:
+    """
+    Issue date of run number `run` (0 is start_date).
+
+    Counted from start_date each time, so a schedule starting on the 31st
+    issues on the last day of shorter months and goes back to the 31st.
+    """
+    if interval == "weekly":
+        return start_date + timedelta(weeks=run)
+    month = start_date.month - 1 + run * _MONTHS[interval]
+    year = start_date.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(start_date.day, calendar.monthrange(year, month)[1]))
+
+
+def _due_invoices(template: RecurringInvoice, today: date) -> List[dict]:
+    """Invoice rows for the template's due runs, advancing the template."""
+    rows = []
+    while len(rows) < MAX_RUNS_PER_CLAIM:
+        issue_date = template.next_run_date
+        if issue_date > today:
+            break
+        if template.end_date is not None and issue_date > template.end_date:
+            template.active = False
+            break
+        template.runs_generated += 1
+        rows.append({
+            "user_id": template.user_id,
+            "client_id": template.client_id,
+            "invoice_number": f"{template.invoice_number_prefix}-{template.runs_generated:04d}",
+            "customer_name": template.customer_name,
+            "customer_email": template.customer_email,
+            "amount": template.amount,
+            "currency": template.currency,
+            "status": template.status,
+            "description": template.description,
+            "issue_date": issue_date,
+            "due_date": issue_date + timedelta(days=template.payment_terms_days),
+        })
+        template.next_run_date = run_date(template.start_date, template.interval, template.runs_generated)
+    return rows
+
+
+def skip_missed_runs(template: RecurringInvoice, today: date) -> None:
+    """Move a template past the runs it missed while paused, without issuing them."""
+    while template.next_run_date < today:
+        template.runs_generated += 1
+        template.next_run_date = run_date(template.start_date, template.interval, template.runs_generated)
+
+
+def _issue(db, templates: List[RecurringInvoice], today: date, rates: Dict) -> None:
+    """Create the due invoices of templates with one batched INSERT, with their events and balances."""
+    rows = []
+    for template in templates:
+        rows.extend(_due_invoices(template, today))
+    # Template changes (run counts, next dates) belong with their invoices
+    db.flush()
+    if not rows:
+        return
+    created = db.execute(
+        insert(Invoice).returning(Invoice.id, Invoice.base_amount, sort_by_parameter_order=True),
+        [{**row, "rate_to_base": rates[row["currency"]]} for row in rows]
+    ).all()
+    record_user_events(db, "invoice.created", (
+        (row["user_id"], invoice.id, {"id": invoice.id, **row})
+        for invoice, row in zip(created, rows)
+    ))
+    balances = BalanceChanges()
+    for invoice, row in zip(created, rows):
+        balances.add(row["client_id"], row["status"], invoice.base_amount)
+    balances.apply(db)
+
+
+def generate_batch(
+    today: date = None,
+    batch_size: int = SCHEDULER_BATCH_SIZE,
+    skipped: Optional[Set[int]] = None
+) -> int:
+    """
+    Claim one batch of due templates and create their due invoices.
+
+    The batch goes in one INSERT. If that fails, each template is retried
+    in its own savepoint, so one bad template doesn't hold up the others.
+    Templates that fail, or whose currency has no exchange rate, are left
+    due and added to skipped; pass the same set to the next call to leave
+    them out of it.
+
+    Returns:
+        Number of templates claimed (0 when nothing is due)
+    """
+    today = today or date.today()
+    skipped = skipped if skipped is not None else set()
+    db = SessionLocal()
+    try:
+        query = (
+            select(RecurringInvoice)
+            .where(RecurringInvoice.active.is_(True), RecurringInvoice.next_run_date <= today)
+            .order_by(RecurringInvoice.next_run_date)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        if skipped:
+            query = query.where(RecurringInvoice.id.notin_(skipped))
+        templates = db.execute(query).scalars().all()
+        if not templates:
+            return 0
+
+        rates = get_rates(db, today)
+        due = []
+        for template in templates:
+            if template.currency in rates:
+                due.append(template)
+                continue
+            # Its rates were removed since; booking at a made-up rate would skew balances
+            print(f"❌ No exchange rate for {template.currency}, recurring invoice {template.id} left due")
+            skipped.add(template.id)
+        try:
+            with db.begin_nested():
+                _issue(db, due, today, rates)
+        except Exception:
+            # Rolled back templates are expired and reload as they were
+            for template in due:
+                try:
+                    with db.begin_nested():
+                        _issue(db, [template], today, rates)
+                except Exception as e:
+                    print(f"❌ Recurring invoice {template.id} failed, left due: {e}")
+                    skipped.add(template.id)
+        db.commit()
+        return len(templates)
+    finally:
+        db.close()
+
+
+def generate_due(today: date = None, batch_size: int = SCHEDULER_BATCH_SIZE) -> int:
+    """
+    Run passes until no template is due, apart from skipped ones.
+
+    Returns:
+        Number of templates claimed across all passes
+    """
+    total = 0
+    # Failed templates are retried on the next run, not in every pass
+    skipped = set()
+    while True:
+        # A short batch doesn't mean we're done: templates that hit
+        # MAX_RUNS_PER_CLAIM are still due and come back in the next batch
+        claimed = generate_batch(today, batch_size, skipped)
+        if not claimed:
+            return total
+        total += claimed
+
+
+class Scheduler:
+    """Runs generate_due every SCHEDULER_INTERVAL seconds until stopped."""
+
+    def __init__(self, interval: float = SCHEDULER_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                generate_due()
+            except Exception as e:
+                # Keep running; the next pass retries
+                print(f"❌ Recurring invoice generation failed: {e}")
+            self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    if "--once" in sys.argv[1:]:
+        print(f"✅ Processed {generate_due()} recurring invoice templates")
+    else:
+        print("🚀 Recurring invoice scheduler running (Ctrl+C to stop)")
+        try:
+            Scheduler().run()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,31 @@
+"""
+Session dependency that routes read-only handlers to read replicas.
+"""
+
+from fastapi import Depends
+
+from app.auth import get_current_user
+from app.database import ReadSessionLocal
+from app.models import User
+
+
+def get_read_db(current_user: User = Depends(get_current_user)):
+    """
+    Database session for handlers that only read.
+
+    Uses a replica (DATABASE_REPLICA_URLS) unless the current user wrote
+    within the last few seconds, in which case it stays on the primary so
+    the user sees their own changes. Never write through this session.
+
+    Usage:
+    @router.get("/invoices")
+    def get_invoices(
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_user)
+    ): ...
+    """
+    db = ReadSessionLocal(current_user.last_write_at)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,47 @@
+"""
+Audit log routes: the change history of an invoice or client.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.replicas import get_read_db
+from app.models import AuditEntry, User
+from app.schemas import AuditLogResponse
+
+router = APIRouter(tags=["audit"])
+
+
+@router.get("/audit/{entity_type}/{entity_id}", response_model=AuditLogResponse)
+def get_audit_log(
+    entity_id: int,
+    entity_type: str = Path(..., pattern="^(invoice|client)$"),
+    before: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the change history of one of the current user's invoices or clients,
+    newest first.
+
+    Pass next_before from each response as ?before= for the next page.
+    Entries are written in batches shortly after the change commits, so the
+    latest change may take a moment to appear.
+    """
+    query = db.query(AuditEntry).filter(
+        AuditEntry.user_id == current_user.id,
+        AuditEntry.entity_type == entity_type,
+        AuditEntry.entity_id == entity_id
+    )
+    if before is not None:
+        query = query.filter(AuditEntry.id < before)
+    entries = query.order_by(AuditEntry.id.desc()).limit(limit).all()
+
+    return {
+        "entries": entries,
+        "next_before": entries[-1].id if len(entries) == limit else None
+    }
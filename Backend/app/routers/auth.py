@@ -3,17 +3,22 @@ Authentication routes for user registration, login, and profile.
 """
 
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.database import get_db
+from app.ratelimit import check_auth_rate_limit
 from app.models import User
-from app.schemas import UserCreate, UserResponse, Token
+from app.schemas import UserCreate, UserResponse, Token, RefreshRequest
 from app.auth import (
     hash_password,
     authenticate_user,
     create_access_token,
+    create_refresh_token,
+    rotate_refresh_token,
+    revoke_refresh_token,
     get_current_active_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
@@ -22,7 +27,7 @@ from app.auth import (
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+def register(request: Request, user_data: UserCreate, db: Session = Depends(get_db)):
     """
     Register a new user.
     
@@ -35,6 +40,9 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     
     Returns: User object (without password)
     """
+    # Throttle before any database or bcrypt work
+    check_auth_rate_limit(request, user_data.email)
+    
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user_data.email).first()
     if existing_user:
@@ -60,6 +68,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 @router.post("/token", response_model=Token)
 def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -73,17 +82,22 @@ def login(
     - username: user's email
     - password: user's password
     
-    Returns: Access token to use in Authorization header
+    Returns: Access token to use in Authorization header, plus a refresh
+    token that can be exchanged at /auth/refresh when the access token expires
     
     Example response:
     {
       "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
-      "token_type": "bearer"
+      "token_type": "bearer",
+      "refresh_token": "Jx3k..."
     }
     
     Use this token in requests:
     Authorization: Bearer <access_token>
     """
+    # Throttle before any database or bcrypt work
+    check_auth_rate_limit(request, form_data.username)
+    
     # Authenticate user
     user = authenticate_user(db, form_data.username, form_data.password)
     
@@ -100,8 +114,42 @@ def login(
         data={"sub": user.email},
         expires_delta=access_token_expires
     )
+    refresh_token = create_refresh_token(db, user.id)
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token.
+    
+    No password check happens here, so renewing a session costs one indexed
+    lookup instead of a bcrypt verification. The refresh token is rotated:
+    the old one stops working and a new one is returned.
+    
+    Request body:
+    {
+      "refresh_token": "Jx3k..."
+    }
+    """
+    user, refresh_token = rotate_refresh_token(db, body.refresh_token)
+    
+    access_token = create_access_token(
+        data={"sub": user.email},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Revoke a refresh token and every token rotated from the same login.
+    """
+    revoke_refresh_token(db, body.refresh_token)
+    return None
 
 
 @router.get("/me", response_model=UserResponse)
@@ -121,14 +169,36 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
 
 @router.get("/users", response_model=list[UserResponse])
 def get_all_users(
+    after_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    email_prefix: Optional[str] = Query(None, min_length=1, max_length=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """
-    Get all users (protected route example).
+    Get users one page at a time (protected route example).
     
     Only authenticated users can access this.
     In a real app, you might check if user is admin.
+    
+    Uses keyset pagination: pass the id of the last user from the previous
+    page as after_id to get the next page. Only the columns returned by
+    UserResponse are selected, so password hashes never leave the database.
+    
+    Query params:
+    - after_id: return users with an id greater than this
+    - limit: page size (max 200)
+    - email_prefix: only users whose email starts with this
     """
-    users = db.query(User).all()
-    return users
\ No newline at end of file
+    query = db.query(
+        User.id, User.email, User.full_name, User.is_active, User.created_at
+    )
+    if email_prefix is not None:
+        # Escape LIKE wildcards so the prefix is matched literally
+        escaped = email_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(User.email.like(f"{escaped}%", escape="\\"))
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    
+    users = query.order_by(User.id).limit(limit).all()
+    return users
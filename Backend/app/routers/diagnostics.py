@@ -0,0 +1,59 @@
+"""
+Diagnostics routes: the configuration a worker is actually running with.
+
+Off by default, since registration is open to anyone. Enable with
+DIAGNOSTICS_ENABLED=true and list the operators allowed to call it in
+DIAGNOSTICS_USERS; everyone else gets 403.
+"""
+
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.engine import make_url
+
+from app.auth import get_current_user
+from app.compression import brotli
+from app.config import get_settings
+from app.models import User
+
+router = APIRouter(tags=["diagnostics"])
+
+
+def _hide_password(url: str) -> str:
+    return make_url(url).render_as_string(hide_password=True)
+
+
+def get_operator(current_user: User = Depends(get_current_user)) -> User:
+    """
+    Raises:
+        HTTPException 403 if the user is not listed in DIAGNOSTICS_USERS
+    """
+    if current_user.email not in get_settings().diagnostics_users:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Diagnostics are restricted to operators"
+        )
+    return current_user
+
+
+@router.get("/diagnostics/settings")
+def get_effective_settings(current_user: User = Depends(get_operator)):
+    """
+    Get the settings of the worker that served the request, after defaults,
+    .env and environment variables are applied. Secrets and database
+    passwords are masked.
+
+    Each worker parses its settings once at startup, so workers started
+    at different times can differ; pid tells them apart.
+    """
+    settings = get_settings()
+    values = settings.model_dump(mode="json")
+    values["database_url"] = _hide_password(settings.database_url)
+    values["database_replica_urls"] = ",".join(
+        _hide_password(url.strip()) for url in settings.database_replica_urls.split(",") if url.strip()
+    )
+    return {
+        "pid": os.getpid(),
+        "brotli_available": brotli is not None,
+        "settings": values,
+    }
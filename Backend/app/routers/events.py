@@ -0,0 +1,100 @@
+"""
+Change feed and webhook routes for invoice and client events.
+"""
+
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.database import get_db
+from app.replicas import get_read_db
+from app.models import OutboxEvent, User, Webhook
+from app.outbox import check_webhook_url
+from app.schemas import EventFeedResponse, WebhookCreate, WebhookResponse
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events", response_model=EventFeedResponse)
+def get_events(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the current user's invoice and client changes after an event id.
+
+    Start with since=0, then pass next_since from each response to only
+    receive what changed in the meantime instead of polling full lists.
+    A user's events become visible in id order (see outbox._lock_users),
+    so paging by id never skips one. Delivered events are kept for
+    OUTBOX_RETENTION; a client away for longer should reload its lists.
+    """
+    events = db.query(OutboxEvent).filter(
+        OutboxEvent.user_id == current_user.id,
+        OutboxEvent.id > since
+    ).order_by(OutboxEvent.id).limit(limit).all()
+
+    return {
+        "events": events,
+        "next_since": events[-1].id if events else since
+    }
+
+
+@router.put("/webhooks", response_model=WebhookResponse)
+def set_webhook(
+    webhook: WebhookCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Set the URL that receives the current user's events.
+
+    Events are POSTed in batches as {"events": [...]} and signed with
+    HMAC-SHA256 of the body using the returned secret
+    (X-Webhook-Signature: sha256=<hex>). The URL must resolve to a public
+    address; redirects are not followed.
+    """
+    check_webhook_url(webhook.url)
+    db_webhook = db.query(Webhook).filter(Webhook.user_id == current_user.id).first()
+    if db_webhook:
+        db_webhook.url = webhook.url
+    else:
+        db_webhook = Webhook(
+            user_id=current_user.id,
+            url=webhook.url,
+            secret=secrets.token_hex(32)
+        )
+        db.add(db_webhook)
+    db.commit()
+    db.refresh(db_webhook)
+    return db_webhook
+
+
+@router.get("/webhooks", response_model=WebhookResponse)
+def get_webhook(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's webhook."""
+    webhook = db.query(Webhook).filter(Webhook.user_id == current_user.id).first()
+    if not webhook:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No webhook configured"
+        )
+    return webhook
+
+
+@router.delete("/webhooks", status_code=status.HTTP_204_NO_CONTENT)
+def delete_webhook(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Stop delivering events to the current user's webhook."""
+    db.query(Webhook).filter(Webhook.user_id == current_user.id).delete()
+    db.commit()
+    return None
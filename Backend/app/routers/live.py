@@ -0,0 +1,80 @@
+"""
+WebSocket route pushing live invoice and client changes.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+from app.auth import verify_token
+from app.database import SessionLocal
+from app.live import broadcaster
+from app.models import User
+
+router = APIRouter(tags=["events"])
+
+
+def _authenticate(token: str) -> Tuple[Optional[int], Optional[datetime]]:
+    """Return the id of the active user owning the token (or None) and the token's expiry."""
+    try:
+        token_data = verify_token(token)
+    except HTTPException:
+        return None, None
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.is_active).filter(User.email == token_data.email).first()
+        return (user.id if user and user.is_active else None), token_data.exp
+    finally:
+        db.close()
+
+
+@router.websocket("/ws")
+async def live_updates(websocket: WebSocket, token: str = Query(...)):
+    """
+    Push the current user's change events as they happen.
+
+    Connect with ws://<host>/ws?token=<access_token> (browsers can't set
+    headers on WebSocket requests). Each message is JSON:
+    - {"type": "event", "id": ..., "event_type": "invoice.updated", ...}
+      same fields as GET /events
+    - {"type": "resync"} when the client fell behind and should reload
+
+    The socket is closed (code 1008) when the token expires; reconnect
+    with a fresh one.
+    """
+    user_id, expires_at = await run_in_threadpool(_authenticate, token)
+    if user_id is None:
+        await websocket.close(code=1008)
+        return
+
+    await websocket.accept()
+    queue = broadcaster.subscribe(user_id)
+
+    async def pump():
+        while True:
+            await websocket.send_text(await queue.get())
+
+    async def receive():
+        # Clients don't send anything; this only waits for the disconnect
+        while True:
+            await websocket.receive_text()
+
+    lifetime = None
+    if expires_at is not None:
+        lifetime = max((expires_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+    sender = asyncio.create_task(pump())
+    try:
+        await asyncio.wait_for(receive(), lifetime)
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        # Token expired: stop sending before closing
+        sender.cancel()
+        await websocket.close(code=1008)
+    finally:
+        sender.cancel()
+        broadcaster.unsubscribe(user_id, queue)
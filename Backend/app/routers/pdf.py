@@ -0,0 +1,176 @@
+"""
+PDF download routes for invoices.
+"""
+
+import zipfile
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
+
+from app.auth import get_current_user
+from app.replicas import get_read_db
+from app.models import Invoice, User
+from app.pdf import PDF_ZIP_RENDER_AHEAD, get_cache, get_pool, render_invoice_pdf
+
+# Included before the invoice routes so /invoices/pdf is not taken for
+# /invoices/{invoice_id}
+router = APIRouter(tags=["invoices"])
+
+
+def _invoice_payload(invoice: Invoice) -> dict:
+    """Plain data for the renderer (pool processes can't use ORM objects)."""
+    return {
+        "invoice_number": invoice.invoice_number,
+        "customer_name": invoice.customer_name,
+        "customer_email": invoice.customer_email,
+        "amount": str(invoice.amount),
+        "currency": invoice.currency,
+        "status": invoice.status,
+        "description": invoice.description,
+        "issue_date": invoice.issue_date.isoformat(),
+        "due_date": invoice.due_date.isoformat(),
+        "line_items": [
+            {
+                "description": item.description,
+                "quantity": str(item.quantity),
+                "unit_price": str(item.unit_price),
+                "amount": str(item.amount),
+            }
+            for item in invoice.line_items
+        ],
+    }
+
+
+def _cache_key(invoice: Invoice) -> str:
+    return get_cache().key(invoice.id, invoice.updated_at or invoice.created_at)
+
+
+def _filename(invoice: Invoice) -> str:
+    return f"{invoice.invoice_number}.pdf".replace("/", "-").replace('"', "")
+
+
+class _ZipStream:
+    """Write-only file object that hands zip output back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+@router.get("/invoices/pdf")
+def download_invoices_pdf_zip(
+    month: str = Query(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download every invoice issued in a month as a ZIP of PDFs.
+
+    Query params:
+    - month: YYYY-MM
+
+    Cached PDFs are reused; the rest are rendered in the process pool, at
+    most PDF_ZIP_RENDER_AHEAD ahead of the stream. The ZIP is streamed one
+    file at a time instead of being built in memory.
+    """
+    year, month_number = (int(part) for part in month.split("-"))
+    start = date(year, month_number, 1)
+    end = date(year + month_number // 12, month_number % 12 + 1, 1)
+
+    invoices = db.query(Invoice).options(selectinload(Invoice.line_items)).filter(
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None),
+        Invoice.issue_date >= start,
+        Invoice.issue_date < end
+    ).order_by(Invoice.issue_date, Invoice.id).all()
+
+    # Snapshot what the stream needs so it doesn't depend on the session
+    entries = [
+        (_filename(invoice), _cache_key(invoice), _invoice_payload(invoice))
+        for invoice in invoices
+    ]
+
+    def stream():
+        cache = get_cache()
+        pool = get_pool()
+        misses = iter([(key, payload) for _, key, payload in entries if not cache.has(key)])
+        pending = {}
+
+        def render_ahead():
+            # Keep the pool busy a few files ahead without holding every PDF
+            while len(pending) < PDF_ZIP_RENDER_AHEAD:
+                miss = next(misses, None)
+                if miss is None:
+                    return
+                key, payload = miss
+                pending[key] = pool.submit(render_invoice_pdf, payload)
+
+        render_ahead()
+        buffer = _ZipStream()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for filename, key, payload in entries:
+                future = pending.pop(key, None)
+                data = None if future is not None else cache.get(key)
+                if data is None:
+                    # A miss, or evicted since the check above: render it now
+                    data = (future or pool.submit(render_invoice_pdf, payload)).result()
+                    cache.put(key, data)
+                render_ahead()
+                archive.writestr(filename, data)
+                yield buffer.take()
+        yield buffer.take()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="invoices-{month}.zip"'}
+    )
+
+
+@router.get("/invoices/{invoice_id}/pdf")
+def download_invoice_pdf(
+    invoice_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download an invoice as PDF (only if it belongs to the current user)."""
+    invoice = db.query(Invoice).filter(
+        Invoice.id == invoice_id,
+        Invoice.user_id == current_user.id,
+        Invoice.deleted_at.is_(None)
+    ).first()
+    if not invoice:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Invoice with id {invoice_id} not found"
+        )
+
+    cache = get_cache()
+    key = _cache_key(invoice)
+    data = cache.get(key)
+    if data is None:
+        # Line items are only needed for a cache miss
+        data = get_pool().submit(render_invoice_pdf, _invoice_payload(invoice)).result()
+        cache.put(key, data)
+
+    return Response(
+        content=data,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f'attachment; filename="{_filename(invoice)}"',
+            "ETag": f'"{key}"'
+        }
+    )
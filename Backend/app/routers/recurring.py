@@ -0,0 +1,165 @@
+"""
+Recurring invoice template routes.
+
+The invoices themselves are created by the scheduler, see app/recurring.py.
+"""
+
+from datetime import date
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.balances import check_client
+from app.currency import check_currency
+from app.database import get_db
+from app.replicas import get_read_db
+from app.models import Invoice, RecurringInvoice, User
+from app.recurring import skip_missed_runs
+from app.schemas import RecurringInvoiceCreate, RecurringInvoiceUpdate, RecurringInvoiceResponse
+
+router = APIRouter(tags=["recurring invoices"])
+
+
+def _get_template(db: Session, template_id: int, user_id: int) -> RecurringInvoice:
+    template = db.query(RecurringInvoice).filter(
+        RecurringInvoice.id == template_id,
+        RecurringInvoice.user_id == user_id
+    ).first()
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Recurring invoice with id {template_id} not found"
+        )
+    return template
+
+
+def _check_prefix(db: Session, user_id: int, prefix: str) -> None:
+    """
+    Raises:
+        HTTPException 400 if invoices numbered <prefix>-NNNN could clash
+        with another template's or with existing invoice numbers
+    """
+    existing = db.query(RecurringInvoice.id).filter(
+        RecurringInvoice.user_id == user_id,
+        RecurringInvoice.invoice_number_prefix == prefix
+    ).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Recurring invoice with prefix '{prefix}' already exists"
+        )
+    existing = db.query(Invoice.id).filter(
+        Invoice.user_id == user_id,
+        Invoice.invoice_number.startswith(f"{prefix}-", autoescape=True),
+        Invoice.deleted_at.is_(None)
+    ).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invoices numbered '{prefix}-...' already exist, choose another prefix"
+        )
+
+
+@router.post(
+    "/recurring-invoices",
+    response_model=RecurringInvoiceResponse,
+    status_code=status.HTTP_201_CREATED
+)
+def create_recurring_invoice(
+    template: RecurringInvoiceCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Create a recurring invoice for the current user.
+
+    The first invoice is issued on start_date (right away if that is in
+    the past), then one every interval until end_date.
+    """
+    check_currency(db, template.currency)
+    check_client(db, current_user.id, template.client_id)
+    _check_prefix(db, current_user.id, template.invoice_number_prefix)
+    db_template = RecurringInvoice(
+        **template.model_dump(),
+        user_id=current_user.id,
+        next_run_date=template.start_date
+    )
+    db.add(db_template)
+    db.commit()
+    db.refresh(db_template)
+    return db_template
+
+
+@router.get("/recurring-invoices", response_model=List[RecurringInvoiceResponse])
+def get_recurring_invoices(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the current user's recurring invoices."""
+    return db.query(RecurringInvoice).filter(
+        RecurringInvoice.user_id == current_user.id
+    ).order_by(RecurringInvoice.id).offset(skip).limit(limit).all()
+
+
+@router.get("/recurring-invoices/{template_id}", response_model=RecurringInvoiceResponse)
+def get_recurring_invoice(
+    template_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a single recurring invoice by ID."""
+    return _get_template(db, template_id, current_user.id)
+
+
+@router.put("/recurring-invoices/{template_id}", response_model=RecurringInvoiceResponse)
+def update_recurring_invoice(
+    template_id: int,
+    template_update: RecurringInvoiceUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Update a recurring invoice; set active=false to pause it.
+
+    Changes apply to invoices issued from now on. Resuming does not issue
+    the runs missed while paused: the schedule continues from today, and
+    the skipped run numbers are not used.
+    """
+    template = _get_template(db, template_id, current_user.id)
+    update_data = template_update.model_dump(exclude_unset=True)
+    if "currency" in update_data:
+        check_currency(db, update_data["currency"])
+    if "client_id" in update_data:
+        check_client(db, current_user.id, update_data["client_id"])
+    resumed = update_data.get("active") and not template.active
+    for field, value in update_data.items():
+        setattr(template, field, value)
+    if resumed:
+        skip_missed_runs(template, date.today())
+    db.commit()
+    db.refresh(template)
+    return template
+
+
+@router.delete("/recurring-invoices/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_recurring_invoice(
+    template_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete a recurring invoice. Invoices already issued are kept."""
+    deleted = db.query(RecurringInvoice).filter(
+        RecurringInvoice.id == template_id,
+        RecurringInvoice.user_id == current_user.id
+    ).delete(synchronize_session=False)
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Recurring invoice with id {template_id} not found"
+        )
+    db.commit()
+    return None
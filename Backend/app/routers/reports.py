@@ -0,0 +1,104 @@
+"""
+Summary and analytics routes for invoices.
+"""
+
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.currency import BASE_CURRENCY, get_rates, latest_rates, rate_to_base
+from app.replicas import get_read_db
+from app.models import Invoice, User
+from app.schemas import InvoiceSummaryResponse
+
+# Included before the invoice routes so /invoices/summary is not taken for
+# /invoices/{invoice_id}
+router = APIRouter(tags=["invoices"])
+
+CENT = Decimal("0.01")
+
+
+def _bucket(count: int, total) -> dict:
+    return {"count": count, "total": Decimal(total or 0).quantize(CENT)}
+
+
+@router.get("/invoices/summary", response_model=InvoiceSummaryResponse)
+def get_invoice_summary(
+    currency: str = Query(BASE_CURRENCY, pattern="^[A-Z]{3}$"),
+    as_of: Optional[date] = None,
+    issued_from: Optional[date] = None,
+    issued_to: Optional[date] = None,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get invoice counts and totals by status and by issue month, converted
+    to one reporting currency.
+
+    Amounts are converted inside the database by joining each invoice to
+    the latest exchange rate of its currency on or before as_of (default
+    today), so the cost is one aggregate query however many currencies are
+    involved. Invoices in a currency without a rate are counted in
+    unconverted and left out of the totals.
+    """
+    as_of = as_of or date.today()
+    rates = get_rates(db, as_of)
+    if currency not in rates:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No exchange rate loaded for currency '{currency}'"
+        )
+
+    rates_query = latest_rates(as_of)
+    rate = rate_to_base(rates_query)
+    # amount in base currency, then in the reporting currency
+    converted = Invoice.amount * rate / rates[currency]
+    month = func.to_char(Invoice.issue_date, "YYYY-MM")
+
+    conditions = [Invoice.user_id == current_user.id, Invoice.deleted_at.is_(None)]
+    if issued_from is not None:
+        conditions.append(Invoice.issue_date >= issued_from)
+    if issued_to is not None:
+        conditions.append(Invoice.issue_date <= issued_to)
+
+    # One pass over the user's invoices, grouped by (status, month); the
+    # per-status and per-month totals are rolled up from these few rows
+    rows = db.execute(
+        select(
+            Invoice.status,
+            month.label("month"),
+            func.count(rate).label("count"),
+            func.sum(converted).label("total"),
+            func.sum(case((rate.is_(None), 1), else_=0)).label("unconverted"),
+        )
+        .select_from(Invoice)
+        .outerjoin(rates_query, rates_query.c.currency == Invoice.currency)
+        .where(*conditions)
+        .group_by(Invoice.status, month)
+    ).all()
+
+    by_status, by_month = {}, {}
+    count, total, unconverted = 0, Decimal(0), 0
+    for row in rows:
+        row_total = row.total or Decimal(0)
+        for groups, key in ((by_status, row.status), (by_month, row.month)):
+            bucket_count, bucket_total = groups.get(key, (0, Decimal(0)))
+            groups[key] = (bucket_count + row.count, bucket_total + row_total)
+        count += row.count
+        total += row_total
+        unconverted += row.unconverted
+
+    return {
+        "currency": currency,
+        "as_of": as_of,
+        "count": count,
+        "total": Decimal(total).quantize(CENT),
+        "by_status": {key: _bucket(*value) for key, value in by_status.items()},
+        "by_month": {key: _bucket(*value) for key, value in sorted(by_month.items())},
+        "unconverted": unconverted,
+    }
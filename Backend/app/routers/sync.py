@@ -0,0 +1,151 @@
+"""
+Delta sync route for clients that keep a local replica (mobile, desktop).
+"""
+
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.orm import Session
+
+from app.auth import get_current_user
+from app.replicas import get_read_db
+from app.models import Invoice, Client, SyncTombstone, User
+from app.purge import TOMBSTONE_RETENTION
+from app.schemas import SyncResponse
+
+router = APIRouter(tags=["sync"])
+
+
+def _make_token(change_seq: int, issued_at: int) -> str:
+    return f"{change_seq}.{issued_at}"
+
+
+def _in_flight_horizon(db: Session) -> int:
+    """Id of the oldest transaction still running (xid, without the epoch)."""
+    horizon = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text")).scalar()
+    return int(horizon) % 2 ** 32
+
+
+def _written_since(model, horizon: int):
+    """True for rows last written by a transaction not older than horizon."""
+    xmin = literal_column(f"{model.__tablename__}.xmin")
+    return func.age(xmin) <= func.age(literal_column(f"'{horizon}'::xid"))
+
+
+def _parse_token(token: str) -> tuple:
+    """Split a sync token into (change_seq, issued_at)."""
+    try:
+        change_seq, issued_at = (int(part) for part in token.split("."))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+    return change_seq, issued_at
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync(
+    since: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get invoices and clients created, updated or deleted since a sync token.
+
+    Omit since for the first sync, then pass next_token from each response.
+    Every query is an index range scan on (user_id, change_seq), so a sync
+    costs O(changes), not O(rows). Deletions come from soft-deleted rows
+    and, once those are purged, from tombstones. A token older than the
+    tombstone retention gets reset=true and a full resync.
+
+    change_seq values are taken when a row is written but become visible
+    when its transaction commits, so a lower value can show up after a
+    higher one was returned. To narrow that window, rows written by
+    transactions no older than the oldest one still running (xid at or
+    above pg_snapshot_xmin) are held back, together with everything after
+    them, until that transaction ends.
+
+    This is best effort, not a guarantee: change_seq is not assigned in
+    commit order. A transaction that wrote other rows before taking its
+    change_seq can commit it below a value already returned, and that
+    change is then only picked up by a full resync. Long-running write
+    transactions anywhere in the cluster also hold back every user's sync
+    while they run.
+    """
+    now = int(time.time())
+    after, reset = 0, False
+    if since:
+        after, issued_at = _parse_token(since)
+        if now - issued_at > TOMBSTONE_RETENTION.total_seconds():
+            after, reset = 0, True
+
+    # Taken before the queries, so it is no newer than any of their snapshots
+    horizon = _in_flight_horizon(db)
+    invoices = db.query(Invoice, _written_since(Invoice, horizon)).filter(
+        Invoice.user_id == current_user.id,
+        Invoice.change_seq > after
+    ).order_by(Invoice.change_seq).limit(limit).all()
+    clients = db.query(Client, _written_since(Client, horizon)).filter(
+        Client.user_id == current_user.id,
+        Client.change_seq > after
+    ).order_by(Client.change_seq).limit(limit).all()
+    tombstones = db.query(
+        SyncTombstone.entity_type,
+        SyncTombstone.entity_id,
+        SyncTombstone.change_seq,
+        _written_since(SyncTombstone, horizon)
+    ).filter(
+        SyncTombstone.user_id == current_user.id,
+        SyncTombstone.change_seq > after
+    ).order_by(SyncTombstone.change_seq).limit(limit).all()
+    invoices = [(invoice.change_seq, invoice, recent) for invoice, recent in invoices]
+    clients = [(client.change_seq, client, recent) for client, recent in clients]
+    tombstones = [(row[2], row, row[3]) for row in tombstones]
+
+    # When a source filled its page, changes past its last row may be
+    # missing from it; stop every source there
+    sources = (invoices, clients, tombstones)
+    full = [rows[-1][0] for rows in sources if len(rows) == limit]
+    has_more = bool(full)
+    if has_more:
+        cutoff = min(full)
+    else:
+        cutoff = max([rows[-1][0] for rows in sources if rows], default=after)
+    # Stop before the first change a still-running transaction may precede,
+    # at the last change actually returned: values between it and the held
+    # back one may belong to transactions that have not committed yet
+    held_back = [seq for rows in sources for seq, _, recent in rows if recent and seq <= cutoff]
+    if held_back:
+        first_held = min(held_back)
+        cutoff = max((seq for rows in sources for seq, _, _ in rows if seq < first_held), default=after)
+        has_more = False
+
+    changes = {
+        "invoices": {"upserted": [], "deleted": []},
+        "clients": {"upserted": [], "deleted": []},
+    }
+    for key, rows in (("invoices", invoices), ("clients", clients)):
+        for change_seq, row, _ in rows:
+            if change_seq > cutoff:
+                break
+            if row.deleted_at is None:
+                changes[key]["upserted"].append(row)
+            else:
+                changes[key]["deleted"].append(row.id)
+    for change_seq, tombstone, _ in tombstones:
+        if change_seq > cutoff:
+            break
+        changes[f"{tombstone.entity_type}s"]["deleted"].append(tombstone.entity_id)
+
+    return {
+        **changes,
+        # Tombstones are kept TOMBSTONE_RETENTION from now on, so the token
+        # ages from this sync, not the first one
+        "next_token": _make_token(cutoff, now),
+        "has_more": has_more,
+        "reset": reset,
+    }
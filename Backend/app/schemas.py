@@ -1,41 +1,121 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, EmailStr, TypeAdapter, create_model, model_validator
 from datetime import datetime, date
-from typing import Optional
-from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from decimal import Decimal, ROUND_HALF_UP
 
 # ============= INVOICE SCHEMAS =============
 
+# Largest invoice amount, Numeric(10, 2)
+MAX_INVOICE_AMOUNT = Decimal("99999999.99")
+CENT = Decimal("0.01")
+
 class InvoiceBase(BaseModel):
     invoice_number: str = Field(..., min_length=1, max_length=100)
     customer_name: str = Field(..., min_length=1, max_length=200)
     customer_email: Optional[EmailStr] = None
-    amount: Decimal = Field(..., gt=0)
+    amount: Decimal = Field(..., gt=0, le=MAX_INVOICE_AMOUNT)
+    currency: str = Field(default="USD", pattern="^[A-Z]{3}$")
     status: str = Field(default="draft", pattern="^(draft|sent|paid|overdue)$")
     description: Optional[str] = Field(None, max_length=1000)
     issue_date: date
     due_date: date
+    # Client billed, counts towards its balances
+    client_id: Optional[int] = None
+
+class LineItemCreate(BaseModel):
+    description: str = Field(..., min_length=1, max_length=500)
+    quantity: Decimal = Field(default=Decimal("1"), gt=0, max_digits=10, decimal_places=2)
+    unit_price: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2)
+
+
+def _check_line_items_total(line_items: List[LineItemCreate]) -> None:
+    """
+    The invoice amount the database will compute from line_items must be a
+    valid amount: positive and within Numeric(10, 2).
+    """
+    total = sum(
+        ((item.quantity * item.unit_price).quantize(CENT, rounding=ROUND_HALF_UP) for item in line_items),
+        Decimal(0)
+    )
+    if total <= 0:
+        raise ValueError("The line items must add up to more than 0")
+    if total > MAX_INVOICE_AMOUNT:
+        raise ValueError(f"The line items add up to {total}, more than the maximum of {MAX_INVOICE_AMOUNT}")
+
+class LineItemResponse(LineItemCreate):
+    id: int
+    position: int
+    amount: Decimal
+    
+    class Config:
+        from_attributes = True
 
 class InvoiceCreate(InvoiceBase):
-    pass
+    # With line items the amount is computed by the database from them
+    amount: Optional[Decimal] = Field(None, gt=0, le=MAX_INVOICE_AMOUNT)
+    line_items: List[LineItemCreate] = Field(default_factory=list, max_length=500)
+    
+    @model_validator(mode="after")
+    def check_amount_or_line_items(self):
+        if self.amount is None and not self.line_items:
+            raise ValueError("Either amount or line_items is required")
+        if self.line_items:
+            if self.amount is not None:
+                raise ValueError("amount is computed from line_items, send only one of them")
+            _check_line_items_total(self.line_items)
+        return self
 
 class InvoiceUpdate(BaseModel):
     invoice_number: Optional[str] = Field(None, min_length=1, max_length=100)
     customer_name: Optional[str] = Field(None, min_length=1, max_length=200)
     customer_email: Optional[EmailStr] = None
-    amount: Optional[Decimal] = Field(None, gt=0)
+    amount: Optional[Decimal] = Field(None, gt=0, le=MAX_INVOICE_AMOUNT)
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
     status: Optional[str] = Field(None, pattern="^(draft|sent|paid|overdue)$")
     description: Optional[str] = Field(None, max_length=1000)
     issue_date: Optional[date] = None
     due_date: Optional[date] = None
+    client_id: Optional[int] = None
+    # Replaces all line items (and the computed amount) when given
+    line_items: Optional[List[LineItemCreate]] = Field(None, min_length=1, max_length=500)
+    # Version the change is based on; rejected with 409 if it is outdated
+    version: Optional[int] = None
+    
+    @model_validator(mode="after")
+    def check_line_items(self):
+        if self.line_items is not None:
+            if self.amount is not None:
+                raise ValueError("amount is computed from line_items, send only one of them")
+            _check_line_items_total(self.line_items)
+        return self
 
 class InvoiceResponse(InvoiceBase):
     id: int
+    version: int
     created_at: datetime
     updated_at: Optional[datetime]
     
     class Config:
         from_attributes = True
 
+class InvoiceDetailResponse(InvoiceResponse):
+    line_items: List[LineItemResponse] = []
+
+@lru_cache(maxsize=256)
+def invoice_projection(fields: Tuple[str, ...]) -> TypeAdapter:
+    """
+    Serializer for a list of invoices narrowed to some InvoiceResponse fields
+    (GET /invoices?fields=). Values are serialized exactly as in the full
+    response.
+    """
+    model = create_model(
+        "InvoiceProjection",
+        __config__=ConfigDict(from_attributes=True),
+        **{field: (InvoiceResponse.model_fields[field].annotation, ...) for field in fields}
+    )
+    return TypeAdapter(List[model])
+
 
 # ============= USER/AUTH SCHEMAS =============
 
@@ -60,10 +140,16 @@ class Token(BaseModel):
     """Schema for JWT token response."""
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    """Schema for exchanging a refresh token for a new token pair."""
+    refresh_token: str = Field(..., min_length=1, max_length=200)
 
 class TokenData(BaseModel):
     """Schema for data stored inside JWT token."""
     email: Optional[str] = None
+    exp: Optional[datetime] = None
 
 
 # ============= CLIENT SCHEMAS =============
@@ -94,11 +180,189 @@ class ClientUpdate(BaseModel):
     zip_code: Optional[str] = Field(None, max_length=20)
     country: Optional[str] = Field(None, max_length=100)
     notes: Optional[str] = Field(None, max_length=1000)
+    # Version the change is based on; rejected with 409 if it is outdated
+    version: Optional[int] = None
 
 class ClientResponse(ClientBase):
     id: int
+    version: int
+    # Totals of the client's invoices in the base currency: sent + overdue, overdue, paid
+    outstanding_amount: Decimal
+    overdue_amount: Decimal
+    paid_amount: Decimal
     created_at: datetime
     updated_at: Optional[datetime]
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# ============= BULK SCHEMAS =============
+
+class BulkDeleteRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BulkDeleteResponse(BaseModel):
+    deleted: int
+
+class InvoiceStatusFilter(BaseModel):
+    """Selects invoices by their current fields; all given fields must match."""
+    status: Optional[str] = Field(None, pattern="^(draft|sent|paid|overdue)$")
+    due_before: Optional[date] = None
+    issued_from: Optional[date] = None
+    issued_to: Optional[date] = None
+    customer_name: Optional[str] = Field(None, min_length=1, max_length=200)
+
+class BulkStatusRequest(BaseModel):
+    # Either ids or filter selects the invoices
+    ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    filter: Optional[InvoiceStatusFilter] = None
+    status: str = Field(..., pattern="^(draft|sent|paid|overdue)$")
+    
+    @model_validator(mode="after")
+    def check_ids_or_filter(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Give either ids or filter")
+        return self
+
+class BulkStatusResponse(BaseModel):
+    updated_ids: List[int]
+    # Number of invoices moved, by previous status, e.g. {"sent": 40, "overdue": 3}
+    transitions: Dict[str, int]
+    # Selected invoices left alone (already in the target status, or the
+    # transition from their status is not allowed); only reported for ids
+    skipped_ids: List[int]
+
+
+# ============= EVENT SCHEMAS =============
+
+class EventResponse(BaseModel):
+    id: int
+    event_type: str
+    entity_type: str
+    entity_id: int
+    payload: dict
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class EventFeedResponse(BaseModel):
+    events: List[EventResponse]
+    # Pass as ?since= to get the next batch
+    next_since: int
+
+class WebhookCreate(BaseModel):
+    url: str = Field(..., min_length=1, max_length=2000, pattern="^https?://")
+
+class WebhookResponse(BaseModel):
+    id: int
+    url: str
+    secret: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+# ============= SYNC SCHEMAS =============
+
+class InvoiceChanges(BaseModel):
+    upserted: List[InvoiceResponse]
+    deleted: List[int]
+
+class ClientChanges(BaseModel):
+    upserted: List[ClientResponse]
+    deleted: List[int]
+
+class SyncResponse(BaseModel):
+    invoices: InvoiceChanges
+    clients: ClientChanges
+    # Pass as ?since= on the next call
+    next_token: str
+    # More changes are waiting, call again right away
+    has_more: bool
+    # The token was too old: drop the local replica, it is rebuilt from scratch
+    reset: bool
+
+
+# ============= REPORT SCHEMAS =============
+
+class SummaryBucket(BaseModel):
+    count: int
+    total: Decimal
+
+class InvoiceSummaryResponse(BaseModel):
+    # Reporting currency every total is converted to
+    currency: str
+    # Date of the exchange rates used
+    as_of: date
+    count: int
+    total: Decimal
+    by_status: Dict[str, SummaryBucket]
+    # Keyed by issue month, "YYYY-MM"
+    by_month: Dict[str, SummaryBucket]
+    # Invoices left out of the totals because their currency has no rate
+    unconverted: int
+
+
+# ============= RECURRING INVOICE SCHEMAS =============
+
+class RecurringInvoiceBase(BaseModel):
+    client_id: Optional[int] = None
+    customer_name: str = Field(..., min_length=1, max_length=200)
+    customer_email: Optional[EmailStr] = None
+    amount: Decimal = Field(..., gt=0, le=MAX_INVOICE_AMOUNT)
+    currency: str = Field(default="USD", pattern="^[A-Z]{3}$")
+    description: Optional[str] = Field(None, max_length=1000)
+    status: str = Field(default="sent", pattern="^(draft|sent)$")
+    end_date: Optional[date] = None
+    payment_terms_days: int = Field(default=30, ge=0, le=365)
+
+class RecurringInvoiceCreate(RecurringInvoiceBase):
+    invoice_number_prefix: str = Field(..., min_length=1, max_length=50)
+    interval: str = Field(..., pattern="^(weekly|monthly|quarterly|yearly)$")
+    start_date: date
+
+class RecurringInvoiceUpdate(BaseModel):
+    # The schedule itself (interval, start_date) can't change; create a new template
+    client_id: Optional[int] = None
+    customer_name: Optional[str] = Field(None, min_length=1, max_length=200)
+    customer_email: Optional[EmailStr] = None
+    amount: Optional[Decimal] = Field(None, gt=0, le=MAX_INVOICE_AMOUNT)
+    currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$")
+    description: Optional[str] = Field(None, max_length=1000)
+    status: Optional[str] = Field(None, pattern="^(draft|sent)$")
+    end_date: Optional[date] = None
+    payment_terms_days: Optional[int] = Field(None, ge=0, le=365)
+    active: Optional[bool] = None
+
+class RecurringInvoiceResponse(RecurringInvoiceCreate):
+    id: int
+    runs_generated: int
+    next_run_date: date
+    active: bool
+    created_at: datetime
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+# ============= AUDIT SCHEMAS =============
+
+class AuditEntryResponse(BaseModel):
+    id: int
+    user_id: int
+    action: str
+    # {"field": {"old": ..., "new": ...}}
+    changes: dict
+    version: Optional[int]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class AuditLogResponse(BaseModel):
+    entries: List[AuditEntryResponse]
+    # Pass as ?before= to get the next (older) page; null on the last page
+    next_before: Optional[int]
@@ -7,6 +7,7 @@ import random
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
 from app.database import SessionLocal, engine, Base
 from app.models import Invoice, User
 
@@ -105,7 +106,11 @@ def create_sample_invoices(count: int = 50, user_email: str = None) -> None:
         print(f"Using user: {user.email} (ID: {user.id})")
         
         # Clear existing invoices for this user (optional - remove this if you want to keep existing data)
-        db.query(Invoice).filter(Invoice.user_id == user.id).delete()
+        # Soft delete in one UPDATE; the purger removes the rows in small batches later
+        db.query(Invoice).filter(
+            Invoice.user_id == user.id,
+            Invoice.deleted_at.is_(None)
+        ).update({Invoice.deleted_at: func.now()}, synchronize_session=False)
         db.commit()
         print(f"Cleared existing invoices for user {user.email}.")
         
@@ -169,7 +174,10 @@ def create_sample_invoices(count: int = 50, user_email: str = None) -> None:
         print(f"✅ Successfully created {count} random invoices for user {user.email}!")
         
         # Show some statistics for this user's invoices
-        user_invoices = db.query(Invoice).filter(Invoice.user_id == user.id).all()
+        user_invoices = db.query(Invoice).filter(
+            Invoice.user_id == user.id,
+            Invoice.deleted_at.is_(None)
+        ).all()
         total_invoices = len(user_invoices)
         draft_invoices = sum(1 for inv in user_invoices if inv.status == "draft")
         sent_invoices = sum(1 for inv in user_invoices if inv.status == "sent")
@@ -198,7 +206,7 @@ def show_sample_invoices(limit: int = 10, user_email: str = None) -> None:
     db = SessionLocal()
     
     try:
-        query = db.query(Invoice)
+        query = db.query(Invoice).filter(Invoice.deleted_at.is_(None))
         
         if user_email:
             user = db.query(User).filter(User.email == user_email).first()
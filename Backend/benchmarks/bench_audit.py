@@ -0,0 +1,139 @@
+"""
+Benchmark: write-path overhead of the audit log.
+
+Calls the update_invoice handler directly (no HTTP) in a loop for a
+throwaway benchmark user, once per AUDIT_MODE: "off", "sync" (entry
+inserted in the request transaction) and "buffered" (entry handed to the
+background flusher after commit). Reports the handler latency of each
+mode and, for the buffered one, how long the final flush took. The
+buffered mode should stay close to "off". Everything the benchmark
+created is deleted at the end.
+
+Runs against the configured database (DATABASE_URL) with the real tables.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_audit [updates] [invoices]
+"""
+
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from fastapi import Response
+from sqlalchemy import delete, func, insert, select
+
+# Settings are parsed when app.config is first imported
+os.environ.setdefault("DB_ECHO", "false")
+
+from app import audit
+from app.database import Base, SessionLocal, get_engine
+from app.main import update_invoice
+from app.models import AuditEntry, Invoice, OutboxEvent, User
+from app.schemas import InvoiceUpdate
+
+BENCH_EMAIL = "bench-audit@example.com"
+
+
+def setup(invoices: int) -> tuple:
+    """Create the benchmark user and invoices; returns (user, invoice ids)."""
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    db.expire_on_commit = False
+    try:
+        user = User(email=BENCH_EMAIL, hashed_password="!", full_name="Audit benchmark")
+        db.add(user)
+        db.flush()
+        today = date.today()
+        invoice_ids = db.execute(insert(Invoice).returning(Invoice.id), [
+            {
+                "user_id": user.id,
+                "invoice_number": f"AUDIT-{n:06d}",
+                "customer_name": f"Customer {n}",
+                "amount": 100,
+                "status": "sent",
+                "issue_date": today,
+                "due_date": today + timedelta(days=30),
+            }
+            for n in range(invoices)
+        ]).scalars().all()
+        db.commit()
+        return user, invoice_ids
+    finally:
+        db.close()
+
+
+def cleanup(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        for model in (AuditEntry, OutboxEvent, Invoice):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(user: User, invoice_ids: list, updates: int) -> list:
+    """Returns the latency of every update in milliseconds."""
+    timings = []
+    for n in range(updates):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            update_invoice(
+                invoice_ids[n % len(invoice_ids)],
+                InvoiceUpdate(amount=Decimal(100 + n % 50)),
+                Response(),
+                db,
+                user,
+                None
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    return timings
+
+
+def audit_entries(user_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.count()).where(AuditEntry.user_id == user_id)).scalar()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    invoices = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print("🚀 Audit log write-path benchmark")
+    print("=" * 60)
+    print(f"{updates} invoice updates over {invoices} invoices per mode")
+
+    user, invoice_ids = setup(invoices)
+    try:
+        print("-" * 60)
+        print(f"{'mode':10} {'updates/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'entries':>8}")
+        for mode in ("off", "sync", "buffered"):
+            audit.AUDIT_MODE = mode
+            if mode == "buffered":
+                audit.audit_buffer.start()
+            before = audit_entries(user.id)
+            timings = run(user, invoice_ids, updates)
+            drain = time.perf_counter()
+            if mode == "buffered":
+                audit.audit_buffer.stop()
+            drain = (time.perf_counter() - drain) * 1000
+            written = audit_entries(user.id) - before
+            p99 = statistics.quantiles(timings, n=100)[98]
+            print(
+                f"{mode:10} {len(timings) / (sum(timings) / 1000):10.0f} "
+                f"{statistics.median(timings):8.2f} {p99:8.2f} {written:8}"
+            )
+            if mode == "buffered":
+                print(f"{'':10} final flush on stop: {drain:.1f} ms")
+    finally:
+        cleanup(user.id)
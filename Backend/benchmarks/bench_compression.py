@@ -0,0 +1,126 @@
+"""
+Benchmark: GET /invoices payload size and latency with fields= and compression.
+
+Creates a throwaway benchmark user with invoices carrying full-length
+descriptions, then fetches 100 and 1000-row pages through the
+get_invoices handler (no HTTP), all fields and a typical list projection,
+each sent as is, gzip and brotli (when installed). Reports bytes on the
+wire and the time for query + serialization + compression. Everything
+the benchmark created is deleted at the end.
+
+Runs against the configured database (DATABASE_URL) with the real tables.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_compression [repeats]
+"""
+
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+
+# Settings are parsed when app.config is first imported
+os.environ.setdefault("DB_ECHO", "false")
+
+from app.compression import brotli, compress
+from app.database import Base, SessionLocal, get_engine
+from app.main import get_invoices
+from app.models import Invoice, User
+from app.schemas import InvoiceResponse
+
+BENCH_EMAIL = "bench-compression@example.com"
+PAGES = (100, 1000)
+LIST_FIELDS = "invoice_number,customer_name,amount,currency,status,due_date"
+
+full_adapter = TypeAdapter(List[InvoiceResponse])
+
+
+def setup(invoices: int) -> User:
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    db.expire_on_commit = False
+    try:
+        user = User(email=BENCH_EMAIL, hashed_password="!", full_name="Compression benchmark")
+        db.add(user)
+        db.flush()
+        today = date.today()
+        db.execute(insert(Invoice), [
+            {
+                "user_id": user.id,
+                "invoice_number": f"CMP-{n:06d}",
+                "customer_name": f"Customer {n % 37}",
+                "customer_email": f"billing{n % 37}@example.com",
+                "amount": 100 + n % 900,
+                "status": ("draft", "sent", "paid", "overdue")[n % 4],
+                "description": (f"Consulting services for project {n}, " * 40)[:1000],
+                "issue_date": today - timedelta(days=n % 365),
+                "due_date": today + timedelta(days=30 - n % 365),
+            }
+            for n in range(invoices)
+        ])
+        db.commit()
+        return user
+    finally:
+        db.close()
+
+
+def cleanup(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(Invoice).where(Invoice.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def fetch(user: User, limit: int, fields) -> bytes:
+    """Response body as FastAPI would send it."""
+    db = SessionLocal()
+    try:
+        result = get_invoices(skip=0, limit=limit, status=None, fields=fields, db=db, current_user=user)
+        if isinstance(result, Response):
+            return result.body
+        return full_adapter.dump_json(full_adapter.validate_python(result, from_attributes=True))
+    finally:
+        db.close()
+
+
+def measure(user: User, limit: int, fields, encoding, repeats: int) -> tuple:
+    """Returns (bytes, median milliseconds)."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fetch(user, limit, fields)
+        if encoding is not None:
+            body = compress(encoding, body)
+        timings.append((time.perf_counter() - start) * 1000)
+    return len(body), statistics.median(timings)
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    encodings = [None, "gzip"] + (["br"] if brotli is not None else [])
+
+    print("🚀 GET /invoices payload benchmark")
+    print("=" * 60)
+    if brotli is None:
+        print("brotli not installed, skipping br (pip install brotli)")
+
+    user = setup(max(PAGES))
+    try:
+        print(f"{'rows':>5} {'fields':8} {'encoding':9} {'bytes':>10} {'ms':>8}")
+        print("-" * 60)
+        for limit in PAGES:
+            for label, fields in (("all", None), ("list", LIST_FIELDS)):
+                for encoding in encodings:
+                    size, ms = measure(user, limit, fields, encoding, repeats)
+                    print(f"{limit:5} {label:8} {encoding or 'identity':9} {size:10,} {ms:8.2f}")
+    finally:
+        cleanup(user.id)
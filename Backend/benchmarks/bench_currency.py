@@ -0,0 +1,135 @@
+"""
+Benchmark: converted invoice totals, SQL-side rate join vs converting in Python.
+
+Builds scratch tables with mixed-currency invoices and a year of daily
+exchange rates in the configured Postgres database (DATABASE_URL), then
+computes totals by status in one reporting currency two ways:
+
+    SQL     - join each invoice to the latest rate of its currency and
+              aggregate in the database (what GET /invoices/summary does)
+    Python  - fetch every invoice and convert it with a rate dict
+
+The scratch tables are dropped at the end.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_currency [invoices] [runs]
+"""
+
+import statistics
+import sys
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+INVOICES = "bench_fx_invoices"
+RATES = "bench_fx_rates"
+CURRENCIES = ["USD", "EUR", "GBP", "JPY", "CHF", "CAD", "AUD", "SEK", "NOK", "DKK"]
+
+LATEST_RATES = f"""
+    SELECT r.currency, r.rate_to_base FROM {RATES} r
+    JOIN (
+        SELECT currency, max(rate_date) AS rate_date FROM {RATES}
+        WHERE rate_date <= :as_of GROUP BY currency
+    ) latest ON latest.currency = r.currency AND latest.rate_date = r.rate_date
+"""
+
+SQL_SUMMARY = f"""
+    SELECT i.status, count(*), sum(i.amount * rates.rate_to_base / :reporting_rate)
+    FROM {INVOICES} i
+    LEFT JOIN ({LATEST_RATES}) rates ON rates.currency = i.currency
+    GROUP BY i.status
+"""
+
+
+def setup(conn, invoices: int) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {INVOICES}, {RATES}"))
+    conn.execute(text(f"""
+        CREATE TABLE {RATES} (
+            currency varchar(3) NOT NULL,
+            rate_date date NOT NULL,
+            rate_to_base numeric(18, 8) NOT NULL,
+            PRIMARY KEY (currency, rate_date)
+        )
+    """))
+    conn.execute(text(f"""
+        INSERT INTO {RATES}
+        SELECT c.code, DATE '2024-01-01' + d, round((0.5 + random())::numeric, 8)
+        FROM unnest(CAST(:currencies AS varchar[])) AS c(code), generate_series(0, 364) AS d
+    """), {"currencies": CURRENCIES})
+    conn.execute(text(f"""
+        CREATE TABLE {INVOICES} (
+            id integer PRIMARY KEY,
+            amount numeric(10, 2) NOT NULL,
+            currency varchar(3) NOT NULL,
+            status varchar NOT NULL
+        )
+    """))
+    conn.execute(text(f"""
+        INSERT INTO {INVOICES}
+        SELECT n, (n % 5000) + 0.99,
+               (CAST(:currencies AS varchar[]))[1 + n % :currency_count],
+               (ARRAY['draft', 'sent', 'paid', 'overdue'])[1 + n % 4]
+        FROM generate_series(1, :invoices) AS n
+    """), {"currencies": CURRENCIES, "currency_count": len(CURRENCIES), "invoices": invoices})
+    conn.execute(text(f"ANALYZE {INVOICES}"))
+    conn.execute(text(f"ANALYZE {RATES}"))
+
+
+def summary_in_sql(conn, as_of: str, reporting_rate: Decimal) -> dict:
+    rows = conn.execute(text(SQL_SUMMARY), {"as_of": as_of, "reporting_rate": reporting_rate}).all()
+    return {status: total for status, _, total in rows}
+
+
+def summary_in_python(conn, as_of: str, reporting_rate: Decimal) -> dict:
+    rates = dict(conn.execute(text(LATEST_RATES), {"as_of": as_of}).all())
+    totals = defaultdict(Decimal)
+    for amount, currency, status in conn.execute(text(f"SELECT amount, currency, status FROM {INVOICES}")):
+        totals[status] += amount * rates[currency] / reporting_rate
+    return dict(totals)
+
+
+def time_runs(func, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    invoices = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("🚀 Multi-currency summary benchmark")
+    print("=" * 60)
+    print(f"{invoices} invoices in {len(CURRENCIES)} currencies, {runs} runs each")
+
+    engine = create_engine(get_settings().database_url, isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        setup(conn, invoices)
+        print(f"Loaded in {time.perf_counter() - start:.1f} s")
+        try:
+            as_of = "2024-12-31"
+            rates = dict(conn.execute(text(LATEST_RATES), {"as_of": as_of}).all())
+            reporting_rate = rates["EUR"]
+
+            print("-" * 60)
+            print(f"{'method':10} {'median s':>10} {'min s':>10}")
+            results = {}
+            for name, func in (("SQL", summary_in_sql), ("Python", summary_in_python)):
+                timings = time_runs(lambda: func(conn, as_of, reporting_rate), runs)
+                results[name] = func(conn, as_of, reporting_rate)
+                print(f"{name:10} {statistics.median(timings):10.3f} {min(timings):10.3f}")
+
+            # Both methods must agree (up to rounding of the division)
+            for status, total in results["SQL"].items():
+                assert abs(total - results["Python"][status]) < 1, status
+            print("✅ Totals match")
+        finally:
+            conn.execute(text(f"DROP TABLE IF EXISTS {INVOICES}, {RATES}"))
@@ -0,0 +1,77 @@
+"""
+Benchmark: idle WebSocket connections vs worker RSS.
+
+Starts one worker, opens idle /ws connections in steps and reports the
+worker's resident memory after each step, plus the cost per connection.
+Needs an existing user (live updates are per user) and a high enough
+open-file limit (ulimit -n) for the client and the server.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_live_connections user@example.com [max_connections]
+"""
+
+import asyncio
+import subprocess
+import sys
+import time
+
+import websockets
+
+from app.auth import create_access_token
+
+PORT = 8767
+STEPS = [0, 1000, 2500, 5000, 10000]
+
+
+def rss_mib(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmRSS not found")
+
+
+async def main(email: str, max_connections: int) -> None:
+    token = create_access_token({"sub": email})
+    url = f"ws://127.0.0.1:{PORT}/ws?token={token}"
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1",
+         "--port", str(PORT), "--log-level", "warning"],
+    )
+    connections = []
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                connections.append(await websockets.connect(url, compression=None))
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+        baseline = rss_mib(server.pid)
+        print(f"{'connections':>12} {'RSS MiB':>10} {'KiB/conn':>10}")
+        for step in [s for s in STEPS if s <= max_connections]:
+            while len(connections) < step:
+                batch = min(200, step - len(connections))
+                connections += await asyncio.gather(
+                    *(websockets.connect(url, compression=None) for _ in range(batch))
+                )
+            await asyncio.sleep(1)
+            rss = rss_mib(server.pid)
+            per_conn = (rss - baseline) * 1024 / len(connections) if len(connections) > 1 else 0
+            print(f"{len(connections):>12} {rss:>10.1f} {per_conn:>10.1f}")
+    finally:
+        await asyncio.gather(*(c.close() for c in connections), return_exceptions=True)
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m benchmarks.bench_live_connections user@example.com [max_connections]")
+        sys.exit(1)
+    print("🚀 Live connection memory benchmark")
+    print("=" * 50)
+    asyncio.run(main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else STEPS[-1]))
@@ -0,0 +1,122 @@
+"""
+Benchmark: update throughput under contention, SELECT FOR UPDATE vs versioned UPDATE.
+
+Several threads keep updating a small set of hot rows, doing some work
+between reading a row and writing it back, like a request handler does.
+Pessimistic writers lock the row for that whole time with
+SELECT ... FOR UPDATE, so writers to the same row queue up behind each
+other. Optimistic writers hold no lock while working and write with one
+UPDATE ... WHERE version = ?; only the writers that actually lost a race
+retry.
+
+Uses scratch tables in the configured Postgres database (DATABASE_URL),
+dropped at the end.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_optimistic_locking [threads] [hot_rows] [work_ms] [seconds]
+"""
+
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+TABLE = "bench_versioned_rows"
+
+
+def pessimistic_update(conn, row_id: int, work: float) -> int:
+    """Returns the number of retries (always 0, the lock makes writers wait)."""
+    with conn.begin():
+        amount = conn.execute(text(
+            f"SELECT amount FROM {TABLE} WHERE id = :id FOR UPDATE"
+        ), {"id": row_id}).scalar()
+        time.sleep(work)
+        conn.execute(text(
+            f"UPDATE {TABLE} SET amount = :amount WHERE id = :id"
+        ), {"id": row_id, "amount": amount + 1})
+    return 0
+
+
+def optimistic_update(conn, row_id: int, work: float) -> int:
+    """Returns the number of retries after losing a race."""
+    retries = 0
+    while True:
+        with conn.begin():
+            amount, version = conn.execute(text(
+                f"SELECT amount, version FROM {TABLE} WHERE id = :id"
+            ), {"id": row_id}).one()
+        time.sleep(work)
+        with conn.begin():
+            updated = conn.execute(text(
+                f"UPDATE {TABLE} SET amount = :amount, version = version + 1 "
+                f"WHERE id = :id AND version = :version"
+            ), {"id": row_id, "amount": amount + 1, "version": version}).rowcount
+        if updated:
+            return retries
+        retries += 1
+
+
+def run(engine, update, threads: int, hot_rows: int, work: float, seconds: float) -> tuple:
+    """Returns (successful updates, retries)."""
+    deadline = time.monotonic() + seconds
+    totals = []
+    lock = threading.Lock()
+
+    def writer():
+        done = retries = 0
+        with engine.connect() as conn:
+            while time.monotonic() < deadline:
+                retries += update(conn, random.randint(1, hot_rows), work)
+                done += 1
+        with lock:
+            totals.append((done, retries))
+
+    workers = [threading.Thread(target=writer) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(t[0] for t in totals), sum(t[1] for t in totals)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    hot_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    work_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    seconds = float(sys.argv[4]) if len(sys.argv) > 4 else 10.0
+
+    print("🚀 Optimistic vs pessimistic locking benchmark")
+    print("=" * 60)
+    print(f"{threads} writers, {hot_rows} hot rows, {work_ms} ms of work per update, {seconds} s per run")
+
+    engine = create_engine(
+        get_settings().database_url,
+        pool_size=threads,
+        max_overflow=0
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(
+            f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, amount numeric NOT NULL, version integer NOT NULL)"
+        ))
+        conn.execute(text(
+            f"INSERT INTO {TABLE} SELECT n, 0, 1 FROM generate_series(1, :rows) AS n"
+        ), {"rows": hot_rows})
+
+    try:
+        print("-" * 60)
+        print(f"{'strategy':28} {'updates/s':>10} {'retries':>9}")
+        for name, update in (
+            ("SELECT ... FOR UPDATE", pessimistic_update),
+            ("UPDATE ... WHERE version = ?", optimistic_update),
+        ):
+            done, retries = run(engine, update, threads, hot_rows, work_ms / 1000, seconds)
+            print(f"{name:28} {done / seconds:10.1f} {retries:9}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        engine.dispose()
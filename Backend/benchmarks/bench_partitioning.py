@@ -0,0 +1,128 @@
+"""
+Benchmark: invoice queries on a plain table vs one hash-partitioned by user_id.
+
+Builds two scratch tables with the same rows and indexes in the configured
+Postgres database (DATABASE_URL), then times the per-user queries the API
+runs: the invoice list page, a status summary, and a date-range scan.
+Partitioning pays off once the table outgrows memory, so use a large row
+count to see a difference. The scratch tables are dropped at the end.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_partitioning [rows] [users] [partitions]
+"""
+
+import random
+import re
+import statistics
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from app.config import get_settings
+
+QUERIES = {
+    "list page": """
+        SELECT id, invoice_number, amount, status FROM {table}
+        WHERE user_id = :user_id AND deleted_at IS NULL
+        ORDER BY invoice_number LIMIT 50
+    """,
+    "status summary": """
+        SELECT status, count(*), sum(amount) FROM {table}
+        WHERE user_id = :user_id AND deleted_at IS NULL
+        GROUP BY status
+    """,
+    "date range": """
+        SELECT count(*) FROM {table}
+        WHERE user_id = :user_id AND issue_date >= DATE '2024-01-01'
+    """,
+}
+
+
+def create_table(conn, table: str, rows: int, users: int, partitions: int = 0) -> None:
+    conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+    partition_by = " PARTITION BY HASH (user_id)" if partitions else ""
+    conn.execute(text(f"""
+        CREATE TABLE {table} (
+            id integer NOT NULL,
+            user_id integer NOT NULL,
+            invoice_number varchar NOT NULL,
+            amount numeric(10, 2) NOT NULL,
+            status varchar NOT NULL,
+            issue_date date NOT NULL,
+            deleted_at timestamptz,
+            PRIMARY KEY (id, user_id)
+        ){partition_by}
+    """))
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"CREATE TABLE {table}_p{remainder} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+    conn.execute(text(f"""
+        INSERT INTO {table}
+        SELECT n, 1 + n % :users, 'INV-' || n, (n % 5000) + 0.99,
+               (ARRAY['draft', 'sent', 'paid', 'overdue'])[1 + n % 4],
+               DATE '2022-01-01' + (n % 1095),
+               CASE WHEN n % 50 = 0 THEN now() END
+        FROM generate_series(1, :rows) AS n
+    """), {"rows": rows, "users": users})
+    conn.execute(text(
+        f"CREATE INDEX {table}_user_live ON {table} (user_id, invoice_number) WHERE deleted_at IS NULL"
+    ))
+    conn.execute(text(f"CREATE INDEX {table}_user_issue_date ON {table} (user_id, issue_date)"))
+    conn.execute(text(f"ANALYZE {table}"))
+
+
+def time_query(conn, sql: str, user_ids: list) -> list:
+    """Return the latency of each run in milliseconds."""
+    timings = []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        conn.execute(text(sql), {"user_id": user_id}).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    partitions = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    print("🚀 Partitioning benchmark")
+    print("=" * 60)
+    print(f"{rows} invoices, {users} users, {partitions} hash partitions")
+
+    # Own engine: the app's one echoes every statement by default
+    engine = create_engine(get_settings().database_url, isolation_level="AUTOCOMMIT")
+    tables = {"plain": "bench_invoices_plain", "partitioned": "bench_invoices_partitioned"}
+    with engine.connect() as conn:
+        for name, table in tables.items():
+            start = time.perf_counter()
+            create_table(conn, table, rows, users, partitions if name == "partitioned" else 0)
+            print(f"Loaded {name:12} in {time.perf_counter() - start:6.1f} s")
+
+        user_ids = [random.randint(1, users) for _ in range(200)]
+        try:
+            print("-" * 60)
+            print(f"{'query':16} {'table':12} {'p50 ms':>9} {'p95 ms':>9}")
+            for query, sql in QUERIES.items():
+                for name, table in tables.items():
+                    # Warm up, then measure
+                    time_query(conn, sql.format(table=table), user_ids[:20])
+                    timings = sorted(time_query(conn, sql.format(table=table), user_ids))
+                    p50 = statistics.median(timings)
+                    p95 = timings[int(len(timings) * 0.95)]
+                    print(f"{query:16} {name:12} {p50:9.3f} {p95:9.3f}")
+
+            plan = conn.execute(text(
+                "EXPLAIN " + QUERIES["status summary"].format(table=tables["partitioned"])
+            ), {"user_id": 1}).scalars().all()
+            scanned = len(set(re.findall(
+                rf"\b{tables['partitioned']}_p\d+\b", "\n".join(plan)
+            )))
+            print("-" * 60)
+            print(f"Partitions scanned for one user: {scanned} of {partitions}")
+        finally:
+            for table in tables.values():
+                conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
@@ -0,0 +1,75 @@
+"""
+Benchmark: cold PDF renders vs render cache hits.
+
+Renders synthetic invoices directly (cold), then through the process
+pool, then reads them back from a PdfCache in a temporary directory.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_pdf [invoices] [line_items]
+"""
+
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+from app.pdf import PdfCache, get_pool, render_invoice_pdf, shutdown_pool
+
+
+def make_invoice(number: int, line_items: int) -> dict:
+    items = [
+        {
+            "description": f"Consulting services, item {i}",
+            "quantity": "2.00",
+            "unit_price": "150.00",
+            "amount": "300.00",
+        }
+        for i in range(line_items)
+    ]
+    return {
+        "invoice_number": f"INV-{number:06d}",
+        "customer_name": "Acme Corporation",
+        "customer_email": "billing@acmecorp.com",
+        "amount": f"{300 * line_items:.2f}",
+        "status": "sent",
+        "description": "Monthly subscription",
+        "issue_date": date.today().isoformat(),
+        "due_date": date.today().isoformat(),
+        "line_items": items,
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    line_items = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    invoices = [make_invoice(i, line_items) for i in range(count)]
+    modified_at = datetime.now(timezone.utc)
+
+    print("🚀 PDF render benchmark")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    rendered = [render_invoice_pdf(invoice) for invoice in invoices]
+    cold = (time.perf_counter() - start) / count
+
+    pool = get_pool()
+    list(pool.map(render_invoice_pdf, invoices[:2]))  # start the pool processes
+    start = time.perf_counter()
+    list(pool.map(render_invoice_pdf, invoices))
+    pooled = (time.perf_counter() - start) / count
+    shutdown_pool()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = PdfCache(tmp)
+        keys = [cache.key(i, modified_at) for i in range(count)]
+        for key, data in zip(keys, rendered):
+            cache.put(key, data)
+        start = time.perf_counter()
+        for key in keys:
+            cache.get(key)
+        cached = (time.perf_counter() - start) / count
+
+    print(f"Invoices: {count} x {line_items} line items, {sum(map(len, rendered)) / count / 1024:.1f} KiB avg")
+    print(f"Cold render (in process): {cold * 1000:8.2f} ms/invoice")
+    print(f"Cold render (pool):       {pooled * 1000:8.2f} ms/invoice")
+    print(f"Cached:                   {cached * 1000:8.3f} ms/invoice  ({cold / cached:.0f}x faster)")
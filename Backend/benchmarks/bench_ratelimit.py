@@ -0,0 +1,55 @@
+"""
+Benchmark: per-request overhead of the authentication rate limiter.
+
+The limiter runs on every /auth/token and /auth/register request, so it
+has to stay well under the 50µs budget. Each iteration does what
+check_auth_rate_limit does on an allowed request: one per-IP and one
+per-email bucket check, spread over many distinct keys.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_ratelimit [iterations]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from app.ratelimit import (
+    InMemoryBackend,
+    SQLiteBackend,
+    IP_RATE,
+    IP_BURST,
+    EMAIL_RATE,
+    EMAIL_BURST,
+)
+
+BUDGET_US = 50.0
+
+
+def bench(backend, iterations: int) -> float:
+    """Return the average cost of one IP + email check in microseconds."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        backend.consume(f"ip:10.0.{i % 256}.{i % 97}", IP_RATE, IP_BURST)
+        backend.consume(f"email:user{i % 5000}@example.com", EMAIL_RATE, EMAIL_BURST)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    print("🚀 Rate limiter benchmark")
+    print("=" * 50)
+
+    memory_us = bench(InMemoryBackend(), iterations)
+    status = "✅" if memory_us < BUDGET_US else "❌"
+    print(f"{status} memory backend: {memory_us:8.2f} µs/request (budget {BUDGET_US:.0f} µs)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_backend = SQLiteBackend(os.path.join(tmp, "ratelimit.sqlite3"))
+        sqlite_us = bench(sqlite_backend, max(1, iterations // 20))
+        print(f"   sqlite backend: {sqlite_us:8.2f} µs/request (shared across workers)")
+
+    if memory_us >= BUDGET_US:
+        sys.exit(1)
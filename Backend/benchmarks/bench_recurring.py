@@ -0,0 +1,126 @@
+"""
+Benchmark: catch-up generation of recurring invoices with parallel schedulers.
+
+Creates monthly templates for a throwaway benchmark user, all starting far
+enough in the past that templates * runs invoices are due at once (the
+situation after a long scheduler outage), then runs app.recurring.generate_due
+in several processes at the same time. Reports invoices per second and the
+peak memory of each scheduler process, and checks that no run was
+generated twice. Everything the benchmark created is deleted at the end.
+
+Runs against the configured database (DATABASE_URL) with the real tables.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_recurring [templates] [runs_per_template] [processes]
+"""
+
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import delete, func, insert, select
+
+# Settings are parsed when app.config is first imported
+os.environ.setdefault("DB_ECHO", "false")
+
+from app.database import Base, SessionLocal, get_engine
+from app.models import Invoice, OutboxEvent, RecurringInvoice, User
+from app.recurring import generate_due, run_date
+
+BENCH_EMAIL = "bench-recurring@example.com"
+
+
+def setup(templates: int, runs: int) -> int:
+    """Create the benchmark user and templates; returns the user id."""
+    Base.metadata.create_all(bind=get_engine())
+    db = SessionLocal()
+    try:
+        user = User(email=BENCH_EMAIL, hashed_password="!", full_name="Recurring benchmark")
+        db.add(user)
+        db.flush()
+        start_date = run_date(date.today().replace(day=1), "monthly", -(runs - 1))
+        batch = 10_000
+        for offset in range(0, templates, batch):
+            db.execute(insert(RecurringInvoice), [
+                {
+                    "user_id": user.id,
+                    "customer_name": f"Subscriber {n}",
+                    "amount": 49,
+                    "description": "Monthly subscription",
+                    "invoice_number_prefix": f"SUB{n}",
+                    "interval": "monthly",
+                    "start_date": start_date,
+                    "next_run_date": start_date,
+                }
+                for n in range(offset, min(offset + batch, templates))
+            ])
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def cleanup(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        for model in (OutboxEvent, Invoice, RecurringInvoice):
+            db.execute(delete(model).where(model.user_id == user_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+    finally:
+        db.close()
+
+
+def scheduler_process(results) -> None:
+    start = time.perf_counter()
+    claimed = generate_due()
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((claimed, time.perf_counter() - start, peak_mb))
+
+
+if __name__ == "__main__":
+    templates = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    print("🚀 Recurring invoice benchmark")
+    print("=" * 60)
+    print(f"{templates} templates x {runs} due runs = {templates * runs} invoices, {processes} schedulers")
+
+    user_id = setup(templates, runs)
+    try:
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        workers = [context.Process(target=scheduler_process, args=(results,)) for _ in range(processes)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        stats = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        db = SessionLocal()
+        try:
+            created, distinct = db.execute(
+                select(func.count(), func.count(func.distinct(Invoice.invoice_number)))
+                .where(Invoice.user_id == user_id)
+            ).one()
+        finally:
+            db.close()
+
+        print("-" * 60)
+        for n, (claimed, seconds, peak_mb) in enumerate(stats):
+            print(f"scheduler {n}: {claimed:8} claims in {seconds:6.1f} s, peak RSS {peak_mb:7.1f} MB")
+        print(f"Invoices created:  {created} ({distinct} distinct numbers)")
+        print(f"Wall time:         {elapsed:.1f} s")
+        print(f"Throughput:        {created / elapsed:,.0f} invoices/s")
+        if created == distinct == templates * runs:
+            print("✅ Every run generated exactly once")
+        else:
+            print("❌ Missing or duplicate invoices")
+    finally:
+        cleanup(user_id)
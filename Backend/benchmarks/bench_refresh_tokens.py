@@ -0,0 +1,58 @@
+"""
+Benchmark: bcrypt CPU per active user per day, password logins vs refresh tokens.
+
+Before refresh tokens, every expired access token meant a new password login,
+and each login pays one bcrypt verification. With refresh tokens, only the
+first login of a session pays it. Renewals cost one SHA-256 digest and an
+indexed lookup.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_refresh_tokens [working_hours_per_day]
+"""
+
+import sys
+import time
+
+from app.auth import (
+    hash_password,
+    verify_password,
+    _hash_refresh_token,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
+
+
+def time_per_call(func, repeat: int) -> float:
+    """Return the average wall time of func() in seconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+if __name__ == "__main__":
+    working_hours = float(sys.argv[1]) if len(sys.argv) > 1 else 8.0
+
+    print("🚀 Refresh token benchmark")
+    print("=" * 50)
+
+    hashed = hash_password("benchmark-password")
+    bcrypt_cost = time_per_call(lambda: verify_password("benchmark-password", hashed), 20)
+    digest_cost = time_per_call(lambda: _hash_refresh_token("x" * 43), 100_000)
+
+    # Without refresh tokens: one password login per access token lifetime
+    logins_before = working_hours * 60 / ACCESS_TOKEN_EXPIRE_MINUTES
+    # With refresh tokens: one password login per refresh token lifetime
+    logins_after = 1 / REFRESH_TOKEN_EXPIRE_DAYS
+    renewals_after = logins_before
+
+    cpu_before = logins_before * bcrypt_cost
+    cpu_after = logins_after * bcrypt_cost + renewals_after * digest_cost
+
+    print(f"bcrypt verify:          {bcrypt_cost * 1000:8.2f} ms")
+    print(f"refresh token digest:   {digest_cost * 1_000_000:8.2f} µs")
+    print(f"Active hours per day:   {working_hours:8.1f}")
+    print("-" * 50)
+    print(f"Before: {logins_before:5.1f} logins/day   -> {cpu_before * 1000:8.1f} ms CPU/user/day")
+    print(f"After:  {logins_after:5.2f} logins/day   -> {cpu_after * 1000:8.1f} ms CPU/user/day")
+    print(f"Reduction: {(1 - cpu_after / cpu_before) * 100:.1f}%")
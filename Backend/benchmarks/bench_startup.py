@@ -0,0 +1,83 @@
+"""
+Benchmark: import time of app.main and time to first response.
+
+Both numbers are tracked against budgets below; the script exits non-zero
+when either is exceeded, so it can run in CI. Each measurement runs in a
+fresh interpreter so nothing is already imported.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_startup [runs]
+"""
+
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Budgets in milliseconds
+IMPORT_BUDGET_MS = 400
+FIRST_RESPONSE_BUDGET_MS = 1500
+
+PORT = 8766
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def import_time_ms() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        check=True, capture_output=True, text=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def first_response_ms() -> float:
+    """Start a single worker and wait for the first successful GET /."""
+    env = dict(os.environ, DB_CREATE_TABLES="false")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "1",
+         "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while True:
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=1)
+                conn.request("GET", "/")
+                if conn.getresponse().status == 200:
+                    return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.01)
+            if time.perf_counter() - start > 30:
+                raise RuntimeError("Server did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("🚀 Startup benchmark")
+    print("=" * 50)
+
+    import_ms = statistics.median(import_time_ms() for _ in range(runs))
+    response_ms = statistics.median(first_response_ms() for _ in range(runs))
+
+    ok = True
+    for label, value, budget in (
+        ("import app.main", import_ms, IMPORT_BUDGET_MS),
+        ("time to first response", response_ms, FIRST_RESPONSE_BUDGET_MS),
+    ):
+        within = value <= budget
+        ok = ok and within
+        print(f"{'✅' if within else '❌'} {label}: {value:8.1f} ms (budget {budget} ms)")
+
+    if not ok:
+        sys.exit(1)
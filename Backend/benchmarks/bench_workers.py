@@ -0,0 +1,73 @@
+"""
+Benchmark: throughput of serve.py with 1 worker vs N workers.
+
+Starts the server as a subprocess, hammers GET / from several client
+processes over keep-alive connections, and reports requests per second.
+GET / does no database work, so this measures the HTTP/worker layer only.
+
+Run from the Backend directory:
+    python -m benchmarks.bench_workers [workers] [seconds]
+"""
+
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+PORT = 8765
+CLIENT_PROCESSES = max(2, (os.cpu_count() or 2))
+
+
+def client(duration: float) -> int:
+    """Send requests on one keep-alive connection until duration elapses."""
+    conn = http.client.HTTPConnection("127.0.0.1", PORT)
+    count = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        conn.request("GET", "/")
+        conn.getresponse().read()
+        count += 1
+    conn.close()
+    return count
+
+
+def wait_until_ready(timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+
+def run(workers: int, duration: float) -> float:
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers),
+         "--port", str(PORT), "--log-level", "warning"],
+    )
+    try:
+        wait_until_ready()
+        with multiprocessing.Pool(CLIENT_PROCESSES) as pool:
+            counts = pool.map(client, [duration] * CLIENT_PROCESSES)
+        return sum(counts) / duration
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+
+    print("🚀 Worker scaling benchmark")
+    print("=" * 50)
+    single = run(1, duration)
+    print(f"1 worker:   {single:10.0f} req/s")
+    multi = run(workers, duration)
+    print(f"{workers} workers: {multi:10.0f} req/s  ({multi / single:.1f}x)")
@@ -0,0 +1,228 @@
+"""
+Move the invoices table to Postgres declarative partitioning, online.
+
+Every invoice query is scoped by user_id, so hash partitioning by user_id
+lets Postgres prune each query to a single partition, and vacuum and index
+maintenance work on one partition at a time. Range partitioning by
+issue_date (monthly) suits installations that mostly query recent invoices
+and drop old ones.
+
+The migration runs in steps while the API keeps serving traffic:
+
+    1. prepare  - create the partitioned table invoices_partitioned with its
+                  partitions and indexes, and a trigger on invoices that
+                  mirrors every insert/update/delete into it
+    2. backfill - copy existing rows in small batches (short transactions)
+    3. swap     - in one short transaction, rename the tables so the
+                  partitioned one becomes "invoices"; the old table is kept
+                  as invoices_unpartitioned until you drop it yourself
+
+Usage (from the Backend directory):
+    python partition_invoices.py prepare [hash|range] [partitions]
+    python partition_invoices.py backfill [batch_size]
+    python partition_invoices.py swap
+
+Notes:
+- The primary key becomes (id, user_id) or (id, issue_date), since a
+  partitioned table's unique keys must include the partition key. Ids
+  still come from the same sequence and stay unique.
+- Foreign keys can't point at a partitioned table by id alone, so the
+  invoice_line_items -> invoices foreign key is dropped in the swap. The
+  purger deletes line items of purged invoices itself.
+"""
+
+import sys
+from datetime import date
+
+from sqlalchemy import text
+
+from app.database import get_engine
+from app.models import Invoice
+
+NEW_TABLE = "invoices_partitioned"
+OLD_TABLE = "invoices_unpartitioned"
+TRIGGER = "invoices_mirror_to_partitioned"
+
+DEFAULT_HASH_PARTITIONS = 16
+DEFAULT_BATCH_SIZE = 5000
+
+# Generated columns (base_amount) are computed by the new table itself
+COLUMNS = [column.name for column in Invoice.__table__.columns if column.computed is None]
+
+
+def _partition_key(conn) -> str:
+    row = conn.execute(text(
+        "SELECT pg_get_partkeydef(CAST(:table AS regclass))"
+    ), {"table": NEW_TABLE}).scalar()
+    return "user_id" if "user_id" in row else "issue_date"
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def prepare(scheme: str = "hash", partitions: int = DEFAULT_HASH_PARTITIONS) -> None:
+    if scheme not in ("hash", "range"):
+        raise ValueError("scheme must be 'hash' or 'range'")
+    key = "user_id" if scheme == "hash" else "issue_date"
+
+    with get_engine().begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE {NEW_TABLE} "
+            f"(LIKE invoices INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE) "
+            f"PARTITION BY {scheme.upper()} ({key})"
+        ))
+        conn.execute(text(f"ALTER TABLE {NEW_TABLE} ADD PRIMARY KEY (id, {key})"))
+
+        if scheme == "hash":
+            for remainder in range(partitions):
+                conn.execute(text(
+                    f"CREATE TABLE {NEW_TABLE}_p{remainder} PARTITION OF {NEW_TABLE} "
+                    f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+                ))
+        else:
+            first, last = conn.execute(text(
+                "SELECT min(issue_date), max(issue_date) FROM invoices"
+            )).one()
+            today = date.today()
+            start = (first or today).replace(day=1)
+            end = _add_months(max(last or today, today), 12)
+            while start < end:
+                following = _add_months(start, 1)
+                conn.execute(text(
+                    f"CREATE TABLE {NEW_TABLE}_{start:%Y_%m} PARTITION OF {NEW_TABLE} "
+                    f"FOR VALUES FROM ('{start}') TO ('{following}')"
+                ))
+                start = following
+            # Catches dates outside the pre-created months
+            conn.execute(text(f"CREATE TABLE {NEW_TABLE}_default PARTITION OF {NEW_TABLE} DEFAULT"))
+
+        # LIKE doesn't copy foreign keys
+        for fk in Invoice.__table__.foreign_key_constraints:
+            columns = ", ".join(fk.column_keys)
+            referred = ", ".join(element.column.name for element in fk.elements)
+            ddl = f"ALTER TABLE {NEW_TABLE} ADD FOREIGN KEY ({columns}) REFERENCES {fk.referred_table.name} ({referred})"
+            if fk.ondelete:
+                ddl += f" ON DELETE {fk.ondelete}"
+            conn.execute(text(ddl))
+
+        # Same indexes as the model, created on the parent so every
+        # partition gets them; renamed to the real names in swap()
+        for index in Invoice.__table__.indexes:
+            columns = ", ".join(column.name for column in index.columns)
+            ddl = f"CREATE INDEX {index.name}_p ON {NEW_TABLE} ({columns})"
+            where = index.dialect_options["postgresql"]["where"]
+            if where is not None:
+                where = where.compile(conn, compile_kwargs={"literal_binds": True, "include_table": False})
+                ddl += f" WHERE {where}"
+            conn.execute(text(ddl))
+
+        columns = ", ".join(COLUMNS)
+        new_values = ", ".join(f"NEW.{column}" for column in COLUMNS)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in COLUMNS)
+        conn.execute(text(f"""
+            CREATE FUNCTION {TRIGGER}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND {key} = OLD.{key};
+                    RETURN OLD;
+                END IF;
+                IF TG_OP = 'UPDATE' AND NEW.{key} IS DISTINCT FROM OLD.{key} THEN
+                    DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND {key} = OLD.{key};
+                END IF;
+                INSERT INTO {NEW_TABLE} ({columns}) VALUES ({new_values})
+                ON CONFLICT (id, {key}) DO UPDATE SET {updates};
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """))
+        conn.execute(text(
+            f"CREATE TRIGGER {TRIGGER} AFTER INSERT OR UPDATE OR DELETE ON invoices "
+            f"FOR EACH ROW EXECUTE FUNCTION {TRIGGER}()"
+        ))
+
+    print(f"✅ Created {NEW_TABLE} ({scheme} by {key}); new writes are mirrored into it")
+    print("Next: python partition_invoices.py backfill")
+
+
+def backfill(batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    engine = get_engine()
+    with engine.connect() as conn:
+        key = _partition_key(conn)
+        max_id = conn.execute(text("SELECT coalesce(max(id), 0) FROM invoices")).scalar()
+
+    columns = ", ".join(COLUMNS)
+    copied = 0
+    last_id = 0
+    while last_id < max_id:
+        # One short transaction per batch. FOR SHARE makes a concurrent
+        # update or delete of a copied row wait until the batch commits, so
+        # the trigger then applies it to the copy; rows changed before the
+        # lock are read in their latest committed version (or skipped if
+        # deleted). Without it a row deleted or re-keyed meanwhile would be
+        # copied from the stale snapshot and come back.
+        with engine.begin() as conn:
+            result = conn.execute(text(
+                f"INSERT INTO {NEW_TABLE} ({columns}) "
+                f"SELECT {columns} FROM invoices WHERE id > :low AND id <= :high FOR SHARE "
+                f"ON CONFLICT (id, {key}) DO NOTHING"
+            ), {"low": last_id, "high": last_id + batch_size})
+        copied += result.rowcount
+        last_id += batch_size
+        print(f"   copied up to id {min(last_id, max_id)} of {max_id} ({copied} rows)")
+
+    print(f"✅ Backfill complete ({copied} rows copied)")
+    print("Next: python partition_invoices.py swap")
+
+
+def swap() -> None:
+    # Counted in one snapshot but without locks: two full scans of a large
+    # table would block every invoice write for their whole duration. The
+    # mirror trigger writes both tables in the same transaction, so a
+    # snapshot sees them in step, and keeps them so until the rename.
+    with get_engine().begin() as conn:
+        conn.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+        old_count = conn.execute(text("SELECT count(*) FROM invoices")).scalar()
+        new_count = conn.execute(text(f"SELECT count(*) FROM {NEW_TABLE}")).scalar()
+    if old_count != new_count:
+        raise RuntimeError(
+            f"Row counts differ (invoices={old_count}, {NEW_TABLE}={new_count}); run backfill again"
+        )
+
+    with get_engine().begin() as conn:
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(text("LOCK TABLE invoices IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(text(f"DROP TRIGGER {TRIGGER} ON invoices"))
+        conn.execute(text(f"DROP FUNCTION {TRIGGER}()"))
+        conn.execute(text(
+            "ALTER TABLE invoice_line_items DROP CONSTRAINT IF EXISTS invoice_line_items_invoice_id_fkey"
+        ))
+
+        conn.execute(text(f"ALTER TABLE invoices RENAME TO {OLD_TABLE}"))
+        conn.execute(text(f"ALTER TABLE {NEW_TABLE} RENAME TO invoices"))
+        for index in Invoice.__table__.indexes:
+            conn.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_old"))
+            conn.execute(text(f"ALTER INDEX {index.name}_p RENAME TO {index.name}"))
+        # Keep the id sequence alive when the old table is dropped
+        conn.execute(text("ALTER SEQUENCE invoices_id_seq OWNED BY invoices.id"))
+
+    print("✅ invoices is now partitioned")
+    print(f"The previous table is kept as {OLD_TABLE}; drop it once you're satisfied:")
+    print(f"   DROP TABLE {OLD_TABLE};")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if command == "prepare":
+        prepare(
+            sys.argv[2] if len(sys.argv) > 2 else "hash",
+            int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_HASH_PARTITIONS
+        )
+    elif command == "backfill":
+        backfill(int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BATCH_SIZE)
+    elif command == "swap":
+        swap()
+    else:
+        print(__doc__)
+        sys.exit(1)
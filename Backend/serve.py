@@ -0,0 +1,98 @@
+"""
+Production server entry point.
+
+Runs the API under uvicorn with several worker processes, the uvloop event
+loop and the httptools HTTP parser. Each worker gets its own database
+connection pool, sized so that all workers together stay under the
+connection budget of the database.
+
+Usage (from the Backend directory):
+    python serve.py                         # one worker per CPU core
+    python serve.py --workers 4 --db-connection-budget 80
+    python serve.py --forwarded-allow-ips 10.0.0.5   # behind a proxy at 10.0.0.5
+
+Defaults come from app.config (HOST, PORT, WORKERS, DB_CONNECTION_BUDGET,
+GRACEFUL_TIMEOUT, FORWARDED_ALLOW_IPS); the command line overrides them.
+"""
+
+import argparse
+import os
+
+import uvicorn
+
+from app.config import get_settings
+
+
+def pool_sizes(workers: int, budget: int) -> tuple:
+    """
+    Split a connection budget between workers.
+
+    Returns:
+        Tuple of (pool_size, max_overflow) for each worker, with
+        workers * (pool_size + max_overflow) <= budget
+    """
+    per_worker = budget // workers
+    if per_worker < 1:
+        raise ValueError(
+            f"A budget of {budget} connections cannot serve {workers} workers"
+        )
+    max_overflow = per_worker // 4
+    return per_worker - max_overflow, max_overflow
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Run the Invoice API")
+    parser.add_argument("--host", default=settings.host)
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=settings.workers or os.cpu_count() or 1)
+    parser.add_argument("--db-connection-budget", type=int, default=settings.db_connection_budget)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.graceful_timeout)
+    parser.add_argument("--forwarded-allow-ips", default=settings.forwarded_allow_ips)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    pool_size, max_overflow = pool_sizes(args.workers, args.db_connection_budget)
+
+    # Workers are spawned as child processes and parse their own settings,
+    # so these override DB_POOL_SIZE/DB_MAX_OVERFLOW from .env
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+    os.environ.setdefault("DB_ECHO", "false")
+
+    print(
+        f"Starting {args.workers} worker(s) on {args.host}:{args.port} "
+        f"(DB pool {pool_size}+{max_overflow} per worker, "
+        f"budget {args.db_connection_budget})"
+    )
+
+    uvicorn.run(
+        "app.main:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop",
+        http="httptools",
+        log_level=args.log_level,
+        access_log=False,
+        # Take the client IP (rate limits) from X-Forwarded-For, but only
+        # when the request comes through one of these proxies
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        # Stop accepting connections on shutdown and let in-flight
+        # requests drain for up to this many seconds
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=5,
+        # Live update sockets (/ws) mostly sit idle: skip the per-connection
+        # zlib state of permessage-deflate and keep inbound frames small
+        ws="websockets",
+        ws_per_message_deflate=False,
+        ws_max_size=64 * 1024,
+        ws_ping_interval=30,
+        ws_ping_timeout=30,
+    )
+
+
+if __name__ == "__main__":
+    main()
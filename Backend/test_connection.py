@@ -1,9 +1,12 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 
-# Directly use your username - hardcoded for testing
-DATABASE_URL = "postgresql://miroslavkrsmanovic@localhost:5432/todo_db"
+from app.config import get_settings
 
-print(f"Testing connection to: {DATABASE_URL}")
+# Same DATABASE_URL the app uses (environment, .env or the default)
+DATABASE_URL = get_settings().database_url
+
+print(f"Testing connection to: {make_url(DATABASE_URL).render_as_string(hide_password=True)}")
 print("-" * 50)
 
 try:
@@ -25,4 +28,4 @@ except Exception as e:
     print("\nTroubleshooting:")
     print("1. Is PostgreSQL running?")
     print("2. Is the username correct?")
-    print("3. Does the database 'todo_db' exist?")
\ No newline at end of file
+    print("3. Does the database in DATABASE_URL exist?")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Local stub server for checking webhook delivery.
+
+Prints every batch of events it receives, verifies the signature when the
+webhook secret is given, and fails a share of requests on purpose so the
+dispatcher's retries and backoff can be watched.
+
+Usage (from the Backend directory):
+    python webhook_stub.py [port] [secret] [failure_rate]
+
+Private addresses are rejected as webhook URLs by default, so start the
+API with WEBHOOK_ALLOW_PRIVATE_URLS=true, then point your webhook at it:
+    PUT /webhooks  {"url": "http://127.0.0.1:9000/"}
+"""
+
+import hashlib
+import hmac
+import json
+import random
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+PORT = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+SECRET = sys.argv[2] if len(sys.argv) > 2 else None
+FAILURE_RATE = float(sys.argv[3]) if len(sys.argv) > 3 else 0.3
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        if SECRET:
+            expected = "sha256=" + hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(expected, self.headers.get("X-Webhook-Signature", "")):
+                print("❌ Bad signature")
+                self.send_response(401)
+                self.end_headers()
+                return
+
+        if random.random() < FAILURE_RATE:
+            print("⚠️  Failing this delivery on purpose")
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        events = json.loads(body)["events"]
+        print(f"✅ Received {len(events)} event(s)")
+        for event in events:
+            print(f"   [{event['id']}] {event['event_type']} {event['entity_type']} #{event['entity_id']}")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    print(f"🚀 Webhook stub listening on http://127.0.0.1:{PORT}/ (failure rate {FAILURE_RATE:.0%})")
+    HTTPServer(("127.0.0.1", PORT), StubHandler).serve_forever()
@@ -28,6 +28,7 @@ import EditIcon from "@mui/icons-material/Edit";
 import DeleteIcon from "@mui/icons-material/Delete";
 import VisibilityIcon from "@mui/icons-material/Visibility";
 import { api } from "../services/api";
+import { subscribeLive, liveListUpdater } from "../services/live";
 
 export default function Clients() {
   const [clients, setClients] = useState([]);
@@ -68,6 +69,17 @@ export default function Clients() {
 
   useEffect(() => {
     fetchClients();
+
+    // Patch the list as clients change instead of refetching it
+    const applyEvent = liveListUpdater(api.getClient, api.getClients, setClients);
+    return subscribeLive((message) => {
+      if (message.type === "resync") {
+        fetchClients();
+        return;
+      }
+      if (message.entity_type !== "client") return;
+      applyEvent(message);
+    });
   }, []);
 
   const handleOpenCreate = () => {
@@ -146,15 +158,19 @@ export default function Clients() {
       }
 
       if (selectedClient) {
-        // Update existing client
-        await api.updateClient(selectedClient.id, formData);
+        // Update existing client; rejected with 409 if someone else
+        // changed it since it was loaded
+        await api.updateClient(selectedClient.id, {
+          ...formData,
+          version: selectedClient.version,
+        });
       } else {
         // Create new client
         await api.createClient(formData);
       }
 
+      // The list is patched through the live update channel
       handleClose();
-      fetchClients();
     } catch (err) {
       let errorMessage = selectedClient
         ? "Failed to update client"
@@ -190,7 +206,6 @@ export default function Clients() {
       await api.deleteClient(selectedClient.id);
       setDeleteDialogOpen(false);
       setSelectedClient(null);
-      fetchClients();
     } catch (err) {
       setFormError(err.message || "Failed to delete client");
       console.error("Error deleting client:", err);
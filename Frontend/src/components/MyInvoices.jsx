@@ -21,6 +21,7 @@ import RefreshIcon from "@mui/icons-material/Refresh";
 import AddIcon from "@mui/icons-material/Add";
 import VisibilityIcon from "@mui/icons-material/Visibility";
 import { api } from "../services/api";
+import { subscribeLive, liveListUpdater } from "../services/live";
 import InvoiceDialog from "./InvoiceDialog";
 
 const statusColors = {
@@ -54,6 +55,17 @@ export default function MyInvoices() {
 
   useEffect(() => {
     fetchInvoices();
+
+    // Patch the list as invoices change instead of refetching it
+    const applyEvent = liveListUpdater(api.getInvoice, api.getInvoices, setInvoices);
+    return subscribeLive((message) => {
+      if (message.type === "resync") {
+        fetchInvoices();
+        return;
+      }
+      if (message.entity_type !== "invoice") return;
+      applyEvent(message);
+    });
   }, []);
 
   if (loading) {
@@ -203,7 +215,7 @@ export default function MyInvoices() {
         open={dialogOpen}
         onClose={() => setDialogOpen(false)}
         onSuccess={() => {
-          fetchInvoices();
+          // The new invoice arrives through the live update channel
         }}
         mode="create"
       />
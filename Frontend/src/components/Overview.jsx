@@ -14,6 +14,7 @@ import ReceiptIcon from "@mui/icons-material/Receipt";
 import AttachMoneyIcon from "@mui/icons-material/AttachMoney";
 import ScheduleIcon from "@mui/icons-material/Schedule";
 import { api } from "../services/api";
+import { subscribeLive, liveListUpdater } from "../services/live";
 
 function StatCard({ title, value, icon, color, trend, trendValue }) {
   const isPositive = trendValue && trendValue > 0;
@@ -108,37 +109,31 @@ function StatCard({ title, value, icon, color, trend, trendValue }) {
   );
 }
 
+const computeStats = (invoices) => {
+  const totalAmount = invoices.reduce(
+    (sum, inv) => sum + parseFloat(inv.amount || 0),
+    0
+  );
+  return {
+    totalInvoices: invoices.length,
+    totalAmount: totalAmount.toFixed(2),
+    paidInvoices: invoices.filter((inv) => inv.status === "paid").length,
+    pendingInvoices: invoices.filter(
+      (inv) => inv.status === "draft" || inv.status === "sent"
+    ).length,
+  };
+};
+
 export default function Overview() {
-  const [stats, setStats] = useState({
-    totalInvoices: 0,
-    totalAmount: 0,
-    paidInvoices: 0,
-    pendingInvoices: 0,
-  });
+  const [invoices, setInvoices] = useState([]);
   const [loading, setLoading] = useState(true);
+  const stats = computeStats(invoices);
 
   useEffect(() => {
     const fetchStats = async () => {
       try {
         setLoading(true);
-        const invoices = await api.getInvoices();
-
-        const total = invoices.length;
-        const totalAmount = invoices.reduce(
-          (sum, inv) => sum + parseFloat(inv.amount || 0),
-          0
-        );
-        const paid = invoices.filter((inv) => inv.status === "paid").length;
-        const pending = invoices.filter(
-          (inv) => inv.status === "draft" || inv.status === "sent"
-        ).length;
-
-        setStats({
-          totalInvoices: total,
-          totalAmount: totalAmount.toFixed(2),
-          paidInvoices: paid,
-          pendingInvoices: pending,
-        });
+        setInvoices(await api.getInvoices());
       } catch (err) {
         console.error("Error fetching stats:", err);
       } finally {
@@ -147,6 +142,17 @@ export default function Overview() {
     };
 
     fetchStats();
+
+    // Keep the stats current as invoices change instead of refetching
+    const applyEvent = liveListUpdater(api.getInvoice, api.getInvoices, setInvoices);
+    return subscribeLive((message) => {
+      if (message.type === "resync") {
+        fetchStats();
+        return;
+      }
+      if (message.entity_type !== "invoice") return;
+      applyEvent(message);
+    });
   }, []);
 
   if (loading) {
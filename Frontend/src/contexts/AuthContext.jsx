@@ -1,5 +1,5 @@
 import { createContext, useContext, useState, useEffect } from "react";
-import { api } from "../services/api";
+import { api, storeTokens, clearTokens } from "../services/api";
 
 const AuthContext = createContext(null);
 
@@ -17,7 +17,8 @@ export const AuthProvider = ({ children }) => {
   const [loading, setLoading] = useState(true);
 
   const logout = () => {
-    localStorage.removeItem("authToken");
+    api.logout();
+    clearTokens();
     setToken(null);
     setUser(null);
   };
@@ -28,13 +29,13 @@ export const AuthProvider = ({ children }) => {
       const storedToken = localStorage.getItem("authToken");
       if (storedToken) {
         try {
-          // Verify token by fetching user info
+          // Verify token by fetching user info (renews it if expired)
           const userData = await api.getCurrentUser();
           setUser(userData);
-          setToken(storedToken);
+          setToken(localStorage.getItem("authToken"));
         } catch (error) {
           // Token is invalid, clear it
-          localStorage.removeItem("authToken");
+          clearTokens();
           setToken(null);
           setUser(null);
         }
@@ -48,7 +49,7 @@ export const AuthProvider = ({ children }) => {
     try {
       const response = await api.login(email, password);
       const { access_token } = response;
-      localStorage.setItem("authToken", access_token);
+      storeTokens(response);
       setToken(access_token);
 
       // Fetch user info with the new token
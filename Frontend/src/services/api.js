@@ -5,8 +5,53 @@ const getAuthToken = () => {
   return localStorage.getItem("authToken");
 };
 
+// Get refresh token from localStorage
+const getRefreshToken = () => {
+  return localStorage.getItem("refreshToken");
+};
+
+// Store a token pair returned by /auth/token or /auth/refresh
+export const storeTokens = ({ access_token, refresh_token }) => {
+  localStorage.setItem("authToken", access_token);
+  if (refresh_token) {
+    localStorage.setItem("refreshToken", refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem("authToken");
+  localStorage.removeItem("refreshToken");
+};
+
+// Shared in-flight refresh so concurrent 401s only rotate the token once
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  const refreshToken = getRefreshToken();
+  if (!refreshToken) {
+    return Promise.resolve(false);
+  }
+  if (!refreshPromise) {
+    refreshPromise = fetch(`${API_URL}/auth/refresh`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+      .then(async (res) => {
+        if (!res.ok) return false;
+        storeTokens(await res.json());
+        return true;
+      })
+      .catch(() => false)
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // API helper function
-const apiRequest = async (endpoint, options = {}) => {
+const apiRequest = async (endpoint, options = {}, retried = false) => {
   const token = getAuthToken();
   const headers = {
     "Content-Type": "application/json",
@@ -17,15 +62,28 @@ const apiRequest = async (endpoint, options = {}) => {
     headers.Authorization = `Bearer ${token}`;
   }
 
-  const response = await fetch(`${API_URL}${endpoint}`, {
-    ...options,
-    headers,
-  });
+  let response;
+  try {
+    response = await fetch(`${API_URL}${endpoint}`, {
+      ...options,
+      headers,
+    });
+  } catch (err) {
+    // Network error: the request may or may not have reached the server.
+    // Only keyed requests are safe to resend, the server dedupes them.
+    if (headers["Idempotency-Key"] && !options.networkRetried) {
+      return apiRequest(endpoint, { ...options, networkRetried: true }, retried);
+    }
+    throw err;
+  }
 
   if (!response.ok) {
-    // Handle 401 Unauthorized - token might be expired
+    // Handle 401 Unauthorized - token might be expired, try to renew it once
     if (response.status === 401) {
-      localStorage.removeItem("authToken");
+      if (!retried && (await refreshAccessToken())) {
+        return apiRequest(endpoint, options, true);
+      }
+      clearTokens();
       throw new Error("Not authenticated");
     }
     let errorData;
@@ -64,6 +122,7 @@ export const api = {
   createInvoice: (invoiceData) => {
     return apiRequest("/invoices", {
       method: "POST",
+      headers: { "Idempotency-Key": crypto.randomUUID() },
       body: JSON.stringify(invoiceData),
     });
   },
@@ -102,6 +161,17 @@ export const api = {
     });
   },
 
+  // Revoke the refresh token on the server
+  logout: () => {
+    const refreshToken = getRefreshToken();
+    if (!refreshToken) return Promise.resolve();
+    return fetch(`${API_URL}/auth/logout`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    }).catch(() => {});
+  },
+
   // Register
   register: (userData) => {
     return apiRequest("/auth/register", {
@@ -131,6 +201,7 @@ export const api = {
   createClient: (clientData) => {
     return apiRequest("/clients", {
       method: "POST",
+      headers: { "Idempotency-Key": crypto.randomUUID() },
       body: JSON.stringify(clientData),
     });
   },
@@ -0,0 +1,123 @@
+const API_URL = import.meta.env.VITE_API_URL || "http://localhost:8000";
+const WS_URL = API_URL.replace(/^http/, "ws");
+
+// One shared socket for all subscribed components
+const listeners = new Set();
+let socket = null;
+let reconnectTimer = null;
+let reconnectDelay = 1000;
+
+const connect = () => {
+  const token = localStorage.getItem("authToken");
+  if (!token || socket) return;
+
+  socket = new WebSocket(`${WS_URL}/ws?token=${encodeURIComponent(token)}`);
+
+  socket.onopen = () => {
+    reconnectDelay = 1000;
+  };
+
+  socket.onmessage = (message) => {
+    const data = JSON.parse(message.data);
+    listeners.forEach((listener) => listener(data));
+  };
+
+  socket.onclose = () => {
+    socket = null;
+    if (listeners.size === 0) return;
+    // Events missed while disconnected are picked up by a resync
+    reconnectTimer = setTimeout(() => {
+      reconnectTimer = null;
+      connect();
+      listeners.forEach((listener) => listener({ type: "resync" }));
+    }, reconnectDelay);
+    reconnectDelay = Math.min(reconnectDelay * 2, 30000);
+  };
+};
+
+const disconnect = () => {
+  clearTimeout(reconnectTimer);
+  reconnectTimer = null;
+  if (socket) {
+    const current = socket;
+    socket = null;
+    current.onclose = null;
+    current.close();
+  }
+};
+
+// Subscribe to live change events; returns an unsubscribe function.
+// Listeners get {type: "event", event_type, entity_type, entity_id, ...}
+// or {type: "resync"} when they should reload their data.
+export const subscribeLive = (listener) => {
+  listeners.add(listener);
+  connect();
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0) {
+      disconnect();
+    }
+  };
+};
+
+// Past this many changed entities in a batch, one list fetch is cheaper
+const MAX_SINGLE_FETCHES = 5;
+
+// Load one batch of events (latest per entity) into a state updater
+const batchUpdater = async (events, fetchOne, fetchAll) => {
+  if (events.length > MAX_SINGLE_FETCHES) {
+    const all = await fetchAll();
+    return () => all;
+  }
+  const deleted = new Set(
+    events
+      .filter((event) => event.event_type.endsWith(".deleted"))
+      .map((event) => event.entity_id)
+  );
+  const changed = await Promise.all(
+    events
+      .filter((event) => !deleted.has(event.entity_id))
+      .map((event) => fetchOne(event.entity_id))
+  );
+  const byId = new Map(changed.map((entity) => [entity.id, entity]));
+  return (items) => {
+    const known = new Set(items.map((item) => item.id));
+    return [
+      ...items
+        .filter((item) => !deleted.has(item.id))
+        .map((item) => byId.get(item.id) ?? item),
+      ...changed.filter((entity) => !known.has(entity.id)),
+    ];
+  };
+};
+
+// Apply change events to a list of entities, so a component can patch its
+// state in place instead of refetching the list. Events that arrive while
+// a batch is loading are collapsed per entity into the next batch, so a
+// burst of events costs one fetch per entity, or one list fetch if many
+// entities changed. fetchOne loads one entity (e.g. api.getInvoice),
+// fetchAll the whole list (e.g. api.getInvoices), setItems is the state
+// setter. Returns the function to call with each event.
+export const liveListUpdater = (fetchOne, fetchAll, setItems) => {
+  let pending = new Map();
+  let loading = false;
+
+  const flush = async () => {
+    loading = true;
+    while (pending.size > 0) {
+      const events = [...pending.values()];
+      pending = new Map();
+      try {
+        setItems(await batchUpdater(events, fetchOne, fetchAll));
+      } catch (err) {
+        console.error("Error applying live update:", err);
+      }
+    }
+    loading = false;
+  };
+
+  return (event) => {
+    pending.set(event.entity_id, event);
+    if (!loading) flush();
+  };
+};